@@ -3,7 +3,7 @@
 Модуль для работы с Airbnb MCP сервером
 """
 
-from .client import MCPClient
+from .client import MCPClient, AsyncMCPClient
 from .formatter import Formatter
 
-__all__ = ['MCPClient', 'Formatter']
\ No newline at end of file
+__all__ = ['MCPClient', 'AsyncMCPClient', 'Formatter']
\ No newline at end of file
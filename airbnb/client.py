@@ -3,139 +3,203 @@
 Клиент для работы с Airbnb MCP сервером
 """
 
-import subprocess
-import json
-from typing import Dict, List, Any, Optional
-from .config import MCP_SERVER_COMMAND, DEFAULT_SEARCH_PARAMS, MESSAGES
+import asyncio
+from typing import Dict, List, Any, Optional, Set
+from .config import (
+    MCP_SERVER_COMMAND, MCP_POOL_SIZE, SERVER_STARTUP_TIMEOUT, REQUEST_TIMEOUT, TOOL_TIMEOUTS,
+    IDEMPOTENT_TOOLS, DEFAULT_SEARCH_PARAMS, SEARCH_CACHE_CONFIG, DETAILS_CACHE_CONFIG, MESSAGES
+)
 from config import EMOJIS
+from shared.mcp_client import AsyncMCPClientBase, MCPClientBase
+from shared.json_codec import tool_text_payload
+from shared.cache import TTLCache, TieredCache, make_key
 
 
-class MCPClient:
-    """Клиент для взаимодействия с Airbnb MCP сервером"""
-    
+class AsyncMCPClient(AsyncMCPClientBase):
+    """Асинхронный клиент для взаимодействия с Airbnb MCP сервером"""
+
     def __init__(self):
         """Инициализация клиента"""
-        self.process: Optional[subprocess.Popen] = None
-        
-    def start_server(self) -> bool:
-        """
-        Запуск MCP сервера
-        
-        Returns:
-            bool: True если сервер успешно запущен
-        """
-        print(f"{EMOJIS['start']} {MESSAGES['starting_server']}")
-        
-        try:
-            self.process = subprocess.Popen(
-                MCP_SERVER_COMMAND,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=0
-            )
-            
-            # Ждем пока сервер запустится
-            startup_line = self.process.stderr.readline()
-            print(f"{EMOJIS['success']} {startup_line.strip()}")
-            return True
-            
-        except Exception as e:
-            print(f"{EMOJIS['error']} Ошибка запуска сервера: {e}")
-            return False
-    
-    def send_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        super().__init__(
+            MCP_SERVER_COMMAND,
+            MESSAGES,
+            pool_size=MCP_POOL_SIZE,
+            startup_timeout=SERVER_STARTUP_TIMEOUT,
+            request_timeout=REQUEST_TIMEOUT,
+            tool_timeouts=TOOL_TIMEOUTS,
+            idempotent_tools=IDEMPOTENT_TOOLS
+        )
+        self.search_cache = TTLCache(
+            "airbnb_search",
+            ttl=SEARCH_CACHE_CONFIG["ttl"],
+            max_entries=SEARCH_CACHE_CONFIG["max_entries"]
+        ) if SEARCH_CACHE_CONFIG["enabled"] else None
+        self.details_cache = TieredCache(
+            TTLCache("airbnb_listing_details", ttl=DETAILS_CACHE_CONFIG["ttl"],
+                     max_entries=DETAILS_CACHE_CONFIG["max_entries"]),
+            memory_entries=DETAILS_CACHE_CONFIG["memory_entries"],
+            fresh_ttl=DETAILS_CACHE_CONFIG["ttl"],
+            stale_ttl=DETAILS_CACHE_CONFIG["stale_ttl"] if DETAILS_CACHE_CONFIG["revalidate"] else 0
+        ) if DETAILS_CACHE_CONFIG["enabled"] else None
+        self._revalidating: Set[str] = set()
+        self._background: set = set()
+
+    @staticmethod
+    def search_cache_key(location: str, search_params: Dict[str, Any]) -> str:
         """
-        Отправка запроса к MCP серверу
-        
+        Ключ кэша поиска: канонический вид места и объединенных параметров
+
         Args:
-            method: Метод для вызова
-            params: Параметры запроса
-            
+            location: Город для поиска
+            search_params: DEFAULT_SEARCH_PARAMS, объединенные с переданными
+
         Returns:
-            Dict: Ответ от сервера
+            str: Ключ кэша
         """
-        if not self.process:
-            raise RuntimeError("Сервер не запущен")
-            
-        request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": method,
-            "params": params
-        }
-        
-        request_json = json.dumps(request) + "\n"
-        self.process.stdin.write(request_json)
-        self.process.stdin.flush()
-        
-        # Читаем ответ
-        response_line = self.process.stdout.readline()
-        return json.loads(response_line)
-    
-    def search_accommodations(self, location: str, **kwargs) -> List[Dict]:
+        params = {key: value for key, value in search_params.items() if value is not None}
+        return make_key("airbnb_search", " ".join(location.split()).casefold(), params)
+
+    async def search_accommodations(self, location: str, timeout: Optional[float] = None, **kwargs) -> List[Dict]:
         """
         Поиск жилья в указанном месте
-        
+
         Args:
             location: Город для поиска
+            timeout: Дедлайн запроса в секундах (по умолчанию из TOOL_TIMEOUTS)
             **kwargs: Дополнительные параметры (adults, checkin, checkout и т.д.)
-            
+
         Returns:
             List[Dict]: Список найденных вариантов жилья
         """
         # Объединяем параметры по умолчанию с переданными
         search_params = {**DEFAULT_SEARCH_PARAMS, **kwargs}
         adults = search_params.get("adults", 2)
-        
+
+        cache_key = self.search_cache_key(location, search_params)
+        if self.search_cache is not None:
+            cached = await self.search_cache.aget(cache_key)
+            if cached is not None:
+                print(f"{EMOJIS['search']} {MESSAGES['search_cache_hit'].format(location=location)}")
+                return cached
+
         print(f"{EMOJIS['search']} {MESSAGES['searching'].format(location=location, adults=adults)}")
-        
-        # Подготавливаем параметры для API
-        api_params = {
-            "name": "airbnb_search",
-            "arguments": {
-                "location": location,
-                **search_params
-            }
-        }
-        
-        response = self.send_request("tools/call", api_params)
-        
+
+        response = await self.call_tool("airbnb_search", {
+            "location": location,
+            **search_params
+        }, timeout)
+
         if "result" in response and not response.get("result", {}).get("isError", False):
-            data = json.loads(response["result"]["content"][0]["text"])
-            return data.get("searchResults", [])
+            data = tool_text_payload(response)
+            results = data.get("searchResults", [])
+            # Пустую выдачу не кэшируем: это может быть временный сбой скрапинга
+            if self.search_cache is not None and results:
+                await self.search_cache.aset(cache_key, results)
+            return results
         else:
             print(f"{EMOJIS['error']} Ошибка поиска")
             return []
-    
-    def get_listing_details(self, listing_id: str) -> Dict:
+
+    async def get_listing_details(self, listing_id: str, timeout: Optional[float] = None) -> Dict:
         """
         Получение детальной информации о листинге
-        
+
+        Детали берутся из кэша (память, затем диск). Устаревшая запись
+        отдается сразу, а обновляется в фоне.
+
         Args:
             listing_id: ID листинга
-            
+            timeout: Дедлайн запроса в секундах (по умолчанию из TOOL_TIMEOUTS)
+
         Returns:
-            Dict: Детальная информация о листинге
+            Dict: Детальная информация о листинге (не изменять: объект общий с кэшем)
         """
+        listing_id = str(listing_id)
+        if self.details_cache is not None:
+            entry = await self.details_cache.aget_entry(listing_id)
+            if entry is not None:
+                print(f"{EMOJIS['details']} {MESSAGES['details_cache_hit'].format(listing_id=listing_id)}")
+                if entry["stale"]:
+                    self._schedule_details_revalidation(listing_id)
+                return entry["value"]
+
         print(f"{EMOJIS['details']} {MESSAGES['getting_details'].format(listing_id=listing_id)}")
-        
-        params = {
-            "name": "airbnb_listing_details",
-            "arguments": {"id": listing_id}
-        }
-        
-        response = self.send_request("tools/call", params)
-        
-        if "result" in response:
-            data = json.loads(response["result"]["content"][0]["text"])
+        return await self._fetch_listing_details(listing_id, timeout)
+
+    async def _fetch_listing_details(self, listing_id: str, timeout: Optional[float] = None) -> Dict:
+        """Запрос деталей у сервера и сохранение в кэш"""
+        response = await self.call_tool("airbnb_listing_details", {"id": listing_id}, timeout)
+
+        if "result" in response and not response["result"].get("isError", False):
+            data = tool_text_payload(response)
+            if self.details_cache is not None and data:
+                await self.details_cache.aset(listing_id, data)
             return data
         return {}
-    
-    def stop_server(self):
-        """Остановка сервера"""
-        if self.process:
-            self.process.terminate()
-            print(f"{EMOJIS['stop']} {MESSAGES['server_stopped']}")
-            self.process = None
\ No newline at end of file
+
+    def _schedule_details_revalidation(self, listing_id: str) -> None:
+        """Фоновое обновление устаревших деталей (одно на листинг)"""
+        if listing_id in self._revalidating:
+            return
+        self._revalidating.add(listing_id)
+
+        async def revalidate():
+            try:
+                await self._fetch_listing_details(listing_id)
+            except Exception:
+                # Остается устаревшая запись; попробуем при следующем обращении
+                pass
+            finally:
+                self._revalidating.discard(listing_id)
+
+        task = asyncio.get_running_loop().create_task(revalidate())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def cache_stats(self) -> Dict[str, Dict]:
+        """Счетчики кэшей клиента"""
+        stats = {}
+        if self.search_cache is not None:
+            stats["search"] = self.search_cache.stats()
+        if self.details_cache is not None:
+            stats["details"] = self.details_cache.stats()
+        return stats
+
+
+class MCPClient(MCPClientBase):
+    """Клиент для взаимодействия с Airbnb MCP сервером (синхронная обертка)"""
+
+    def __init__(self):
+        """Инициализация клиента"""
+        super().__init__(AsyncMCPClient())
+
+    def search_accommodations(self, location: str, timeout: Optional[float] = None, **kwargs) -> List[Dict]:
+        """
+        Поиск жилья в указанном месте
+
+        Args:
+            location: Город для поиска
+            timeout: Дедлайн запроса в секундах (по умолчанию из TOOL_TIMEOUTS)
+            **kwargs: Дополнительные параметры (adults, checkin, checkout и т.д.)
+
+        Returns:
+            List[Dict]: Список найденных вариантов жилья
+        """
+        return self._run(self.async_client.search_accommodations(location, timeout, **kwargs))
+
+    def get_listing_details(self, listing_id: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Получение детальной информации о листинге
+
+        Args:
+            listing_id: ID листинга
+            timeout: Дедлайн запроса в секундах (по умолчанию из TOOL_TIMEOUTS)
+
+        Returns:
+            Dict: Детальная информация о листинге
+        """
+        return self._run(self.async_client.get_listing_details(listing_id, timeout))
+
+    def cache_stats(self) -> Dict[str, Dict]:
+        """Счетчики кэшей клиента"""
+        return self.async_client.cache_stats()
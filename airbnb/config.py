@@ -5,7 +5,18 @@
 
 # Настройки MCP сервера
 MCP_SERVER_COMMAND = ["npx", "-y", "@openbnb/mcp-server-airbnb", "--ignore-robots-txt"]
-SERVER_STARTUP_TIMEOUT = 10  # секунд
+SERVER_STARTUP_TIMEOUT = 10  # секунд на запуск и MCP initialize
+MCP_POOL_SIZE = 2  # Процессов сервера в пуле (запросы идут наименее загруженному)
+
+# Дедлайны запросов (секунд): по истечении запрос отменяется через notifications/cancelled
+REQUEST_TIMEOUT = 30
+TOOL_TIMEOUTS = {
+    "airbnb_search": 60,
+    "airbnb_listing_details": 45
+}
+
+# Инструменты без побочных эффектов: повторяются при падении сервера
+IDEMPOTENT_TOOLS = {"airbnb_search", "airbnb_listing_details"}
 
 # Настройки поиска по умолчанию
 DEFAULT_SEARCH_PARAMS = {
@@ -15,6 +26,23 @@ DEFAULT_SEARCH_PARAMS = {
     "pets": 0
 }
 
+# Кэш результатов airbnb_search (одинаковые запросы разных пользователей)
+SEARCH_CACHE_CONFIG = {
+    "enabled": True,
+    "ttl": 3600,         # секунд жизни записи
+    "max_entries": 1000  # при превышении вытесняются давно не читанные
+}
+
+# Кэш деталей листингов: LRU в памяти перед диском
+DETAILS_CACHE_CONFIG = {
+    "enabled": True,
+    "memory_entries": 200,  # листингов в памяти процесса
+    "max_entries": 5000,    # листингов на диске
+    "ttl": 6 * 3600,        # секунд, пока детали считаются свежими
+    "revalidate": True,     # устаревшие детали отдавать сразу и обновлять в фоне
+    "stale_ttl": 24 * 3600  # сколько еще секунд можно отдавать устаревшие детали
+}
+
 # Настройки отображения
 DISPLAY_CONFIG = {
     "max_results_to_show": 10,
@@ -27,10 +55,14 @@ DISPLAY_CONFIG = {
 
 # Специфичные сообщения для Airbnb
 MESSAGES = {
+    "server_name": "Airbnb MCP",
     "starting_server": "Запускаю Airbnb MCP сервер...",
     "server_stopped": "Сервер остановлен",
+    "server_error": "Ошибка запуска сервера: {error}",
     "searching": "Ищу жилье в {location} для {adults} человек...",
+    "search_cache_hit": "Результаты для {location} взяты из кэша",
     "found_results": "НАЙДЕНО {count} ВАРИАНТОВ ЖИЛЬЯ:",
     "no_results": "Жилье не найдено",
-    "getting_details": "Получаю детали листинга {listing_id}..."
+    "getting_details": "Получаю детали листинга {listing_id}...",
+    "details_cache_hit": "Детали листинга {listing_id} взяты из кэша"
 }
\ No newline at end of file
@@ -0,0 +1,109 @@
+# benchmarks/bench_framing.py
+"""
+Микробенчмарк чтения и разбора больших ответов MCP сервера
+
+Сравнивает прежний путь (декодирование строки в str, strip и два
+json.loads - конверт и content[0].text) с текущим: bytes из StreamReader
+и один разбор конверта и text через shared.json_codec.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_framing
+"""
+
+import asyncio
+import json
+import time
+from typing import Callable, List
+
+from shared import json_codec
+from shared.mcp_transport import STREAM_LIMIT
+
+
+# Размеры ответов в МБ (детали листинга - сотни КБ, выдача поиска - больше)
+PAYLOAD_SIZES_MB = [0.1, 0.5, 1, 4]
+REPEATS = 20
+
+
+def make_response_line(size_mb: float) -> bytes:
+    """
+    Строка JSON-RPC ответа tools/call заданного размера
+
+    Args:
+        size_mb: Примерный размер в МБ
+
+    Returns:
+        bytes: Строка stdout сервера с переводом строки
+    """
+    def listing(i: int) -> dict:
+        """Карточка листинга из выдачи airbnb_search"""
+        return {
+            "id": str(10_000_000 + i),
+            "url": f"https://www.airbnb.com/rooms/{10_000_000 + i}",
+            "demandStayListing": {
+                "description": {"name": f"Cozy apartment #{i} near the old town"},
+                "location": {"coordinate": {"latitude": 41.38 + i * 1e-5, "longitude": 2.17 - i * 1e-5}}
+            },
+            "badges": "Guest favorite",
+            "structuredContent": {"primaryLine": "2 beds", "secondaryLine": "Jun 1 - 6"},
+            "avgRatingA11yLabel": f"{4 + (i % 100) / 100:.2f} out of 5 average rating, {i % 300} reviews",
+            "structuredDisplayPrice": {"primaryLine": {"accessibilityLabel": f"${90 + i % 200} per night"}},
+            "amenities": ["Wifi", "Kitchen", "Washer", "Air conditioning", "Dedicated workspace"]
+        }
+
+    one = len(json.dumps(listing(0)))
+    count = max(1, int(size_mb * 1024 * 1024 / one))
+    text = json.dumps({"searchResults": [listing(i) for i in range(count)]})
+    envelope = {"jsonrpc": "2.0", "id": 1, "result": {"content": [{"type": "text", "text": text}]}}
+    return (json.dumps(envelope, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def legacy_decode(line: bytes) -> List:
+    """Прежний путь: str-копия строки и два json.loads"""
+    message = json.loads(line.decode("utf-8").strip())
+    return json.loads(message["result"]["content"][0]["text"])["searchResults"]
+
+
+def current_decode(line: bytes) -> List:
+    """Текущий путь: разбор bytes и однократный разбор text"""
+    message = json_codec.loads(line)
+    return json_codec.tool_text_payload(message)["searchResults"]
+
+
+async def read_lines(data: bytes, repeats: int, decode: Callable[[bytes], List]) -> float:
+    """
+    Чтение repeats строк через StreamReader (как stdout процесса) с разбором
+
+    Returns:
+        float: Время в секундах
+    """
+    reader = asyncio.StreamReader(limit=STREAM_LIMIT)
+    reader.feed_data(data * repeats)
+    reader.feed_eof()
+
+    started = time.perf_counter()
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        decode(line)
+    return time.perf_counter() - started
+
+
+def main():
+    """Печать пропускной способности для каждого размера ответа"""
+    print(f"JSON backend: {json_codec.JSON_BACKEND}")
+    print(f"{'Размер':>8} | {'Путь':<8} | {'МБ/с':>8} | {'мс/МБ':>8}")
+    print("-" * 42)
+
+    for size_mb in PAYLOAD_SIZES_MB:
+        line = make_response_line(size_mb)
+        total_mb = len(line) * REPEATS / (1024 * 1024)
+
+        for name, decode in (("legacy", legacy_decode), ("current", current_decode)):
+            elapsed = asyncio.run(read_lines(line, REPEATS, decode))
+            print(f"{size_mb:>6} МБ | {name:<8} | {total_mb / elapsed:>8.1f} | "
+                  f"{elapsed * 1000 / total_mb:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,47 @@ from dotenv import load_dotenv
 # Загружаем переменные окружения
 load_dotenv()
 
+# Каталог для локальных кэшей и манифестов
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+# База SQLite для кэшей ответов MCP серверов
+CACHE_DB_PATH = os.path.join(CACHE_DIR, "mcp_cache.sqlite3")
+
+# Настройки запуска MCP серверов
+MCP_LAUNCH_CONFIG = {
+    "resolved_launch": True,  # node <entry> вместо npx -y после первого резолва пакета
+    "manifest_path": os.path.join(CACHE_DIR, "mcp_launch_manifest.json")
+}
+
+# Кэш схемы инструментов MCP серверов (tools/list)
+MCP_TOOLS_CACHE_CONFIG = {
+    "enabled": True,  # сохранять схему на диск между запусками
+    "path": os.path.join(CACHE_DIR, "mcp_tools_cache.json")
+}
+
+# Объединение одинаковых одновременных вызовов идемпотентных инструментов
+MCP_SINGLE_FLIGHT_CONFIG = {
+    "enabled": True
+}
+
+# Сбор stderr MCP серверов
+MCP_STDERR_CONFIG = {
+    "buffer_lines": 500,          # Последних строк в кольцевом буфере на процесс
+    "max_line_length": 2000,      # Длинные строки обрезаются
+    "forward_to_logging": False   # Пересылать строки в logger "mcp.stderr"
+}
+
+# Супервизор MCP серверов: проверки здоровья и автоперезапуск
+MCP_SUPERVISOR_CONFIG = {
+    "enabled": True,
+    "health_interval": 15,   # секунд между проверками (MCP ping)
+    "health_timeout": 5,     # дедлайн ответа на ping, секунд
+    "max_missed_pings": 2,   # пропущенных ping подряд до перезапуска зависшего процесса
+    "backoff_base": 1,       # задержка перед повторным перезапуском, секунд (удваивается)
+    "backoff_max": 60,       # максимальная задержка, секунд
+    "max_retries": 1         # повторов идемпотентного вызова после падения процесса
+}
+
 # Настройки OpenAI
 OPENAI_CONFIG = {
     "api_key": os.getenv("OPENAI_API_KEY", ""),
@@ -16,6 +57,14 @@ OPENAI_CONFIG = {
     "temperature": 0
 }
 
+# Кэш ответов LLM: одинаковый промпт не отправляется повторно
+LLM_CACHE_CONFIG = {
+    "enabled": True,
+    "backend": "sqlite",     # "sqlite" (переживает перезапуск), "memory" или None
+    "ttl": 7 * 24 * 3600,    # секунд; ответы, привязанные к дате, истекают в конце суток
+    "max_entries": 2000
+}
+
 # Эмодзи для вывода
 EMOJIS = {
     "start": "🚀",
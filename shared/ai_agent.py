@@ -9,6 +9,7 @@ from typing import Dict, Any, Optional
 from pydantic import BaseModel
 from openai import OpenAI
 from config import OPENAI_CONFIG, MESSAGES, EMOJIS
+from .llm_cache import create_llm_cache
 
 
 class AirbnbSearchParams(BaseModel):
@@ -37,11 +38,15 @@ class AIAgent:
         self.api_key = api_key or OPENAI_CONFIG["api_key"]
         self.client = OpenAI(api_key=self.api_key)
         self.model = OPENAI_CONFIG["model"]
+        self.llm_cache = create_llm_cache()
     
     def get_search_function_description(self, airbnb_client) -> Dict[str, Any]:
         """
         Получает описание функции поиска от MCP сервера
         
+        Схема берется из кэша клиента: tools/list отправляется
+        один раз за время работы сервера, а не на каждый запрос.
+        
         Args:
             airbnb_client: Экземпляр Airbnb MCPClient
             
@@ -50,12 +55,9 @@ class AIAgent:
         """
         print(f"{EMOJIS['search']} {MESSAGES['getting_function_description']}")
         
-        tools_response = airbnb_client.send_request("tools/list", {})
-        
-        # Ищем airbnb_search среди доступных инструментов
-        for tool in tools_response.get("result", {}).get("tools", []):
-            if tool["name"] == "airbnb_search":
-                return tool
+        tool = airbnb_client.get_tool("airbnb_search")
+        if tool:
+            return tool
         
         raise ValueError("Функция airbnb_search не найдена в MCP сервере")
     
@@ -137,18 +139,32 @@ class AIAgent:
 
         user_prompt = f"Запрос пользователя: {user_request}\n\nТекущая дата: {current_date}"
 
+        request = {
+            "model": self.model,
+            "temperature": 0,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+        }
+        # В ключе кэша - схема ответа; промпт зависит от даты, поэтому ответ живет до конца суток
+        cache_request = {**request, "response_format": AirbnbSearchParams.model_json_schema()}
+        
+        if self.llm_cache is not None:
+            cached = self.llm_cache.get(cache_request, day=current_date)
+            if cached is not None:
+                return AirbnbSearchParams(**cached)
+        
         try:
             completion = self.client.beta.chat.completions.parse(
-                model=self.model,
-                temperature=0,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                **request,
                 response_format=AirbnbSearchParams
             )
             
-            return completion.choices[0].message.parsed
+            parsed = completion.choices[0].message.parsed
+            if self.llm_cache is not None and parsed is not None:
+                self.llm_cache.set(cache_request, parsed.model_dump(), day=current_date)
+            return parsed
             
         except Exception as e:
             print(f"{EMOJIS['error']} {MESSAGES['ai_error'].format(error=e)}")
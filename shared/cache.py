@@ -0,0 +1,441 @@
+# shared/cache.py
+"""
+Кэши ответов MCP серверов: постоянный на SQLite и двухуровневый (память + диск)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from config import CACHE_DB_PATH
+from .json_codec import loads
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Ключ кэша из канонического JSON частей (порядок ключей словарей не важен)
+
+    Args:
+        *parts: Имя метода, параметры и т.д.
+
+    Returns:
+        str: sha256 канонического представления
+    """
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """
+    Кэш в SQLite: записи живут ttl секунд, при превышении max_entries
+    вытесняются давно не читанные
+
+    Один файл базы делят несколько кэшей (namespace) и процессов;
+    доступ из разных потоков сериализуется блокировкой. Из корутин
+    используются aget/aget_entry/aset: запросы к SQLite выполняются
+    в потоке, чтобы не блокировать event loop.
+    """
+
+    def __init__(self, namespace: str, ttl: float, max_entries: int = 1000,
+                 path: Optional[str] = None):
+        """
+        Инициализация кэша
+
+        Args:
+            namespace: Имя кэша внутри базы (например, "airbnb_search")
+            ttl: Время жизни записи по умолчанию, секунд
+            max_entries: Максимум записей в namespace
+            path: Путь к файлу базы (по умолчанию CACHE_DB_PATH)
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path or CACHE_DB_PATH
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (namespace, last_access)"
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Значение по ключу, если оно есть и не устарело
+
+        Args:
+            key: Ключ (см. make_key)
+
+        Returns:
+            Any: Закэшированное значение или None
+        """
+        entry = self.get_entry(key)
+        return entry["value"] if entry else None
+
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Запись кэша с метаданными
+
+        Args:
+            key: Ключ
+
+        Returns:
+            Dict: {"value", "created_at", "expires_at"} или None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created_at, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+
+            if row is None or row[2] <= now:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._db.execute(
+                "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key)
+            )
+
+        return {"value": loads(row[0]), "created_at": row[1], "expires_at": row[2]}
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get для корутин (чтение базы вне event loop)"""
+        entry = await self.aget_entry(key)
+        return entry["value"] if entry else None
+
+    async def aget_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """get_entry для корутин (чтение базы вне event loop)"""
+        return await asyncio.to_thread(self.get_entry, key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """set для корутин (запись в базу вне event loop)"""
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Сохранение значения
+
+        Args:
+            key: Ключ
+            value: JSON-сериализуемое значение
+            ttl: Время жизни записи (по умолчанию ttl кэша)
+        """
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        payload = json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, payload, now, expires_at, now)
+            )
+            self._evict(now)
+
+    def delete(self, key: str) -> None:
+        """Удаление записи"""
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            )
+
+    def clear(self) -> None:
+        """Удаление всех записей namespace"""
+        with self._lock:
+            self._db.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def _evict(self, now: float) -> None:
+        """Удаление устаревших записей и самых давно читанных сверх лимита"""
+        self._db.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, now)
+        )
+        self._db.execute("""
+            DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                SELECT key FROM cache_entries WHERE namespace = ?
+                ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.namespace, self.namespace, self.max_entries))
+
+    def __len__(self) -> int:
+        """Количество записей namespace"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий и промахов"""
+        total = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+class MemoryCache:
+    """
+    Кэш в памяти процесса с тем же интерфейсом, что и TTLCache
+
+    Подходит, когда диск недоступен или записи не должны переживать перезапуск.
+    """
+
+    def __init__(self, namespace: str, ttl: float, max_entries: int = 1000):
+        """
+        Инициализация кэша
+
+        Args:
+            namespace: Имя кэша (для статистики)
+            ttl: Время жизни записи по умолчанию, секунд
+            max_entries: Максимум записей (вытесняются давно не читанные)
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Значение по ключу, если оно есть и не устарело"""
+        entry = self.get_entry(key)
+        return entry["value"] if entry else None
+
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Запись кэша с метаданными {"value", "created_at", "expires_at"}"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["expires_at"] <= time.time():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get для корутин (тот же интерфейс, что у TTLCache)"""
+        return self.get(key)
+
+    async def aget_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """get_entry для корутин"""
+        return self.get_entry(key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """set для корутин"""
+        self.set(key, value, ttl)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Сохранение значения (ttl по умолчанию - ttl кэша)"""
+        now = time.time()
+        with self._lock:
+            self._entries[key] = {
+                "value": value,
+                "created_at": now,
+                "expires_at": now + (self.ttl if ttl is None else ttl)
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Удаление записи"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Удаление всех записей"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Количество записей"""
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий и промахов"""
+        total = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+# Реализации кэша по имени backend в конфигах
+CACHE_BACKENDS = {
+    "sqlite": TTLCache,
+    "memory": MemoryCache
+}
+
+
+def create_cache(namespace: str, backend: Optional[str], ttl: float, max_entries: int = 1000):
+    """
+    Кэш выбранной реализации
+
+    Args:
+        namespace: Имя кэша
+        backend: "sqlite", "memory" или None (без кэша)
+        ttl: Время жизни записи по умолчанию, секунд
+        max_entries: Максимум записей
+
+    Returns:
+        TTLCache | MemoryCache | None: Кэш с методами get, get_entry, set, stats
+            и их async вариантами aget, aget_entry, aset
+    """
+    if not backend:
+        return None
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"Неизвестный backend кэша: {backend}")
+    return CACHE_BACKENDS[backend](namespace, ttl, max_entries)
+
+
+class TieredCache:
+    """
+    Двухуровневый кэш: LRU в памяти перед TTLCache на диске
+
+    Запись свежая fresh_ttl секунд. Еще stale_ttl секунд после этого она
+    отдается с признаком stale, чтобы вызывающий мог вернуть ее сразу
+    и обновить в фоне (ревалидация), вместо ожидания медленного запроса.
+    Корутины используют aget_entry/aset: память читается сразу, диск - в потоке.
+    """
+
+    def __init__(self, disk: TTLCache, memory_entries: int, fresh_ttl: float, stale_ttl: float = 0):
+        """
+        Инициализация кэша
+
+        Args:
+            disk: Постоянный уровень
+            memory_entries: Размер LRU в памяти
+            fresh_ttl: Сколько секунд запись считается свежей
+            stale_ttl: Сколько секунд после этого запись можно отдавать на ревалидацию
+        """
+        self.disk = disk
+        self.memory_entries = memory_entries
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Запись из памяти или с диска
+
+        Args:
+            key: Ключ
+
+        Returns:
+            Dict: {"value", "created_at", "stale"} или None
+        """
+        now = time.time()
+        entry = self._memory_entry(key, now)
+        if entry is not None:
+            return entry
+        return self._disk_entry(key, self.disk.get_entry(key), now)
+
+    async def aget_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """get_entry для корутин (диск читается вне event loop)"""
+        now = time.time()
+        entry = self._memory_entry(key, now)
+        if entry is not None:
+            return entry
+        return self._disk_entry(key, await self.disk.aget_entry(key), now)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Сохранение значения в оба уровня
+
+        Args:
+            key: Ключ
+            value: JSON-сериализуемое значение (в памяти хранится тот же объект,
+                поэтому менять его после сохранения нельзя)
+        """
+        with self._lock:
+            self._remember(key, {"value": value, "created_at": time.time()})
+        self.disk.set(key, value, ttl=self.fresh_ttl + self.stale_ttl)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """set для корутин (запись на диск вне event loop)"""
+        with self._lock:
+            self._remember(key, {"value": value, "created_at": time.time()})
+        await self.disk.aset(key, value, ttl=self.fresh_ttl + self.stale_ttl)
+
+    def _memory_entry(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        """Запись из памяти (устаревшая сверх stale_ttl удаляется)"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry["created_at"] + self.fresh_ttl + self.stale_ttl > now:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return {**entry, "stale": entry["created_at"] + self.fresh_ttl <= now}
+            if entry:
+                del self._memory[key]
+        return None
+
+    def _disk_entry(self, key: str, disk_entry: Optional[Dict[str, Any]], now: float) -> Optional[Dict[str, Any]]:
+        """Учет записи с диска и подъем ее в память"""
+        if disk_entry is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        entry = {"value": disk_entry["value"], "created_at": disk_entry["created_at"]}
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return {**entry, "stale": entry["created_at"] + self.fresh_ttl <= now}
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        """Запись в LRU памяти с вытеснением самой давно читанной"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий по уровням"""
+        total = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "namespace": self.disk.namespace,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self.disk),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / total if total else 0.0
+        }
@@ -0,0 +1,74 @@
+# shared/event_loop.py
+"""
+Фоновый event loop для синхронных оберток над asyncio клиентами
+"""
+
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+
+class BackgroundLoop:
+    """
+    Event loop в отдельном daemon-потоке
+
+    Синхронный код (CLI, Streamlit) отправляет сюда корутины и ждет
+    результат, а все MCP процессы и их транспорты живут в одном loop.
+    """
+
+    def __init__(self):
+        """Инициализация без запуска потока"""
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop (поток запускается при первом обращении)"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="mcp-event-loop",
+                    daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Выполнение корутины в фоновом loop с ожиданием результата
+
+        Args:
+            coro: Корутина для выполнения
+            timeout: Максимальное время ожидания в секундах
+
+        Returns:
+            Any: Результат корутины
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return future.result(timeout=timeout)
+
+
+# Общий loop процесса для всех синхронных MCP клиентов
+_background_loop = BackgroundLoop()
+
+
+def run_sync(coro: Coroutine, timeout: Optional[float] = None) -> Any:
+    """
+    Выполнение корутины в общем фоновом loop
+
+    Args:
+        coro: Корутина для выполнения
+        timeout: Максимальное время ожидания в секундах
+
+    Returns:
+        Any: Результат корутины
+    """
+    return _background_loop.run(coro, timeout=timeout)
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """Общий фоновый event loop процесса"""
+    return _background_loop.loop
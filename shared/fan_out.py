@@ -0,0 +1,78 @@
+# shared/fan_out.py
+"""
+Параллельная обработка списка с сохранением порядка и ранней остановкой
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Sequence, Set
+
+
+# Начатые вызовы, которые продолжают выполняться после ранней остановки
+_detached: Set[asyncio.Task] = set()
+
+
+async def ordered_fan_out(items: Sequence[Any], fetch: Callable[[Any], Awaitable[Any]],
+                          enough: Callable[[List[Any]], bool], concurrency: int) -> List[Any]:
+    """
+    Выполняет fetch для элементов параллельно (не больше concurrency сразу)
+    и останавливается, как только готово достаточно результатов по порядку
+
+    Результат совпадает с последовательным перебором "пока не хватит":
+    возвращается кратчайший префикс результатов, для которого enough(префикс)
+    истинно (или результаты всех элементов). При ранней остановке отменяются
+    только еще не начатые вызовы: начатые уже потратили запрос к API, поэтому
+    завершаются в фоне и успевают сохранить ответ в кэш. При ошибке или
+    отмене самого fan-out отменяются все вызовы.
+
+    Args:
+        items: Элементы в порядке ранжирования
+        fetch: Корутина обработки одного элемента
+        enough: Проверка префикса результатов
+        concurrency: Максимум одновременных вызовов
+
+    Returns:
+        List: Результаты префикса в исходном порядке
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    started: Set[int] = set()
+
+    async def run(index, item):
+        async with semaphore:
+            started.add(index)
+            return await fetch(item)
+
+    tasks = [asyncio.ensure_future(run(index, item)) for index, item in enumerate(items)]
+    results: List[Any] = []
+
+    try:
+        # Ждем задачи по порядку: остальные тем временем выполняются параллельно
+        for task in tasks:
+            results.append(await task)
+            if enough(results):
+                break
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    not_started = []
+    for index, task in enumerate(tasks):
+        if task.done():
+            continue
+        if index in started:
+            _detached.add(task)
+            task.add_done_callback(_forget_detached)
+        else:
+            task.cancel()
+            not_started.append(task)
+    await asyncio.gather(*not_started, return_exceptions=True)
+
+    return results
+
+
+def _forget_detached(task: asyncio.Task) -> None:
+    """Завершенный фоновый вызов: его результат никто не ждет"""
+    _detached.discard(task)
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,185 @@
+# shared/geohash.py
+"""
+Geohash ячейки и расчеты расстояний для тайлового кэша поиска мест рядом
+"""
+
+import math
+from typing import List, Optional, Tuple
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE_MAP = {char: index for index, char in enumerate(_BASE32)}
+
+EARTH_RADIUS_M = 6371000.0
+METERS_PER_MILE = 1609.344
+
+# Направления в ответах TripAdvisor -> азимут в градусах
+BEARINGS = {
+    "north": 0, "northeast": 45, "east": 90, "southeast": 135,
+    "south": 180, "southwest": 225, "west": 270, "northwest": 315
+}
+
+
+def encode(latitude: float, longitude: float, precision: int = 6) -> str:
+    """
+    Geohash точки
+
+    Args:
+        latitude: Широта
+        longitude: Долгота
+        precision: Длина geohash (6 - ячейка примерно 1.2 x 0.6 км)
+
+    Returns:
+        str: Geohash
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+
+    while len(chars) < precision:
+        value, rng = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+
+    return "".join(chars)
+
+
+def bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """
+    Границы ячейки
+
+    Args:
+        geohash: Geohash ячейки
+
+    Returns:
+        Tuple: (min_lat, min_lon, max_lat, max_lon)
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        bits = _DECODE_MAP[char]
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (bits >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def center(geohash: str) -> Tuple[float, float]:
+    """Центр ячейки (широта, долгота)"""
+    min_lat, min_lon, max_lat, max_lon = bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Расстояние между точками по дуге большого круга, метров"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def initial_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Азимут из первой точки на вторую, градусов от севера"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_lambda = math.radians(lon2 - lon1)
+    x = math.sin(d_lambda) * math.cos(phi2)
+    y = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(d_lambda)
+    return (math.degrees(math.atan2(x, y)) + 360) % 360
+
+
+def bearing_name(degrees: float) -> str:
+    """Ближайшее из восьми направлений (в формате TripAdvisor)"""
+    names = list(BEARINGS)
+    return names[int((degrees + 22.5) // 45) % 8]
+
+
+def project(latitude: float, longitude: float, distance_m: float, bearing_deg: float) -> Tuple[float, float]:
+    """
+    Точка на заданном расстоянии и азимуте от исходной
+
+    Args:
+        latitude: Широта исходной точки
+        longitude: Долгота исходной точки
+        distance_m: Расстояние, метров
+        bearing_deg: Азимут, градусов от севера
+
+    Returns:
+        Tuple: (широта, долгота)
+    """
+    delta = distance_m / EARTH_RADIUS_M
+    theta = math.radians(bearing_deg)
+    phi1, lambda1 = math.radians(latitude), math.radians(longitude)
+
+    phi2 = math.asin(math.sin(phi1) * math.cos(delta) + math.cos(phi1) * math.sin(delta) * math.cos(theta))
+    lambda2 = lambda1 + math.atan2(
+        math.sin(theta) * math.sin(delta) * math.cos(phi1),
+        math.cos(delta) - math.sin(phi1) * math.sin(phi2)
+    )
+    return math.degrees(phi2), (math.degrees(lambda2) + 540) % 360 - 180
+
+
+def _distance_to_cell(latitude: float, longitude: float, geohash: str) -> float:
+    """Расстояние от точки до ближайшей точки ячейки, метров"""
+    min_lat, min_lon, max_lat, max_lon = bounds(geohash)
+    nearest_lat = min(max(latitude, min_lat), max_lat)
+    nearest_lon = min(max(longitude, min_lon), max_lon)
+    return haversine_m(latitude, longitude, nearest_lat, nearest_lon)
+
+
+def covering_cells(latitude: float, longitude: float, radius_m: float, precision: int = 6,
+                   max_cells: Optional[int] = None) -> List[str]:
+    """
+    Ячейки, которые пересекает круг вокруг точки (своя и соседние)
+
+    Args:
+        latitude: Широта
+        longitude: Долгота
+        radius_m: Радиус, метров (меньше размера ячейки)
+        precision: Длина geohash
+        max_cells: Максимум ячеек вместе со своей (None - без ограничения);
+            из соседних остаются ближайшие к точке
+
+    Returns:
+        List[str]: Geohash ячеек: ячейка самой точки, затем соседние по удаленности
+    """
+    own = encode(latitude, longitude, precision)
+    min_lat, min_lon, max_lat, max_lon = bounds(own)
+    lat_step, lon_step = max_lat - min_lat, max_lon - min_lon
+    own_lat, own_lon = center(own)
+
+    neighbors = {}
+    for d_lat in (-1, 0, 1):
+        for d_lon in (-1, 0, 1):
+            if d_lat == 0 and d_lon == 0:
+                continue
+            neighbor_lat = own_lat + d_lat * lat_step
+            if not -90 < neighbor_lat < 90:
+                continue
+            neighbor_lon = (own_lon + d_lon * lon_step + 540) % 360 - 180
+            neighbor = encode(neighbor_lat, neighbor_lon, precision)
+            distance = _distance_to_cell(latitude, longitude, neighbor)
+            if neighbor != own and distance <= radius_m:
+                neighbors[neighbor] = distance
+
+    cells = [own] + sorted(neighbors, key=neighbors.get)
+    return cells if max_cells is None else cells[:max(1, max_cells)]
@@ -0,0 +1,70 @@
+# shared/json_codec.py
+"""
+Быстрое кодирование JSON для MCP транспорта (orjson, если установлен)
+"""
+
+import json
+from typing import Dict, Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Используемая реализация JSON
+JSON_BACKEND = "orjson" if orjson else "json"
+
+
+class JSONDecodeError(ValueError):
+    """Некорректный JSON (общий тип для обеих реализаций)"""
+
+
+def loads(data: Any) -> Any:
+    """
+    Разбор JSON из bytes или str без промежуточной копии строки
+
+    Args:
+        data: Сырые байты строки stdout или текст
+
+    Returns:
+        Any: Разобранный объект
+    """
+    try:
+        if orjson:
+            return orjson.loads(data)
+        return json.loads(data)
+    except ValueError as e:
+        raise JSONDecodeError(str(e)) from None
+
+
+def dumps_line(message: Dict[str, Any]) -> bytes:
+    """
+    Сериализация сообщения в одну строку JSON-RPC с переводом строки
+
+    Args:
+        message: Сообщение для отправки
+
+    Returns:
+        bytes: UTF-8 байты, готовые к записи в stdin сервера
+    """
+    if orjson:
+        return orjson.dumps(message, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def tool_text_payload(response: Dict[str, Any], index: int = 0) -> Any:
+    """
+    JSON из текстового content ответа tools/call
+
+    Ответ не изменяется: объединенные вызовы (single-flight) получают
+    один и тот же объект ответа, поэтому каждый разбирает text сам.
+
+    Args:
+        response: Ответ MCP сервера
+        index: Номер элемента content
+
+    Returns:
+        Any: Разобранный JSON из поля text
+    """
+    return loads(response["result"]["content"][index]["text"])
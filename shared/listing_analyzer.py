@@ -4,9 +4,11 @@
 """
 
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Union
 from openai import OpenAI
 from config import OPENAI_CONFIG, EMOJIS
+from .llm_stream import stream_completion
+from .llm_cache import create_llm_cache
 
 
 class ListingAnalyzer:
@@ -22,6 +24,7 @@ class ListingAnalyzer:
         self.api_key = api_key or OPENAI_CONFIG["api_key"]
         self.client = OpenAI(api_key=self.api_key)
         self.model = OPENAI_CONFIG["model"]
+        self.llm_cache = create_llm_cache()
     
     def select_listing_interactive(self, listings: List[Dict]) -> Optional[Dict]:
         """
@@ -120,6 +123,19 @@ class ListingAnalyzer:
     
     def generate_ai_report(self, listing_data: Dict, user_request: str = "") -> str:
         """Генерация детального отчета с помощью ИИ"""
+        return "".join(self.stream_ai_report(listing_data, user_request))
+    
+    def stream_ai_report(self, listing_data: Dict, user_request: str = "") -> Iterator[str]:
+        """
+        Генерация детального отчета с выдачей текста по мере генерации
+        
+        Args:
+            listing_data: Полные данные о жилье
+            user_request: Исходный запрос пользователя
+            
+        Yields:
+            str: Очередной фрагмент отчета
+        """
         print(f"{EMOJIS['ai']} ИИ анализирует жилье и создает отчет...")
         
         # Предобработка данных
@@ -159,7 +175,9 @@ class ListingAnalyzer:
     Создай подробный отчет с учетом запроса пользователя."""
 
         try:
-            response = self.client.chat.completions.create(
+            yield from stream_completion(
+                self.client,
+                cache=self.llm_cache,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -168,9 +186,8 @@ class ListingAnalyzer:
                 max_tokens=1500,
                 temperature=0.3
             )
-            return response.choices[0].message.content
         except Exception as e:
-            return f"{EMOJIS['error']} Ошибка генерации отчета: {e}"
+            yield f"{EMOJIS['error']} Ошибка генерации отчета: {e}"
 
     def _preprocess_listing_data(self, listing_data: Dict) -> Dict:
         """Предобработка данных для более чистого промпта"""
@@ -282,11 +299,8 @@ class ListingAnalyzer:
         # Шаг 2: Получение полных данных (передаем search_location)
         full_data = self.get_full_listing_data(selected_listing, airbnb_client, search_location)
         
-        # Шаг 3: ИИ анализ и отчет
-        report = self.generate_ai_report(full_data, user_request)
-        
-        # Шаг 4: Отображение результата
-        self._display_ai_report(report)
+        # Шаги 3-4: ИИ анализ и отчет, выводится по мере генерации
+        self._display_ai_report(self.stream_ai_report(full_data, user_request))
         
         # Шаг 5: Предложение дополнительных опций
         return self._handle_post_analysis_options(full_data, listings, airbnb_client, user_request)
@@ -363,14 +377,26 @@ class ListingAnalyzer:
                 elif choice == "6":  # Новый поиск
                     return 'new_search'
                 else:
-                    # Получение дополнительной информации
-                    analysis = integrator.process_additional_info_request(choice, listing_data)
+                    # Получение дополнительной информации (ИИ анализ печатается по мере генерации)
+                    streamed = []
+                    
+                    def print_chunk(chunk: str) -> None:
+                        if not streamed:
+                            print("\n" + "="*80)
+                            print(f"{EMOJIS['tripadvisor']} АНАЛИЗ ДАННЫХ TRIPADVISOR")
+                            print("="*80)
+                        streamed.append(chunk)
+                        print(chunk, end="", flush=True)
+                    
+                    analysis = integrator.process_additional_info_request(choice, listing_data, print_chunk)
                     
                     if analysis:
-                        print("\n" + "="*80)
-                        print(f"{EMOJIS['tripadvisor']} АНАЛИЗ ДАННЫХ TRIPADVISOR")
-                        print("="*80)
-                        print(analysis)
+                        if not streamed:
+                            print_chunk(analysis)
+                        elif analysis != "".join(streamed):
+                            # Поток прервался ошибкой - печатаем ее
+                            print(f"\n{analysis}", end="")
+                        print()
                         print("="*80)
                         
                         input(f"\n{EMOJIS['question']} Нажмите Enter для продолжения...")
@@ -380,15 +406,28 @@ class ListingAnalyzer:
         finally:
             integrator.stop_tripadvisor_service()
     
-    def _display_ai_report(self, report: str) -> None:
+    def _display_ai_report(self, report: Union[str, Iterable[str]]) -> str:
         """
         Красивое отображение ИИ отчета
         
         Args:
-            report: Текст отчета от ИИ
+            report: Текст отчета от ИИ или его фрагменты (печатаются по мере поступления)
+            
+        Returns:
+            str: Текст отчета целиком
         """
-        print("\n" + "="*80)
-        print(f"{EMOJIS['ai']} ДЕТАЛЬНЫЙ ИИ АНАЛИЗ ЖИЛЬЯ")
+        chunks = [report] if isinstance(report, str) else report
+        printed = []
+        
+        for chunk in chunks:
+            # Заголовок после служебных сообщений генерации, перед первым фрагментом
+            if not printed:
+                print("\n" + "="*80)
+                print(f"{EMOJIS['ai']} ДЕТАЛЬНЫЙ ИИ АНАЛИЗ ЖИЛЬЯ")
+                print("="*80)
+            printed.append(chunk)
+            print(chunk, end="", flush=True)
+        
+        print()
         print("="*80)
-        print(report)
-        print("="*80)
\ No newline at end of file
+        return "".join(printed)
\ No newline at end of file
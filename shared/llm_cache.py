@@ -0,0 +1,115 @@
+# shared/llm_cache.py
+"""
+Точный кэш ответов LLM: одинаковый запрос (модель, параметры, сообщения)
+возвращает сохраненный ответ без обращения к API
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+from config import LLM_CACHE_CONFIG
+from .cache import make_key, create_cache
+
+
+def seconds_until_day_end(day: str) -> float:
+    """
+    Секунд до конца суток (локальное время, как в datetime.now())
+
+    Args:
+        day: Сутки в формате YYYY-MM-DD
+
+    Returns:
+        float: Секунд до полуночи после day (0, если сутки прошли)
+    """
+    day_end = datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)
+    return max(0.0, (day_end - datetime.now()).total_seconds())
+
+
+class LLMCache:
+    """
+    Кэш ответов chat.completions по хэшу запроса
+
+    Ключ - sha256 канонического JSON запроса (model, messages, temperature,
+    max_tokens, формат ответа...), поэтому попадание бывает только для
+    байт-в-байт одинакового промпта. Записи живут ttl секунд, при
+    переполнении вытесняются давно не читанные.
+
+    Запросы, зависящие от текущей даты, передают ее явно (day): дата входит
+    в ключ, а запись истекает в конце этих суток, даже если ttl больше.
+    """
+
+    def __init__(self, cache):
+        """
+        Инициализация кэша
+
+        Args:
+            cache: Хранилище с get/set/stats (TTLCache или MemoryCache)
+        """
+        self.cache = cache
+
+    @staticmethod
+    def key(request: Dict[str, Any], day: Optional[str] = None) -> str:
+        """
+        Ключ запроса
+
+        Args:
+            request: Параметры chat.completions (без stream)
+            day: Сутки, к которым привязан ответ (YYYY-MM-DD)
+
+        Returns:
+            str: Ключ кэша
+        """
+        return make_key("chat.completions", request, day)
+
+    def get(self, request: Dict[str, Any], day: Optional[str] = None) -> Optional[Any]:
+        """
+        Сохраненный ответ на такой же запрос
+
+        Args:
+            request: Параметры chat.completions
+            day: Сутки, к которым привязан ответ
+
+        Returns:
+            Any: Ответ или None
+        """
+        return self.cache.get(self.key(request, day))
+
+    def set(self, request: Dict[str, Any], value: Any, day: Optional[str] = None) -> None:
+        """
+        Сохранение ответа (пустые ответы не сохраняются)
+
+        Args:
+            request: Параметры chat.completions
+            value: JSON-сериализуемый ответ
+            day: Сутки, к которым привязан ответ (запись истекает в их конце)
+        """
+        if not value:
+            return
+
+        ttl = self.cache.ttl
+        if day is not None:
+            ttl = min(ttl, seconds_until_day_end(day))
+            if ttl <= 0:
+                return
+        self.cache.set(self.key(request, day), value, ttl=ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий и промахов"""
+        return self.cache.stats()
+
+
+def create_llm_cache() -> Optional[LLMCache]:
+    """
+    Кэш ответов LLM по настройкам LLM_CACHE_CONFIG
+
+    Returns:
+        LLMCache: Кэш или None, если он выключен
+    """
+    if not LLM_CACHE_CONFIG["enabled"]:
+        return None
+    cache = create_cache(
+        "llm_responses",
+        LLM_CACHE_CONFIG["backend"],
+        ttl=LLM_CACHE_CONFIG["ttl"],
+        max_entries=LLM_CACHE_CONFIG["max_entries"]
+    )
+    return LLMCache(cache) if cache is not None else None
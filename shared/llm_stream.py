@@ -0,0 +1,68 @@
+# shared/llm_stream.py
+"""
+Потоковая генерация ответов OpenAI: текст выдается по мере поступления токенов
+"""
+
+from typing import Callable, Iterator, Optional
+
+
+def stream_completion(client, cache=None, **request) -> Iterator[str]:
+    """
+    Ответ chat.completions частями по мере генерации
+
+    Args:
+        client: Клиент OpenAI
+        cache: LLMCache - при попадании ответ выдается одним фрагментом,
+            полностью полученный ответ сохраняется
+        **request: Параметры chat.completions.create (model, messages, max_tokens...)
+
+    Yields:
+        str: Очередной фрагмент текста ответа
+    """
+    if cache is not None:
+        cached = cache.get(request)
+        if cached is not None:
+            yield cached
+            return
+
+    chunks = []
+    stream = client.chat.completions.create(**request, stream=True)
+    for chunk in stream:
+        # Служебные чанки (например, с usage) приходят без choices
+        if chunk.choices and chunk.choices[0].delta.content:
+            chunks.append(chunk.choices[0].delta.content)
+            yield chunk.choices[0].delta.content
+
+    # Сюда доходит только полностью полученный ответ
+    if cache is not None:
+        cache.set(request, "".join(chunks))
+
+
+def complete(client, on_chunk: Optional[Callable[[str], None]] = None, cache=None, **request) -> str:
+    """
+    Полный текст ответа; при заданном on_chunk ответ получается потоком
+
+    Args:
+        client: Клиент OpenAI
+        on_chunk: Вызывается с каждым фрагментом текста по мере генерации
+        cache: LLMCache для одинаковых запросов (None - без кэша)
+        **request: Параметры chat.completions.create
+
+    Returns:
+        str: Текст ответа целиком
+    """
+    if on_chunk is None:
+        cached = cache.get(request) if cache is not None else None
+        if cached is not None:
+            return cached
+        response = client.chat.completions.create(**request)
+        content = response.choices[0].message.content
+        if cache is not None:
+            cache.set(request, content)
+        return content
+
+    chunks = []
+    for chunk in stream_completion(client, cache, **request):
+        chunks.append(chunk)
+        on_chunk(chunk)
+    return "".join(chunks)
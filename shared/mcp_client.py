@@ -0,0 +1,470 @@
+# shared/mcp_client.py
+"""
+Базовые MCP клиенты: asyncio-реализация и синхронная обертка над ней
+"""
+
+import asyncio
+import math
+from typing import Dict, List, Any, Optional, Set, Coroutine, Callable
+from config import EMOJIS, MCP_SUPERVISOR_CONFIG, MCP_SINGLE_FLIGHT_CONFIG
+from .event_loop import run_sync
+from .mcp_pool import MCPServerPool
+from .mcp_supervisor import MCPSupervisor
+from .mcp_router import log_server_message
+from .mcp_transport import MCPTimeoutError, SENT_REQUEST_IDS
+from .mcp_tools_cache import ToolSchemaCache
+from .single_flight import SingleFlight
+from .cache import make_key
+
+
+# Служебные методы MCP, которые безопасно повторять
+IDEMPOTENT_METHODS = {"ping", "tools/list"}
+
+
+class AsyncMCPClientBase:
+    """Общая логика запуска пула MCP серверов и отправки запросов через asyncio"""
+
+    def __init__(self, command: List[str], messages: Dict[str, str], pool_size: int = 1,
+                 startup_timeout: float = 10, request_timeout: Optional[float] = None,
+                 tool_timeouts: Optional[Dict[str, float]] = None,
+                 idempotent_tools: Optional[Set[str]] = None):
+        """
+        Инициализация клиента
+
+        Args:
+            command: Команда запуска MCP сервера
+            messages: Сообщения модуля (starting_server, server_stopped, server_error)
+            pool_size: Количество процессов сервера в пуле
+            startup_timeout: Дедлайн на запуск и initialize процесса в секундах
+            request_timeout: Дедлайн запроса по умолчанию в секундах
+            tool_timeouts: Дедлайны по именам инструментов (перекрывают request_timeout)
+            idempotent_tools: Инструменты без побочных эффектов (повторяются при падении сервера)
+        """
+        self.command = command
+        self.messages = messages
+        self.pool_size = pool_size
+        self.startup_timeout = startup_timeout
+        self.request_timeout = request_timeout
+        self.tool_timeouts = tool_timeouts or {}
+        self.idempotent_tools = set(idempotent_tools or ())
+        self.pool: Optional[MCPServerPool] = None
+        self.supervisor: Optional[MCPSupervisor] = None
+
+        # Подписки на уведомления и обработчики запросов сервера
+        # (общие для всех процессов пула, сохраняются между перезапусками)
+        self.subscribers: Dict[str, List[Callable]] = {
+            "notifications/message": [log_server_message]
+        }
+        self.request_handlers: Dict[str, Callable] = {}
+
+        # Схема инструментов: один tools/list за время работы сервера
+        self.tools_cache = ToolSchemaCache(" ".join(command))
+        self._tools_lock = asyncio.Lock()
+        self._tools_refresh: Optional[asyncio.Task] = None
+        self.subscribe("notifications/tools/list_changed", lambda params: self.tools_cache.invalidate())
+
+        # Одинаковые одновременные вызовы инструментов идут на сервер один раз
+        self.single_flight = SingleFlight()
+        self._flight_request_ids: Dict[str, List[int]] = {}
+
+    def _server_env(self) -> Optional[Dict[str, str]]:
+        """Переменные окружения для процесса сервера (None - унаследовать)"""
+        return None
+
+    async def start_server(self) -> bool:
+        """
+        Запуск пула MCP серверов
+
+        Returns:
+            bool: True если запущен хотя бы один процесс
+        """
+        print(f"{EMOJIS['start']} {self.messages['starting_server']}")
+
+        try:
+            self.pool = MCPServerPool(
+                self.command,
+                size=self.pool_size,
+                env=self._server_env(),
+                startup_timeout=self.startup_timeout,
+                name=self.messages.get("server_name", "MCP"),
+                subscribers=self.subscribers,
+                request_handlers=self.request_handlers
+            )
+            started = await self.pool.start()
+            if not started:
+                raise RuntimeError("ни один процесс не запустился")
+
+            self.supervisor = MCPSupervisor(self.pool)
+            self.supervisor.start()
+
+            # Схема запрашивается в фоне, не задерживая первый поиск
+            self._schedule_tools_refresh()
+            return True
+
+        except Exception as e:
+            print(f"{EMOJIS['error']} {self.messages['server_error'].format(error=e)}")
+            self.pool = None
+            return False
+
+    def subscribe(self, method: str, handler: Callable[[Dict[str, Any]], Any]) -> Callable[[], None]:
+        """
+        Подписка на уведомления сервера (можно до запуска)
+
+        Обработчик вызывается в event loop клиента и не должен блокировать.
+
+        Args:
+            method: Метод уведомления (например, "notifications/progress")
+            handler: Функция или корутина, получающая params уведомления
+
+        Returns:
+            Callable: Функция отписки
+        """
+        self.subscribers.setdefault(method, []).append(handler)
+
+        def unsubscribe():
+            handlers = self.subscribers.get(method, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+        return unsubscribe
+
+    def handle_requests(self, method: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Обработчик запросов сервера к клиенту (например, "roots/list")
+
+        Args:
+            method: Метод запроса сервера
+            handler: Функция или корутина, возвращающая result ответа
+        """
+        self.request_handlers[method] = handler
+
+    async def send_request(self, method: str, params: Dict[str, Any],
+                           timeout: Optional[float] = None, idempotent: bool = None,
+                           on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
+        """
+        Отправка запроса к наименее загруженному MCP серверу пула
+
+        Args:
+            method: Метод для вызова
+            params: Параметры запроса
+            timeout: Дедлайн в секундах (по умолчанию request_timeout)
+            idempotent: Повторять ли запрос после падения сервера
+                (по умолчанию - для ping и tools/list)
+            on_progress: Обработчик notifications/progress этого запроса
+
+        Returns:
+            Dict: Ответ от сервера
+
+        Raises:
+            MCPTimeoutError: Сервер не ответил до дедлайна
+        """
+        if not self.pool:
+            raise RuntimeError("Сервер не запущен")
+
+        if timeout is None:
+            timeout = self.request_timeout
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+
+        retries = MCP_SUPERVISOR_CONFIG["max_retries"] if idempotent else 0
+        return await self.pool.request(method, params, timeout, retries, on_progress)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any],
+                        timeout: Optional[float] = None,
+                        on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
+        """
+        Вызов инструмента MCP сервера (tools/call)
+
+        Одновременные одинаковые вызовы идемпотентного инструмента
+        объединяются: на сервер уходит один запрос, результат получают все.
+        Каждый вызывающий ждет не дольше своего timeout; общий запрос
+        отменяется, когда истекает дедлайн последнего из них.
+
+        Args:
+            name: Имя инструмента
+            arguments: Аргументы инструмента
+            timeout: Дедлайн в секундах (по умолчанию из tool_timeouts)
+            on_progress: Обработчик notifications/progress вызова
+
+        Returns:
+            Dict: Ответ от сервера
+        """
+        if timeout is None:
+            timeout = self.tool_timeouts.get(name, self.request_timeout)
+        idempotent = name in self.idempotent_tools
+        params = {"name": name, "arguments": arguments}
+
+        # Прогресс получает только один вызывающий, поэтому такие вызовы не объединяем
+        if idempotent and on_progress is None and MCP_SINGLE_FLIGHT_CONFIG["enabled"]:
+            key = make_key(name, arguments)
+            try:
+                return await self.single_flight.do(key, lambda: self._shared_call(key, params), timeout)
+            except asyncio.TimeoutError as e:
+                if isinstance(e, MCPTimeoutError):
+                    raise
+                # Истек дедлайн этого вызывающего; общий запрос продолжается для остальных
+                request_ids = self._flight_request_ids.get(key)
+                raise MCPTimeoutError("tools/call", request_ids[-1] if request_ids else None, timeout) from None
+        return await self.send_request("tools/call", params, timeout, idempotent=idempotent, on_progress=on_progress)
+
+    async def _shared_call(self, key: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Общий запрос объединенных вызовов tools/call
+
+        Запрос идет без собственного дедлайна: его ограничивают дедлайны
+        ожидающих (SingleFlight отменяет запрос, когда уходит последний).
+        id отправленных запросов (с повторами) хранятся по ключу вызова
+        для ошибок таймаута ожидающих.
+
+        Args:
+            key: Ключ объединенного вызова
+            params: Параметры tools/call
+
+        Returns:
+            Dict: Ответ от сервера
+        """
+        request_ids: List[int] = []
+        self._flight_request_ids[key] = request_ids
+        SENT_REQUEST_IDS.set(request_ids)
+        try:
+            return await self.send_request("tools/call", params, math.inf, idempotent=True)
+        finally:
+            if self._flight_request_ids.get(key) is request_ids:
+                del self._flight_request_ids[key]
+
+    async def list_tools(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Схема инструментов сервера
+
+        Ответ tools/list запрашивается один раз за время работы сервера.
+        Пока сервер запускается или схема проверяется в фоне, отдается
+        копия с диска от прошлого запуска.
+
+        Args:
+            refresh: Запросить схему у сервера заново
+
+        Returns:
+            List[Dict]: Описания инструментов
+        """
+        cache = self.tools_cache
+        if not refresh and (cache.validated or await cache.aload()):
+            cache.hits += 1
+            if not cache.validated and self.pool:
+                self._schedule_tools_refresh()
+            return cache.tools
+        return await self._refresh_tools(force=refresh)
+
+    async def get_tool(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Описание одного инструмента из закэшированной схемы
+
+        Args:
+            name: Имя инструмента
+
+        Returns:
+            Dict: Описание инструмента или None
+        """
+        for tool in await self.list_tools():
+            if tool.get("name") == name:
+                return tool
+        return None
+
+    async def _refresh_tools(self, force: bool = False) -> List[Dict[str, Any]]:
+        """Запрос tools/list (со всеми страницами) и обновление кэша"""
+        async with self._tools_lock:
+            # Пока ждали блокировку, схему уже получил другой запрос
+            if self.tools_cache.validated and not force:
+                return self.tools_cache.tools
+
+            tools: List[Dict[str, Any]] = []
+            params: Dict[str, Any] = {}
+            while True:
+                response = await self.send_request("tools/list", params)
+                result = response.get("result", {})
+                tools.extend(result.get("tools", []))
+                cursor = result.get("nextCursor")
+                if not cursor:
+                    break
+                params = {"cursor": cursor}
+
+            await self.tools_cache.aupdate(tools)
+            return tools
+
+    def _schedule_tools_refresh(self) -> None:
+        """Фоновая проверка схемы (не больше одной одновременно)"""
+        if self._tools_refresh is None or self._tools_refresh.done():
+            self._tools_refresh = asyncio.get_running_loop().create_task(self._refresh_tools_quietly())
+
+    async def _refresh_tools_quietly(self) -> None:
+        """Фоновое обновление схемы; ошибки не мешают работе с копией с диска"""
+        try:
+            await self._refresh_tools()
+        except Exception:
+            pass
+
+    async def stop_server(self):
+        """Остановка всех процессов пула"""
+        if self._tools_refresh:
+            self._tools_refresh.cancel()
+            self._tools_refresh = None
+        # Новый сервер может оказаться другой версии
+        self.tools_cache.invalidate()
+        if self.supervisor:
+            await self.supervisor.stop()
+            self.supervisor = None
+        if self.pool:
+            await self.pool.stop()
+            print(f"{EMOJIS['stop']} {self.messages['server_stopped']}")
+            self.pool = None
+
+    def pool_stats(self) -> List[Dict[str, Any]]:
+        """Состояние процессов пула (нагрузка, здоровье, ошибки)"""
+        return self.pool.stats() if self.pool else []
+
+    def server_logs(self, limit: int = 50, contains: Optional[str] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Последние строки stderr процессов пула для диагностики
+
+        Args:
+            limit: Максимум строк на процесс
+            contains: Фильтр по подстроке
+
+        Returns:
+            Dict: {номер процесса: записи {"time", "line"}}
+        """
+        return self.pool.recent_stderr(limit, contains) if self.pool else {}
+
+    def supervisor_stats(self) -> Dict[str, Any]:
+        """Счетчики проверок здоровья и перезапусков процессов"""
+        return self.supervisor.stats() if self.supervisor else {}
+
+    def tools_cache_stats(self) -> Dict[str, Any]:
+        """Состояние кэша схемы инструментов"""
+        return self.tools_cache.stats()
+
+    def single_flight_stats(self) -> Dict[str, Any]:
+        """Сколько одинаковых одновременных вызовов объединено"""
+        return self.single_flight.stats()
+
+
+class MCPClientBase:
+    """
+    Синхронная обертка над asyncio клиентом
+
+    Корутины выполняются в общем фоновом event loop, поэтому обертку
+    можно вызывать из любого потока, а запросы разных потоков идут
+    по пулу серверов параллельно.
+    """
+
+    def __init__(self, async_client: AsyncMCPClientBase):
+        """
+        Инициализация обертки
+
+        Args:
+            async_client: Асинхронный клиент, которому делегируются вызовы
+        """
+        self.async_client = async_client
+
+    def _run(self, coro: Coroutine) -> Any:
+        """Выполнение корутины асинхронного клиента в фоновом loop"""
+        return run_sync(coro)
+
+    def start_server(self) -> bool:
+        """
+        Запуск MCP сервера
+
+        Returns:
+            bool: True если сервер успешно запущен
+        """
+        return self._run(self.async_client.start_server())
+
+    def send_request(self, method: str, params: Dict[str, Any],
+                     timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Отправка запроса к MCP серверу
+
+        Args:
+            method: Метод для вызова
+            params: Параметры запроса
+            timeout: Дедлайн в секундах
+
+        Returns:
+            Dict: Ответ от сервера
+        """
+        return self._run(self.async_client.send_request(method, params, timeout))
+
+    def stop_server(self):
+        """Остановка сервера"""
+        self._run(self.async_client.stop_server())
+
+    def list_tools(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Схема инструментов сервера (из кэша, tools/list - один раз за запуск)
+
+        Args:
+            refresh: Запросить схему у сервера заново
+
+        Returns:
+            List[Dict]: Описания инструментов
+        """
+        return self._run(self.async_client.list_tools(refresh))
+
+    def get_tool(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Описание одного инструмента из закэшированной схемы
+
+        Args:
+            name: Имя инструмента
+
+        Returns:
+            Dict: Описание инструмента или None
+        """
+        return self._run(self.async_client.get_tool(name))
+
+    def subscribe(self, method: str, handler: Callable[[Dict[str, Any]], Any]) -> Callable[[], None]:
+        """
+        Подписка на уведомления сервера
+
+        Обработчик вызывается в фоновом потоке event loop.
+
+        Args:
+            method: Метод уведомления
+            handler: Функция, получающая params уведомления
+
+        Returns:
+            Callable: Функция отписки
+        """
+        return self.async_client.subscribe(method, handler)
+
+    def pool_stats(self) -> List[Dict[str, Any]]:
+        """Состояние процессов пула (нагрузка, здоровье, ошибки)"""
+        return self.async_client.pool_stats()
+
+    def server_logs(self, limit: int = 50, contains: Optional[str] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Последние строки stderr процессов пула для диагностики
+
+        Args:
+            limit: Максимум строк на процесс
+            contains: Фильтр по подстроке
+
+        Returns:
+            Dict: {номер процесса: записи {"time", "line"}}
+        """
+        return self._run(self._collect_logs(limit, contains))
+
+    def supervisor_stats(self) -> Dict[str, Any]:
+        """Счетчики проверок здоровья и перезапусков процессов"""
+        return self.async_client.supervisor_stats()
+
+    def tools_cache_stats(self) -> Dict[str, Any]:
+        """Состояние кэша схемы инструментов"""
+        return self.async_client.tools_cache_stats()
+
+    def single_flight_stats(self) -> Dict[str, Any]:
+        """Сколько одинаковых одновременных вызовов объединено"""
+        return self.async_client.single_flight_stats()
+
+    async def _collect_logs(self, limit: int, contains: Optional[str]) -> Dict[int, List[Dict[str, Any]]]:
+        """Снимок буферов stderr внутри event loop"""
+        return self.async_client.server_logs(limit, contains)
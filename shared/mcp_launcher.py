@@ -0,0 +1,214 @@
+# shared/mcp_launcher.py
+"""
+Быстрый запуск MCP серверов: `node <entry>` вместо `npx -y <package>`
+
+npx при каждом запуске заново резолвит пакет и может обращаться к npm кэшу
+или реестру. Здесь точка входа установленного пакета находится один раз,
+сохраняется в локальный манифест и дальше процесс запускается напрямую.
+Если в команде закреплена версия ("<package>@1.2.3"), напрямую запускается
+только установленный пакет этой версии; иначе запуск идет через npx.
+"""
+
+import glob
+import json
+import os
+import shutil
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from config import MCP_LAUNCH_CONFIG
+
+
+# Режимы запуска для метрик холодного/теплого старта
+LAUNCH_COLD = "cold"          # через npx (пакет еще не найден локально)
+LAUNCH_RESOLVED = "resolved"  # точка входа только что найдена и сохранена
+LAUNCH_WARM = "warm"          # точка входа взята из манифеста
+LAUNCH_DIRECT = "direct"      # команда не использует npx
+
+# Кэш `npm root -g` на время жизни процесса
+_npm_global_root: Optional[str] = None
+
+
+def parse_npx_command(command: List[str]) -> Optional[Tuple[str, Optional[str], List[str]]]:
+    """
+    Разбор команды вида ["npx", "-y", "<package>[@<version>]", *args]
+
+    Args:
+        command: Команда запуска сервера
+
+    Returns:
+        Tuple: (имя пакета, версия или None, аргументы сервера) или None
+    """
+    if not command or os.path.basename(command[0]) != "npx":
+        return None
+
+    rest = command[1:]
+    while rest and rest[0].startswith("-"):
+        rest = rest[1:]
+    if not rest:
+        return None
+
+    package, args = rest[0], rest[1:]
+    version = None
+
+    # Отделяем версию: "@scope/name@1.2.3" -> ("@scope/name", "1.2.3"), "name@latest" -> ("name", "latest")
+    version_at = package.rfind("@")
+    if version_at > 0:
+        package, version = package[:version_at], package[version_at + 1:] or None
+
+    return package, version, args
+
+
+def _npm_root() -> Optional[str]:
+    """Каталог глобальных пакетов npm (вычисляется один раз)"""
+    global _npm_global_root
+    if _npm_global_root is None:
+        _npm_global_root = ""
+        if shutil.which("npm"):
+            try:
+                result = subprocess.run(
+                    ["npm", "root", "-g"],
+                    capture_output=True, text=True, timeout=10
+                )
+                _npm_global_root = result.stdout.strip()
+            except (OSError, subprocess.SubprocessError):
+                pass
+    return _npm_global_root or None
+
+
+def _candidate_package_dirs(package: str) -> List[str]:
+    """Возможные каталоги установленного пакета в порядке приоритета"""
+    candidates = [os.path.join(os.getcwd(), "node_modules", package)]
+
+    global_root = _npm_root()
+    if global_root:
+        candidates.append(os.path.join(global_root, package))
+
+    # Кэш npx: ~/.npm/_npx/<hash>/node_modules/<package>, свежие первыми
+    npx_cache = os.path.join(os.path.expanduser("~"), ".npm", "_npx", "*", "node_modules", package)
+    candidates.extend(sorted(glob.glob(npx_cache), key=os.path.getmtime, reverse=True))
+
+    return candidates
+
+
+def _read_package_json(package_dir: str) -> Optional[Dict]:
+    """package.json установленного пакета или None"""
+    try:
+        with open(os.path.join(package_dir, "package.json"), encoding="utf-8") as f:
+            package_json = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return package_json if isinstance(package_json, dict) else None
+
+
+def _version_matches(package_json: Dict, version: Optional[str]) -> bool:
+    """
+    Установленный пакет подходит под версию из команды
+
+    Тег или диапазон ("latest", "^1.2") локально не проверить - такой
+    пакет не подходит, и запуск идет через npx.
+    """
+    return version is None or package_json.get("version") == version
+
+
+def _read_bin_entry(package_dir: str, package: str, version: Optional[str] = None) -> Optional[str]:
+    """Путь к исполняемому файлу пакета из поля bin в package.json (с проверкой версии)"""
+    package_json = _read_package_json(package_dir)
+    if package_json is None or not _version_matches(package_json, version):
+        return None
+
+    bin_field = package_json.get("bin")
+    if isinstance(bin_field, dict) and bin_field:
+        short_name = package.split("/")[-1]
+        bin_field = bin_field.get(short_name) or next(iter(bin_field.values()))
+
+    if not isinstance(bin_field, str):
+        return None
+
+    entry = os.path.join(package_dir, bin_field)
+    return entry if os.path.isfile(entry) else None
+
+
+def find_package_entry(package: str, version: Optional[str] = None) -> Optional[Tuple[str, str]]:
+    """
+    Поиск точки входа установленного npm пакета
+
+    Args:
+        package: Имя пакета (например, "@openbnb/mcp-server-airbnb")
+        version: Требуемая версия из команды (None - любая)
+
+    Returns:
+        Tuple: (абсолютный путь к JS файлу, каталог пакета) или None,
+            если пакет (нужной версии) не установлен
+    """
+    for package_dir in _candidate_package_dirs(package):
+        entry = _read_bin_entry(package_dir, package, version)
+        if entry:
+            return os.path.abspath(entry), os.path.abspath(package_dir)
+    return None
+
+
+def _load_manifest(path: str) -> Dict[str, Dict]:
+    """Чтение манифеста точек входа"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path: str, manifest: Dict[str, Dict]) -> None:
+    """Атомарная запись манифеста"""
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def resolve_launch_command(command: List[str]) -> Tuple[List[str], str]:
+    """
+    Команда запуска сервера с учетом resolved launch режима
+
+    Args:
+        command: Исходная команда (обычно через npx)
+
+    Returns:
+        Tuple: (команда для запуска, режим запуска)
+    """
+    parsed = parse_npx_command(command)
+    if parsed is None:
+        return command, LAUNCH_DIRECT
+    if not MCP_LAUNCH_CONFIG["resolved_launch"] or not shutil.which("node"):
+        return command, LAUNCH_COLD
+
+    package, version, args = parsed
+    spec = f"{package}@{version}" if version else package
+    manifest_path = MCP_LAUNCH_CONFIG["manifest_path"]
+    manifest = _load_manifest(manifest_path)
+
+    # Теплый старт: точка входа уже известна и файл на месте
+    # (закрепленную версию перепроверяем: пакет могли обновить на месте)
+    known = manifest.get(spec, {})
+    entry = known.get("entry")
+    if entry and os.path.isfile(entry):
+        package_json = _read_package_json(known.get("package_dir", "")) if version else {}
+        if package_json is not None and _version_matches(package_json, version):
+            return ["node", entry, *args], LAUNCH_WARM
+
+    # Ищем установленный пакет нужной версии; если его нет - npx установит, найдем в следующий раз
+    found = find_package_entry(package, version)
+    if not found:
+        return command, LAUNCH_COLD
+
+    entry, package_dir = found
+    manifest[spec] = {
+        "entry": entry,
+        "package_dir": package_dir,
+        "resolved_at": datetime.now().isoformat(timespec="seconds")
+    }
+    _save_manifest(manifest_path, manifest)
+    return ["node", entry, *args], LAUNCH_RESOLVED
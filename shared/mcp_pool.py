@@ -0,0 +1,445 @@
+# shared/mcp_pool.py
+"""
+Пул процессов MCP сервера с балансировкой по нагрузке
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Any, Optional, Callable
+from config import EMOJIS
+from .mcp_transport import MCPTransport, MCPTransportError, MCPTimeoutError, STREAM_LIMIT
+from .mcp_launcher import resolve_launch_command, LAUNCH_DIRECT
+from .mcp_stderr import StderrPump
+from .mcp_router import log_server_message
+from config import MCP_SUPERVISOR_CONFIG
+
+
+# Параметры MCP рукопожатия
+MCP_PROTOCOL_VERSION = "2024-11-05"
+CLIENT_INFO = {"name": "airbnb-travel-assistant", "version": "1.0.0"}
+
+
+class MCPStartupTimeoutError(MCPTransportError):
+    """Сервер не завершил initialize за отведенное время"""
+
+
+class MCPWorker:
+    """Один процесс MCP сервера со своим транспортом и счетчиками"""
+
+    def __init__(self, index: int, command: List[str], env: Optional[Dict[str, str]] = None,
+                 launch_mode: str = LAUNCH_DIRECT,
+                 subscribers: Optional[Dict[str, List[Callable]]] = None,
+                 request_handlers: Optional[Dict[str, Callable]] = None):
+        """
+        Инициализация воркера
+
+        Args:
+            index: Номер воркера в пуле
+            command: Команда запуска MCP сервера
+            env: Переменные окружения процесса (None - унаследовать)
+            launch_mode: Режим запуска (cold, resolved, warm, direct)
+            subscribers: Общая таблица подписчиков на уведомления сервера
+            request_handlers: Общая таблица обработчиков запросов сервера
+        """
+        self.index = index
+        self.command = command
+        self.env = env
+        self.launch_mode = launch_mode
+        self.subscribers = subscribers if subscribers is not None else {}
+        self.request_handlers = request_handlers if request_handlers is not None else {}
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.transport: Optional[MCPTransport] = None
+        self.stderr: Optional[StderrPump] = None
+
+        # Счетчики нагрузки и здоровья
+        self.in_flight = 0
+        self.total_requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.ready = False
+        self.server_info: Dict[str, Any] = {}
+        self.started_at: Optional[float] = None
+        self.time_to_ready: Optional[float] = None
+
+        # Перезапуски (управляет MCPSupervisor и пул)
+        self.restarts = 0
+        self.restart_attempts = 0
+        self.missed_pings = 0
+        self.restart_lock = asyncio.Lock()
+
+    @property
+    def healthy(self) -> bool:
+        """Рукопожатие пройдено, процесс жив и транспорт принимает запросы"""
+        return (
+            self.ready
+            and self.process is not None
+            and self.process.returncode is None
+            and self.transport is not None
+            and not self.transport.closed
+        )
+
+    async def start(self, startup_timeout: float) -> None:
+        """
+        Запуск процесса сервера и MCP рукопожатие
+
+        Воркер считается готовым только после ответа на initialize
+        и отправки notifications/initialized.
+
+        Args:
+            startup_timeout: Дедлайн на запуск и initialize в секундах
+        """
+        self.ready = False
+        self.missed_pings = 0
+        launch_started = time.monotonic()
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self.env,
+            limit=STREAM_LIMIT
+        )
+
+        # Таблицы подписок общие, поэтому переживают перезапуск процесса
+        self.transport = MCPTransport(self.process, self.subscribers, self.request_handlers)
+        self.stderr = StderrPump(self.process.stderr, f"worker {self.index} pid {self.process.pid}")
+
+        try:
+            response = await self.transport.request("initialize", {
+                "protocolVersion": MCP_PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": CLIENT_INFO
+            }, timeout=startup_timeout)
+        except MCPTimeoutError:
+            raise MCPStartupTimeoutError(
+                f"Сервер не ответил на initialize за {startup_timeout} с"
+                f"{self._stderr_tail()}"
+            ) from None
+
+        if "error" in response:
+            raise MCPTransportError(f"Ошибка initialize: {response['error']}")
+
+        await self.transport.notify("notifications/initialized")
+
+        self.server_info = response.get("result", {}).get("serverInfo", {})
+        self.started_at = time.monotonic()
+        self.time_to_ready = self.started_at - launch_started
+        self.consecutive_failures = 0
+        self.ready = True
+
+    def _stderr_tail(self, limit: int = 3) -> str:
+        """Последние строки stderr для сообщений об ошибках"""
+        if not self.stderr:
+            return ""
+        lines = [entry["line"] for entry in self.stderr.recent(limit)]
+        return f" (stderr: {' | '.join(lines)})" if lines else ""
+
+    def recent_stderr(self, limit: int = 50, contains: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Последние строки stderr процесса
+
+        Args:
+            limit: Максимум строк
+            contains: Фильтр по подстроке
+
+        Returns:
+            List[Dict]: Записи {"time", "line"} от старых к новым
+        """
+        return self.stderr.recent(limit, contains) if self.stderr else []
+
+    async def request(self, method: str, params: Dict[str, Any],
+                      timeout: Optional[float] = None,
+                      on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
+        """
+        Отправка запроса с учетом нагрузки и ошибок воркера
+
+        Args:
+            method: Метод для вызова
+            params: Параметры запроса
+            timeout: Дедлайн в секундах
+            on_progress: Обработчик notifications/progress запроса
+
+        Returns:
+            Dict: Ответ от сервера
+        """
+        self.in_flight += 1
+        self.total_requests += 1
+        try:
+            response = await self.transport.request(method, params, timeout, on_progress)
+        except (MCPTransportError, MCPTimeoutError) as e:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = str(e)
+            raise
+        finally:
+            self.in_flight -= 1
+
+        self.consecutive_failures = 0
+        return response
+
+    async def stop(self) -> None:
+        """Остановка процесса сервера"""
+        self.ready = False
+        if self.transport:
+            await self.transport.close()
+            self.transport = None
+        if self.stderr:
+            self.stderr.stop()
+        if self.process:
+            if self.process.returncode is None:
+                self.process.terminate()
+                try:
+                    await asyncio.wait_for(self.process.wait(), 5)
+                except asyncio.TimeoutError:
+                    # Зависший процесс не реагирует на SIGTERM
+                    self.process.kill()
+                    await self.process.wait()
+            self.process = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Текущее состояние воркера"""
+        return {
+            "index": self.index,
+            "pid": self.process.pid if self.process else None,
+            "healthy": self.healthy,
+            "launch_mode": self.launch_mode,
+            "time_to_ready": self.time_to_ready,
+            "in_flight": self.in_flight,
+            "total_requests": self.total_requests,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "restarts": self.restarts,
+            "stderr_lines": self.stderr.total_lines if self.stderr else 0
+        }
+
+
+class MCPServerPool:
+    """
+    Пул из N процессов одного MCP сервера
+
+    Запрос уходит наименее загруженному живому воркеру (меньше всего
+    запросов в полете, при равенстве - меньше всего запросов всего).
+    """
+
+    def __init__(self, command: List[str], size: int = 1, env: Optional[Dict[str, str]] = None,
+                 startup_timeout: float = 10, name: str = "MCP",
+                 subscribers: Optional[Dict[str, List[Callable]]] = None,
+                 request_handlers: Optional[Dict[str, Callable]] = None):
+        """
+        Инициализация пула
+
+        Args:
+            command: Команда запуска MCP сервера
+            size: Количество процессов
+            env: Переменные окружения процессов
+            startup_timeout: Дедлайн на запуск и initialize каждого процесса
+            name: Название сервера для сообщений
+            subscribers: Подписчики на уведомления (общие для всех процессов)
+            request_handlers: Обработчики запросов сервера (общие для всех процессов)
+        """
+        self.command = command
+        self.size = max(1, size)
+        self.env = env
+        self.startup_timeout = startup_timeout
+        self.name = name
+        self.subscribers = subscribers if subscribers is not None else {
+            "notifications/message": [log_server_message]
+        }
+        self.request_handlers = request_handlers if request_handlers is not None else {}
+        self.workers: List[MCPWorker] = []
+        self._restart_tasks: set = set()
+        # После stop() пул не запускает новые процессы (иначе они останутся сиротами)
+        self._stopped = False
+
+    async def start(self) -> int:
+        """
+        Параллельный запуск всех процессов пула
+
+        Returns:
+            int: Количество успешно запущенных воркеров
+        """
+        # Резолв точки входа пакета (файловая система и npm) - вне event loop
+        command, launch_mode = await asyncio.to_thread(resolve_launch_command, self.command)
+        self._stopped = False
+
+        self.workers = [
+            MCPWorker(i, command, self.env, launch_mode, self.subscribers, self.request_handlers)
+            for i in range(self.size)
+        ]
+        results = await asyncio.gather(
+            *[self._start_worker(worker) for worker in self.workers]
+        )
+        return sum(results)
+
+    async def _start_worker(self, worker: MCPWorker) -> bool:
+        """Запуск одного воркера с рукопожатием"""
+        try:
+            await worker.start(self.startup_timeout)
+            server_name = worker.server_info.get("name", "MCP сервер")
+            print(f"{EMOJIS['success']} [{worker.index}] {server_name} готов "
+                  f"({worker.launch_mode} start, {worker.time_to_ready:.2f} с)")
+            return True
+        except Exception as e:
+            worker.last_error = str(e)
+            print(f"{EMOJIS['error']} [{worker.index}] {e}")
+            await worker.stop()
+            return False
+
+    def pick_worker(self) -> MCPWorker:
+        """
+        Выбор наименее загруженного живого воркера
+
+        Returns:
+            MCPWorker: Воркер для следующего запроса
+        """
+        healthy = [worker for worker in self.workers if worker.healthy]
+        if not healthy:
+            raise MCPTransportError("Нет доступных процессов MCP сервера")
+        return min(healthy, key=lambda worker: (worker.in_flight, worker.total_requests))
+
+    async def restart_worker(self, worker: MCPWorker, reason: str) -> bool:
+        """
+        Перезапуск упавшего или зависшего воркера с экспоненциальной задержкой
+
+        Одновременные вызовы для одного воркера выполняют один перезапуск.
+
+        Args:
+            worker: Воркер для перезапуска
+            reason: Причина (для сообщений)
+
+        Returns:
+            bool: True если воркер снова готов
+
+        Raises:
+            MCPTransportError: Пул остановлен (до или во время перезапуска)
+        """
+        self._raise_if_stopped()
+        restarts_before = worker.restarts
+        async with worker.restart_lock:
+            # Пока ждали блокировку, воркер уже перезапустили
+            if worker.restarts != restarts_before and worker.healthy:
+                return True
+
+            attempts = worker.restart_attempts
+            if attempts:
+                delay = min(
+                    MCP_SUPERVISOR_CONFIG["backoff_base"] * 2 ** (attempts - 1),
+                    MCP_SUPERVISOR_CONFIG["backoff_max"]
+                )
+                await asyncio.sleep(delay)
+
+            self._raise_if_stopped()
+            print(f"{EMOJIS['start']} [{worker.index}] Перезапуск {self.name}: {reason}")
+            worker.restart_attempts += 1
+            await worker.stop()
+
+            try:
+                await worker.start(self.startup_timeout)
+            except Exception as e:
+                await worker.stop()
+                # Запуск прерван остановкой пула - это не сбой сервера
+                self._raise_if_stopped()
+                worker.last_error = str(e)
+                print(f"{EMOJIS['error']} [{worker.index}] Перезапуск не удался: {e}")
+                return False
+
+            # stop() прошел, пока процесс запускался: воркера уже нет в пуле
+            if self._stopped:
+                await worker.stop()
+                self._raise_if_stopped()
+
+            worker.restarts += 1
+            print(f"{EMOJIS['success']} [{worker.index}] {self.name} перезапущен "
+                  f"({worker.time_to_ready:.2f} с, перезапусков: {worker.restarts})")
+            return True
+
+    def schedule_restart(self, worker: MCPWorker, reason: str) -> None:
+        """Фоновый перезапуск воркера (не блокирует текущий запрос)"""
+        self._raise_if_stopped()
+        task = asyncio.get_running_loop().create_task(self.restart_worker(worker, reason))
+        self._restart_tasks.add(task)
+        task.add_done_callback(self._forget_restart)
+
+    def _forget_restart(self, task: asyncio.Task) -> None:
+        """Удаление завершенной задачи перезапуска (ошибку никто не ждет)"""
+        self._restart_tasks.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    def _raise_if_stopped(self) -> None:
+        """Ошибка транспорта, если пул уже остановлен"""
+        if self._stopped:
+            raise MCPTransportError(f"Пул {self.name} остановлен")
+
+    async def _acquire_worker(self) -> MCPWorker:
+        """Живой воркер; если живых нет - перезапуск одного из упавших"""
+        self._raise_if_stopped()
+        try:
+            return self.pick_worker()
+        except MCPTransportError:
+            if not self.workers:
+                raise
+        for worker in self.workers:
+            if await self.restart_worker(worker, "нет живых процессов"):
+                return worker
+        raise MCPTransportError(f"Нет доступных процессов {self.name}")
+
+    async def request(self, method: str, params: Dict[str, Any],
+                      timeout: Optional[float] = None, retries: int = 0,
+                      on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
+        """
+        Отправка запроса через наименее загруженный воркер
+
+        Если процесс упал во время запроса, он перезапускается, а запрос
+        повторяется на другом живом воркере (только при retries > 0 -
+        повторять безопасно лишь идемпотентные вызовы).
+
+        Args:
+            method: Метод для вызова
+            params: Параметры запроса
+            timeout: Дедлайн в секундах
+            retries: Сколько раз повторить запрос при падении процесса
+            on_progress: Обработчик notifications/progress запроса
+
+        Returns:
+            Dict: Ответ от сервера
+        """
+        attempt = 0
+        while True:
+            worker = await self._acquire_worker()
+            try:
+                return await worker.request(method, params, timeout, on_progress)
+            except MCPTransportError:
+                if worker.healthy or attempt >= retries or self._stopped:
+                    raise
+                attempt += 1
+                self.schedule_restart(worker, "процесс упал во время запроса")
+
+    async def stop(self) -> None:
+        """Остановка всех процессов пула"""
+        self._stopped = True
+        restarts = list(self._restart_tasks)
+        for task in restarts:
+            task.cancel()
+        # Перезапуск мог успеть создать процесс: дожидаемся отмены, затем останавливаем всех
+        await asyncio.gather(*restarts, return_exceptions=True)
+        await asyncio.gather(*[worker.stop() for worker in self.workers])
+        self.workers = []
+
+    def recent_stderr(self, limit: int = 50, contains: Optional[str] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Последние строки stderr всех воркеров
+
+        Args:
+            limit: Максимум строк на воркер
+            contains: Фильтр по подстроке
+
+        Returns:
+            Dict: {номер воркера: записи {"time", "line"}}
+        """
+        return {worker.index: worker.recent_stderr(limit, contains) for worker in self.workers}
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Состояние всех воркеров пула"""
+        return [worker.stats() for worker in self.workers]
@@ -0,0 +1,251 @@
+# shared/mcp_router.py
+"""
+Маршрутизация входящих JSON-RPC сообщений MCP сервера
+"""
+
+import asyncio
+import inspect
+import logging
+from typing import Dict, List, Any, Optional, Callable, Awaitable
+
+
+logger = logging.getLogger("mcp.router")
+server_logger = logging.getLogger("mcp.server")
+
+# Типы входящих сообщений
+RESPONSE = "response"          # есть id, нет method: ответ на наш запрос
+NOTIFICATION = "notification"  # есть method, нет id: уведомление сервера
+REQUEST = "request"            # есть method и id: запрос сервера к клиенту
+INVALID = "invalid"
+
+# Коды ошибок JSON-RPC
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+# Уровни notifications/message (RFC 5424) -> уровни logging
+LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "notice": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "critical": logging.CRITICAL,
+    "alert": logging.CRITICAL,
+    "emergency": logging.CRITICAL
+}
+
+
+def classify_message(message: Any) -> str:
+    """
+    Определение типа входящего сообщения
+
+    Args:
+        message: Разобранный JSON
+
+    Returns:
+        str: response, notification, request или invalid
+    """
+    if not isinstance(message, dict):
+        return INVALID
+
+    has_id = message.get("id") is not None
+    if "method" in message:
+        return REQUEST if has_id else NOTIFICATION
+    if has_id and ("result" in message or "error" in message):
+        return RESPONSE
+    return INVALID
+
+
+def log_server_message(params: Dict[str, Any]) -> None:
+    """
+    Пересылка notifications/message сервера в logger "mcp.server"
+
+    Args:
+        params: Параметры уведомления (level, logger, data)
+    """
+    level = LOG_LEVELS.get(params.get("level"), logging.INFO)
+    source = params.get("logger")
+    data = params.get("data")
+    server_logger.log(level, f"[{source}] {data}" if source else str(data))
+
+
+def _pong(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Ответ на ping сервера"""
+    return {}
+
+
+class MessageRouter:
+    """
+    Раскладывает сообщения сервера по получателям
+
+    Ответы уходят в Future ожидающего запроса, уведомления - подписчикам
+    (прогресс - по progressToken), запросы сервера - зарегистрированным
+    обработчикам, результат которых отправляется обратно как ответ.
+
+    Таблицы подписчиков и обработчиков можно передать снаружи: тогда
+    несколько роутеров (процессы пула, в том числе перезапущенные)
+    используют одни и те же подписки.
+    """
+
+    def __init__(self, reply: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+                 subscribers: Optional[Dict[str, List[Callable]]] = None,
+                 request_handlers: Optional[Dict[str, Callable]] = None):
+        """
+        Инициализация таблиц маршрутизации
+
+        Args:
+            reply: Корутина отправки ответа серверу (для запросов сервера)
+            subscribers: Общая таблица {метод уведомления: обработчики}
+            request_handlers: Общая таблица {метод запроса сервера: обработчик}
+        """
+        self.reply = reply
+        self._pending: Dict[Any, asyncio.Future] = {}
+        self._subscribers = subscribers if subscribers is not None else {}
+        self._progress: Dict[Any, Callable] = {}
+        self._request_handlers = request_handlers if request_handlers is not None else {}
+        self._request_handlers.setdefault("ping", _pong)
+        self._background: set = set()
+
+    # --- Ожидающие ответы ---
+
+    def expect_response(self, request_id: Any) -> asyncio.Future:
+        """Future для ответа на запрос с указанным id"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        return future
+
+    def discard(self, request_id: Any) -> None:
+        """Удаление ожидания (ответ получен, дедлайн истек или запрос отменен)"""
+        self._pending.pop(request_id, None)
+
+    def fail_all(self, error: Exception) -> None:
+        """Завершение всех ожидающих запросов ошибкой"""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    # --- Подписки ---
+
+    def subscribe(self, method: str, handler: Callable[[Dict[str, Any]], Any]) -> Callable[[], None]:
+        """
+        Подписка на уведомления сервера
+
+        Args:
+            method: Метод уведомления (например, "notifications/message")
+            handler: Функция или корутина, получающая params уведомления
+
+        Returns:
+            Callable: Функция отписки
+        """
+        self._subscribers.setdefault(method, []).append(handler)
+
+        def unsubscribe():
+            handlers = self._subscribers.get(method, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+        return unsubscribe
+
+    def watch_progress(self, token: Any, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """Доставка notifications/progress с указанным progressToken в handler"""
+        self._progress[token] = handler
+
+    def unwatch_progress(self, token: Any) -> None:
+        """Прекращение доставки прогресса по токену"""
+        self._progress.pop(token, None)
+
+    def handle_requests(self, method: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Обработчик запросов сервера к клиенту
+
+        Args:
+            method: Метод запроса (например, "roots/list")
+            handler: Функция или корутина, возвращающая result ответа
+        """
+        self._request_handlers[method] = handler
+
+    # --- Доставка ---
+
+    def route(self, message: Any) -> str:
+        """
+        Доставка одного входящего сообщения (не блокирует чтение stdout)
+
+        Args:
+            message: Разобранный JSON от сервера (объект или batch-массив)
+
+        Returns:
+            str: Тип сообщения
+        """
+        if isinstance(message, list):
+            for item in message:
+                self.route(item)
+            return "batch"
+
+        kind = classify_message(message)
+
+        if kind == RESPONSE:
+            future = self._pending.get(message["id"])
+            if future is not None and not future.done():
+                future.set_result(message)
+        elif kind == NOTIFICATION:
+            self._deliver_notification(message["method"], message.get("params") or {})
+        elif kind == REQUEST:
+            self._run_background(self._answer_request(message))
+        else:
+            logger.debug("Пропущено сообщение неизвестного формата: %r", message)
+
+        return kind
+
+    def _deliver_notification(self, method: str, params: Dict[str, Any]) -> None:
+        """Передача уведомления подписчикам"""
+        handlers = list(self._subscribers.get(method, []))
+
+        if method == "notifications/progress":
+            progress_handler = self._progress.get(params.get("progressToken"))
+            if progress_handler:
+                handlers.append(progress_handler)
+
+        for handler in handlers:
+            self._call_handler(handler, params)
+
+    def _call_handler(self, handler: Callable, params: Dict[str, Any]) -> None:
+        """Вызов подписчика; ошибка подписчика не ломает чтение stdout"""
+        try:
+            result = handler(params)
+        except Exception:
+            logger.exception("Ошибка обработчика уведомления MCP")
+            return
+
+        if inspect.isawaitable(result):
+            self._run_background(result)
+
+    def _run_background(self, awaitable: Awaitable) -> None:
+        """Запуск корутины в фоне с удержанием ссылки до завершения"""
+        task = asyncio.ensure_future(awaitable)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _answer_request(self, message: Dict[str, Any]) -> None:
+        """Выполнение запроса сервера и отправка ответа"""
+        response = {"jsonrpc": "2.0", "id": message["id"]}
+        handler = self._request_handlers.get(message["method"])
+
+        if handler is None:
+            response["error"] = {
+                "code": METHOD_NOT_FOUND,
+                "message": f"Method not found: {message['method']}"
+            }
+        else:
+            try:
+                result = handler(message.get("params") or {})
+                if inspect.isawaitable(result):
+                    result = await result
+                response["result"] = result if result is not None else {}
+            except Exception as e:
+                response["error"] = {"code": INTERNAL_ERROR, "message": str(e)}
+
+        if self.reply:
+            try:
+                await self.reply(response)
+            except (ConnectionError, OSError):
+                pass
@@ -0,0 +1,91 @@
+# shared/mcp_stderr.py
+"""
+Фоновое чтение stderr MCP сервера в ограниченный кольцевой буфер
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, List, Any, Optional
+from config import MCP_STDERR_CONFIG
+
+
+logger = logging.getLogger("mcp.stderr")
+
+
+class StderrPump:
+    """
+    Постоянно вычитывает stderr процесса, чтобы сервер не блокировался
+    на записи в заполненный pipe
+
+    Последние строки хранятся в кольцевом буфере фиксированного размера
+    и при необходимости пересылаются в logging.
+    """
+
+    def __init__(self, stream: asyncio.StreamReader, source: str,
+                 buffer_lines: int = None, forward_to_logging: bool = None):
+        """
+        Инициализация и запуск фоновой задачи (вызывать внутри event loop)
+
+        Args:
+            stream: stderr процесса
+            source: Метка источника для логов (например, "airbnb[0] pid=123")
+            buffer_lines: Размер кольцевого буфера (по умолчанию из конфига)
+            forward_to_logging: Пересылать строки в logger "mcp.stderr"
+        """
+        self.stream = stream
+        self.source = source
+        self.max_line_length = MCP_STDERR_CONFIG["max_line_length"]
+        self.forward_to_logging = (
+            MCP_STDERR_CONFIG["forward_to_logging"] if forward_to_logging is None else forward_to_logging
+        )
+        self.lines: deque = deque(maxlen=buffer_lines or MCP_STDERR_CONFIG["buffer_lines"])
+        self.total_lines = 0
+
+        self._task = asyncio.create_task(self._pump())
+
+    async def _pump(self) -> None:
+        """Чтение stderr до закрытия потока"""
+        while True:
+            try:
+                raw = await self.stream.readline()
+            except ValueError:
+                # Строка длиннее лимита StreamReader: буфер уже сброшен, читаем дальше
+                continue
+            except OSError:
+                break
+
+            if not raw:
+                break
+
+            # Обрезаем длинные строки, чтобы буфер был ограничен и по памяти
+            line = raw[:self.max_line_length].decode("utf-8", "replace").rstrip()
+            if not line:
+                continue
+
+            self.lines.append({"time": time.time(), "line": line})
+            self.total_lines += 1
+
+            if self.forward_to_logging:
+                logger.info(line, extra={"mcp_source": self.source})
+
+    def recent(self, limit: int = 50, contains: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Последние строки stderr
+
+        Args:
+            limit: Максимум строк
+            contains: Фильтр по подстроке
+
+        Returns:
+            List[Dict]: Записи {"time", "line"} от старых к новым
+        """
+        entries = list(self.lines)
+        if contains:
+            entries = [entry for entry in entries if contains in entry["line"]]
+        return entries[-limit:] if limit else entries
+
+    def stop(self) -> None:
+        """Остановка фоновой задачи"""
+        self._task.cancel()
@@ -0,0 +1,99 @@
+# shared/mcp_supervisor.py
+"""
+Супервизор пула MCP серверов: проверки здоровья и автоперезапуск
+"""
+
+import asyncio
+from typing import Dict, Any, Optional
+from config import MCP_SUPERVISOR_CONFIG
+from .mcp_pool import MCPServerPool, MCPWorker
+from .mcp_transport import MCPTransportError, MCPTimeoutError
+
+
+class MCPSupervisor:
+    """
+    Фоновая проверка здоровья воркеров пула
+
+    Каждые health_interval секунд живым воркерам отправляется MCP ping
+    с дедлайном. Упавший процесс перезапускается сразу, а процесс,
+    пропустивший max_missed_pings ответов подряд, считается зависшим
+    и тоже перезапускается (задержка между попытками растет экспоненциально).
+    """
+
+    def __init__(self, pool: MCPServerPool, config: Optional[Dict[str, Any]] = None):
+        """
+        Инициализация супервизора
+
+        Args:
+            pool: Пул процессов под наблюдением
+            config: Настройки (по умолчанию MCP_SUPERVISOR_CONFIG)
+        """
+        self.pool = pool
+        self.config = config or MCP_SUPERVISOR_CONFIG
+        self.checks = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Запуск фоновых проверок (вызывать внутри event loop)"""
+        if self.config["enabled"] and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановка фоновых проверок"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Цикл проверок здоровья"""
+        while True:
+            await asyncio.sleep(self.config["health_interval"])
+            try:
+                await self.check_all()
+            except MCPTransportError:
+                # Пул остановлен: перезапускать больше нечего
+                return
+
+    async def check_all(self) -> None:
+        """Одна проверка всех воркеров пула"""
+        self.checks += 1
+        await asyncio.gather(*[self._check_worker(worker) for worker in self.pool.workers])
+
+    async def _check_worker(self, worker: MCPWorker) -> None:
+        """Проверка одного воркера и перезапуск при необходимости"""
+        if worker.restart_lock.locked():
+            # Воркер уже перезапускается
+            return
+
+        if not worker.healthy:
+            await self.pool.restart_worker(worker, "процесс не отвечает или завершился")
+            return
+
+        try:
+            await worker.transport.request("ping", {}, self.config["health_timeout"])
+        except MCPTimeoutError:
+            worker.missed_pings += 1
+            if worker.missed_pings >= self.config["max_missed_pings"]:
+                await self.pool.restart_worker(
+                    worker, f"нет ответа на ping {worker.missed_pings} раз подряд"
+                )
+            return
+        except MCPTransportError:
+            await self.pool.restart_worker(worker, "соединение потеряно")
+            return
+
+        # Воркер отвечает: сбрасываем счетчики неудач
+        worker.missed_pings = 0
+        worker.restart_attempts = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики проверок и перезапусков"""
+        return {
+            "checks": self.checks,
+            "restarts": sum(worker.restarts for worker in self.pool.workers),
+            "restarts_by_worker": {worker.index: worker.restarts for worker in self.pool.workers}
+        }
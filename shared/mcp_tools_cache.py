@@ -0,0 +1,155 @@
+# shared/mcp_tools_cache.py
+"""
+Кэш схемы инструментов MCP сервера (tools/list) в памяти и на диске
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Any, Optional
+from config import MCP_TOOLS_CACHE_CONFIG
+
+
+def tools_hash(tools: List[Dict[str, Any]]) -> str:
+    """
+    Хэш содержимого схемы, не зависящий от порядка ключей
+
+    Args:
+        tools: Список инструментов из ответа tools/list
+
+    Returns:
+        str: sha256 канонического JSON
+    """
+    canonical = json.dumps(tools, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _load_entries(path: str) -> Dict[str, Dict]:
+    """Чтение файла кэша"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_entries(path: str, entries: Dict[str, Dict]) -> None:
+    """Атомарная запись файла кэша"""
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+class ToolSchemaCache:
+    """
+    Схема инструментов одного MCP сервера
+
+    Схема запрашивается у сервера один раз за время его работы (validated),
+    а до этого отдается копия с диска от прошлого запуска. Новая схема
+    сравнивается с сохраненной по хэшу и перезаписывается только при изменении.
+    Корутины используют aload/aupdate: файл читается и пишется в потоке,
+    чтобы не блокировать общий event loop.
+    """
+
+    def __init__(self, server_key: str, path: Optional[str] = None):
+        """
+        Инициализация кэша
+
+        Args:
+            server_key: Ключ сервера в файле кэша (команда запуска)
+            path: Путь к файлу кэша (по умолчанию из конфига)
+        """
+        self.server_key = server_key
+        self.path = path or MCP_TOOLS_CACHE_CONFIG["path"]
+        self.enabled = MCP_TOOLS_CACHE_CONFIG["enabled"]
+        self.tools: Optional[List[Dict[str, Any]]] = None
+        self.hash: Optional[str] = None
+        self.validated = False
+        self.hits = 0
+        self.fetches = 0
+
+    def load(self) -> bool:
+        """
+        Загрузка схемы с диска, если в памяти ее еще нет
+
+        Returns:
+            bool: True если схема доступна
+        """
+        if self.tools is None and self.enabled:
+            self._apply_entry(_load_entries(self.path).get(self.server_key))
+        return self.tools is not None
+
+    async def aload(self) -> bool:
+        """load для корутин (файл читается вне event loop)"""
+        if self.tools is None and self.enabled:
+            entries = await asyncio.to_thread(_load_entries, self.path)
+            # Пока читали файл, схему могли получить от сервера
+            if self.tools is None:
+                self._apply_entry(entries.get(self.server_key))
+        return self.tools is not None
+
+    def update(self, tools: List[Dict[str, Any]]) -> bool:
+        """
+        Схема, только что полученная от сервера
+
+        Args:
+            tools: Список инструментов
+
+        Returns:
+            bool: True если схема отличается от закэшированной
+        """
+        changed = self._accept(tools)
+        if changed and self.enabled:
+            self._save(tools, self.hash)
+        return changed
+
+    async def aupdate(self, tools: List[Dict[str, Any]]) -> bool:
+        """update для корутин (файл пишется вне event loop)"""
+        changed = self._accept(tools)
+        if changed and self.enabled:
+            await asyncio.to_thread(self._save, tools, self.hash)
+        return changed
+
+    def _apply_entry(self, entry: Optional[Dict[str, Any]]) -> None:
+        """Схема из файла, если ее хэш сходится с содержимым"""
+        if entry and tools_hash(entry.get("tools", [])) == entry.get("hash"):
+            self.tools = entry["tools"]
+            self.hash = entry["hash"]
+
+    def _accept(self, tools: List[Dict[str, Any]]) -> bool:
+        """Схема от сервера в памяти; True если она изменилась"""
+        self.fetches += 1
+        new_hash = tools_hash(tools)
+        changed = new_hash != self.hash
+
+        self.tools = tools
+        self.hash = new_hash
+        self.validated = True
+        return changed
+
+    def _save(self, tools: List[Dict[str, Any]], tools_hash_value: str) -> None:
+        """Запись схемы сервера в файл (остальные серверы сохраняются)"""
+        entries = _load_entries(self.path)
+        entries[self.server_key] = {"hash": tools_hash_value, "tools": tools, "saved_at": time.time()}
+        _save_entries(self.path, entries)
+
+    def invalidate(self) -> None:
+        """Схема могла измениться: при следующем обращении запросить заново"""
+        self.validated = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики обращений к кэшу"""
+        return {
+            "validated": self.validated,
+            "hash": self.hash,
+            "tools": len(self.tools or []),
+            "hits": self.hits,
+            "fetches": self.fetches
+        }
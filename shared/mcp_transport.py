@@ -0,0 +1,201 @@
+# shared/mcp_transport.py
+"""
+Мультиплексированный JSON-RPC транспорт для MCP серверов
+"""
+
+import asyncio
+import itertools
+from contextvars import ContextVar
+from typing import Dict, List, Any, Optional, Callable
+from .mcp_router import MessageRouter
+from .json_codec import loads, dumps_line, JSONDecodeError
+
+
+# Лимит буфера чтения stdout: ответы с деталями листингов занимают сотни КБ
+STREAM_LIMIT = 16 * 1024 * 1024
+
+# Список, в который request() добавляет id запросов, отправленных текущей задачей
+# (по нему объединенные вызовы сообщают id общего запроса в ошибке таймаута)
+SENT_REQUEST_IDS: ContextVar[Optional[List[int]]] = ContextVar("sent_request_ids", default=None)
+
+
+class MCPError(Exception):
+    """Базовая ошибка вызова MCP сервера: транспорт, дедлайн или квота API"""
+
+
+class MCPTransportError(MCPError, RuntimeError):
+    """Ошибка транспорта: сервер не запущен или соединение потеряно"""
+
+
+class MCPTimeoutError(MCPError, TimeoutError):
+    """Сервер не ответил на запрос до дедлайна (запрос отменен)"""
+
+    def __init__(self, method: str, request_id: int, timeout: float):
+        super().__init__(f"{method} (id={request_id}) не ответил за {timeout} с")
+        self.method = method
+        self.request_id = request_id
+        self.timeout = timeout
+
+
+class MCPTransport:
+    """
+    JSON-RPC транспорт поверх stdin/stdout процесса MCP сервера
+
+    Каждый запрос получает уникальный id и свой Future в таблице ожидающих
+    запросов. Фоновая задача читает stdout и через MessageRouter передает
+    ответы ожидающим, уведомления - подписчикам, а на запросы сервера
+    отвечает, поэтому по одному процессу можно слать много запросов
+    одновременно.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process,
+                 subscribers: Optional[Dict[str, List[Callable]]] = None,
+                 request_handlers: Optional[Dict[str, Callable]] = None):
+        """
+        Инициализация транспорта (вызывать внутри event loop)
+
+        Args:
+            process: Процесс MCP сервера из asyncio.create_subprocess_exec
+            subscribers: Общая таблица подписчиков на уведомления
+            request_handlers: Общая таблица обработчиков запросов сервера
+        """
+        self.process = process
+        self._ids = itertools.count(1)
+        self.router = MessageRouter(self._write, subscribers, request_handlers)
+        self._write_lock = asyncio.Lock()
+        self._closed = False
+        self._background: set = set()
+
+        self._reader = asyncio.create_task(self._read_loop())
+
+    @property
+    def closed(self) -> bool:
+        """Транспорт закрыт или сервер завершил соединение"""
+        return self._closed
+
+    async def request(self, method: str, params: Dict[str, Any],
+                      timeout: Optional[float] = None,
+                      on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
+        """
+        Отправка запроса и ожидание ответа
+
+        Если ответ не пришел до дедлайна или ожидающая задача отменена,
+        серверу отправляется notifications/cancelled для этого id.
+
+        Args:
+            method: Метод для вызова
+            params: Параметры запроса
+            timeout: Дедлайн в секундах (None - ждать без ограничения)
+            on_progress: Обработчик notifications/progress для этого запроса
+
+        Returns:
+            Dict: Ответ от сервера
+        """
+        if self._closed:
+            raise MCPTransportError("Соединение с сервером закрыто")
+
+        request_id = next(self._ids)
+        future = self.router.expect_response(request_id)
+        sent_ids = SENT_REQUEST_IDS.get()
+        if sent_ids is not None:
+            sent_ids.append(request_id)
+
+        if on_progress is not None:
+            # progressToken совпадает с id запроса
+            params = {**params, "_meta": {**params.get("_meta", {}), "progressToken": request_id}}
+            self.router.watch_progress(request_id, on_progress)
+
+        request = {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": method,
+            "params": params
+        }
+
+        try:
+            await self._write(request)
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self._cancel_remote(request_id, f"Дедлайн {timeout} с истек")
+            raise MCPTimeoutError(method, request_id, timeout) from None
+        except asyncio.CancelledError:
+            self._cancel_remote(request_id, "Запрос отменен клиентом")
+            raise
+        except (ConnectionError, OSError) as e:
+            raise MCPTransportError(f"Не удалось отправить запрос: {e}") from e
+        finally:
+            self.router.discard(request_id)
+            self.router.unwatch_progress(request_id)
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Отправка уведомления (без id, ответ не ожидается)
+
+        Args:
+            method: Метод уведомления
+            params: Параметры уведомления
+        """
+        notification = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            notification["params"] = params
+        await self._write(notification)
+
+    def _cancel_remote(self, request_id: int, reason: str) -> None:
+        """Фоновая отправка notifications/cancelled для брошенного запроса"""
+        if self._closed:
+            return
+
+        async def send_cancel():
+            try:
+                await self.notify("notifications/cancelled", {
+                    "requestId": request_id,
+                    "reason": reason
+                })
+            except (ConnectionError, OSError):
+                pass
+
+        task = asyncio.get_running_loop().create_task(send_cancel())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def close(self) -> None:
+        """Закрытие транспорта и отмена всех ожидающих запросов"""
+        self._reader.cancel()
+        self._fail_pending(MCPTransportError("Транспорт закрыт"))
+
+    async def _write(self, message: Dict[str, Any]) -> None:
+        """Запись одного сообщения в stdin сервера"""
+        line = dumps_line(message)
+        async with self._write_lock:
+            self.process.stdin.write(line)
+            await self.process.stdin.drain()
+
+    async def _read_loop(self) -> None:
+        """Фоновое чтение stdout и маршрутизация входящих сообщений"""
+        try:
+            while True:
+                # Строка читается как bytes и разбирается без декодирования в str
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+
+                if line.isspace():
+                    continue
+
+                try:
+                    message = loads(line)
+                except JSONDecodeError:
+                    # Посторонний вывод сервера в stdout пропускаем
+                    continue
+
+                self.router.route(message)
+        except (ValueError, OSError):
+            # stdout закрыт при остановке процесса
+            pass
+
+        self._fail_pending(MCPTransportError("Сервер закрыл соединение"))
+
+    def _fail_pending(self, error: Exception) -> None:
+        """Завершение всех ожидающих запросов ошибкой"""
+        self._closed = True
+        self.router.fail_all(error)
@@ -0,0 +1,240 @@
+# shared/rate_limiter.py
+"""
+Ограничение частоты запросов к платным API: token bucket, адаптивный
+параллелизм (AIMD) и дневная квота
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+from .mcp_transport import MCPError
+
+# Исходы запроса для подстройки параллелизма
+OUTCOME_OK = "ok"
+OUTCOME_THROTTLED = "throttled"  # 429 / превышен лимит API
+OUTCOME_ERROR = "error"          # таймаут, 5xx, потеря соединения
+
+
+class DailyQuotaExceeded(MCPError, RuntimeError):
+    """Дневная квота запросов исчерпана"""
+
+
+class AdaptiveRateLimiter:
+    """
+    Пропускает запросы не чаще rate в секунду (с запасом burst) и не более
+    limit одновременно
+
+    limit растет на 1 за каждые limit успешных ответов подряд (аддитивно)
+    и уменьшается в несколько раз при 429 или ошибках (мультипликативно).
+    После 429 новые запросы ждут throttle_cooldown секунд.
+
+    Израсходованная квота считается в памяти и сохраняется в quota_store
+    не чаще раза в quota_flush_interval секунд (и при close) в потоке,
+    а не при каждом запросе в event loop. Квота резервируется вместе со слотом
+    параллелизма, поэтому одновременные запросы не превышают ее; резерв
+    возвращается, если запрос отменен до отправки.
+    """
+
+    def __init__(self, rate: float, burst: int, max_concurrency: int, min_concurrency: int = 1,
+                 daily_quota: Optional[int] = None, throttle_cooldown: float = 2.0,
+                 throttle_factor: float = 0.5, error_factor: float = 0.75, quota_store=None,
+                 quota_flush_interval: float = 5.0):
+        """
+        Инициализация лимитера
+
+        Args:
+            rate: Токенов в секунду
+            burst: Емкость ведра токенов
+            max_concurrency: Верхняя граница параллелизма (и начальное значение)
+            min_concurrency: Нижняя граница параллелизма
+            daily_quota: Запросов в сутки (UTC), None - без ограничения
+            throttle_cooldown: Пауза после 429, секунд
+            throttle_factor: Множитель параллелизма при 429
+            error_factor: Множитель параллелизма при ошибке
+            quota_store: Кэш с get/set для учета квоты между перезапусками
+            quota_flush_interval: Секунд между сохранениями счетчика квоты
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.daily_quota = daily_quota
+        self.throttle_cooldown = throttle_cooldown
+        self.throttle_factor = throttle_factor
+        self.error_factor = error_factor
+        self.quota_store = quota_store
+        self.quota_flush_interval = quota_flush_interval
+
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+
+        self._day = self._today()
+        self.used_today = self._load_usage(self._day)
+        self._flushed = self.used_today
+        self._reserved = 0
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.waited = 0.0
+
+    @staticmethod
+    def _today() -> str:
+        """Текущие сутки квоты (UTC)"""
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def _load_usage(self, day: str) -> int:
+        """Израсходованная за сутки квота из хранилища"""
+        if self.quota_store is None:
+            return 0
+        return self.quota_store.get(f"quota:{day}") or 0
+
+    def _save_usage(self, day: str, used: int) -> None:
+        """Запись израсходованной за сутки квоты в хранилище"""
+        self.quota_store.set(f"quota:{day}", used, ttl=2 * 24 * 3600)
+
+    async def _roll_day(self) -> None:
+        """Сброс счетчика квоты в новых сутках (хранилище читается вне event loop)"""
+        today = self._today()
+        if today == self._day:
+            return
+
+        previous_day, previous_used, previous_flushed = self._day, self.used_today, self._flushed
+        self._day = today
+        self.used_today = 0
+        self._flushed = 0
+        if self.quota_store is None:
+            return
+
+        if previous_used != previous_flushed:
+            await asyncio.to_thread(self._save_usage, previous_day, previous_used)
+        loaded = await asyncio.to_thread(self._load_usage, today)
+        if self._day == today:
+            # Запросы, пропущенные пока читали хранилище, остаются в счетчике
+            self.used_today += loaded
+            self._flushed += loaded
+
+    def _schedule_flush(self) -> None:
+        """Отложенное сохранение счетчика квоты (одно на интервал)"""
+        if self.quota_store is None or self._flush_task is not None:
+            return
+
+        async def flush_later():
+            try:
+                await asyncio.sleep(self.quota_flush_interval)
+            finally:
+                self._flush_task = None
+            await self.flush()
+
+        self._flush_task = asyncio.get_running_loop().create_task(flush_later())
+
+    async def flush(self) -> None:
+        """Сохранение израсходованной квоты, если она изменилась (в потоке)"""
+        if self.quota_store is None or self.used_today == self._flushed:
+            return
+        day, used = self._day, self.used_today
+        await asyncio.to_thread(self._save_usage, day, used)
+        if self._day == day:
+            self._flushed = max(self._flushed, used)
+
+    async def close(self) -> None:
+        """Отмена отложенного сохранения и запись счетчика квоты"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+    async def acquire(self) -> None:
+        """
+        Ожидание права на запрос
+
+        Raises:
+            DailyQuotaExceeded: Квота на сутки исчерпана
+        """
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        started = time.monotonic()
+
+        await self._roll_day()
+        self._check_quota()
+
+        async with self._condition:
+            # Слот параллелизма и резерв квоты берутся вместе
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self._check_quota()
+            self.in_flight += 1
+            self._reserved += 1
+
+        # Токен (и пауза после 429)
+        try:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+                self._refilled_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+        except BaseException:
+            self._reserved -= 1
+            await self._free_slot()
+            raise
+
+        self._reserved -= 1
+        self.used_today += 1
+        self.requests += 1
+        self._schedule_flush()
+        self.waited += time.monotonic() - started
+
+    def _check_quota(self) -> None:
+        """Проверка квоты с учетом резерва запросов, ждущих токен"""
+        if self.daily_quota is not None and self.used_today + self._reserved >= self.daily_quota:
+            raise DailyQuotaExceeded(f"Исчерпана дневная квота: {self.daily_quota} запросов")
+
+    async def release(self, outcome: str = OUTCOME_OK) -> None:
+        """
+        Освобождение слота и подстройка параллелизма по исходу запроса
+
+        Args:
+            outcome: OUTCOME_OK, OUTCOME_THROTTLED или OUTCOME_ERROR
+        """
+        if outcome == OUTCOME_THROTTLED:
+            self.throttled += 1
+            self.limit = max(self.min_concurrency, self.limit * self.throttle_factor)
+            self._paused_until = time.monotonic() + self.throttle_cooldown
+            self._tokens = 0
+        elif outcome == OUTCOME_ERROR:
+            self.errors += 1
+            self.limit = max(self.min_concurrency, self.limit * self.error_factor)
+        else:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+        await self._free_slot()
+
+    async def _free_slot(self) -> None:
+        """Освобождение слота параллелизма и пробуждение ожидающих"""
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Состояние лимитера"""
+        return {
+            "concurrency_limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "used_today": self.used_today,
+            "daily_quota": self.daily_quota,
+            "total_wait": round(self.waited, 2)
+        }
@@ -0,0 +1,79 @@
+# shared/single_flight.py
+"""
+Объединение одинаковых одновременных запросов в один (single-flight)
+"""
+
+import asyncio
+from typing import Dict, Any, Awaitable, Callable, Optional
+
+
+class SingleFlight:
+    """
+    Одинаковые вызовы, пришедшие пока первый еще выполняется,
+    не отправляются повторно, а ждут его результат (или ошибку)
+
+    Общий вызов выполняется отдельной задачей: отмена или таймаут одного
+    из ожидающих не прерывает запрос для остальных. Когда уходит последний
+    ожидающий, общий вызов отменяется - его результат больше никому не нужен.
+    """
+
+    def __init__(self):
+        """Инициализация пустой таблицы вызовов в полете"""
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.calls = 0
+        self.absorbed = 0
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]],
+                 timeout: Optional[float] = None) -> Any:
+        """
+        Выполнение вызова или присоединение к такому же уже идущему
+
+        Args:
+            key: Ключ вызова (одинаковый для одинаковых запросов)
+            call: Фабрика корутины запроса
+            timeout: Сколько ждать результат этому вызывающему, в секундах
+                (None - без ограничения)
+
+        Returns:
+            Any: Результат общего вызова
+
+        Raises:
+            asyncio.TimeoutError: Результат не получен за timeout
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.get_running_loop().create_task(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.absorbed += 1
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if self._waiters[task] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """Удаление завершенного вызова из таблицы"""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Ошибку уже получили ожидающие; иначе asyncio предупредит о ней
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики отправленных и поглощенных вызовов"""
+        return {
+            "calls": self.calls,
+            "absorbed": self.absorbed,
+            "in_flight": len(self._in_flight)
+        }
@@ -58,7 +58,7 @@ def render_main_interface(session_manager, search_form, results_display, ai_anal
         results_display.render(st.session_state.listings, session_manager.perform_analysis)
     
     # AI анализ и TripAdvisor
-    if st.session_state.get('report'):
+    if st.session_state.get('report') or st.session_state.get('report_pending'):
         ai_analysis.render()
 
 
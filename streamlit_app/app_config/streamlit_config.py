@@ -11,6 +11,21 @@ STREAMLIT_CONFIG = {
     "initial_sidebar_state": "collapsed"
 }
 
+# Общие для всех сессий MCP серверы
+SHARED_SERVICES_CONFIG = {
+    "idle_shutdown": 300  # секунд без активных сессий до остановки серверов
+}
+
+# Фоновая подготовка отчетов TripAdvisor после AI анализа жилья
+TRIPADVISOR_PRECOMPUTE_CONFIG = {
+    "enabled": False  # значение переключателя в sidebar по умолчанию (расходует квоту API и токены)
+}
+
+# Вывод отчетов по мере генерации
+STREAM_RENDER_CONFIG = {
+    "min_interval": 0.1  # секунд между перерисовками HTML контейнера отчета
+}
+
 # Примеры запросов для демонстрации
 EXAMPLE_QUERIES = [
     "Нужно жилье в Киеве на выходные для двоих",
@@ -19,12 +19,14 @@ class AIAnalysis:
     
     def render(self):
         """Основной рендер AI анализа"""
-        if not st.session_state.get('report'):
+        if not st.session_state.get('report') and not st.session_state.get('report_pending'):
             return
         
         st.markdown("---")
         st.subheader("🤖 Детальный анализ жилья")
         
+        run_full_report = self.tripadvisor_tabs.render_full_report_button()
+        
         # Создание вкладок
         tabs = st.tabs([
             "🏠 AI Анализ жилья", 
@@ -53,11 +55,22 @@ class AIAnalysis:
         
         with tabs[5]:
             self._render_map_tab()
+        
+        # Вкладки уже отрисованы: полный отчет заполняет их по мере готовности
+        if run_full_report:
+            self.tripadvisor_tabs.run_full_report()
     
     def _render_ai_report(self):
         """Рендер AI отчета о жилье"""
         st.markdown("### 📋 Детальный отчет от ИИ")
         
+        # Новый отчет выводится по мере генерации, готовый - целиком
+        if st.session_state.get('report_pending'):
+            # Импорт здесь для избежания циклических импортов
+            from utils.session_manager import SessionManager
+            self.ui_helpers.render_report_stream(SessionManager().stream_ai_report(), "ai")
+            return
+        
         # Отображение отчета с поддержкой Markdown
         report_content = st.session_state.report
         self.ui_helpers.render_report_container(report_content, "ai")
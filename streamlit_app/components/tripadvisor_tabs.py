@@ -4,7 +4,7 @@
 """
 
 import streamlit as st
-from utils.ui_helpers import UIHelpers
+from utils.ui_helpers import UIHelpers, StreamRenderer
 from utils.animations import show_success_message, show_error_message
 
 
@@ -14,6 +14,40 @@ class TripAdvisorTabs:
     def __init__(self):
         """Инициализация компонента"""
         self.ui_helpers = UIHelpers()
+        self.result_placeholders = {}
+    
+    def render_full_report_button(self) -> bool:
+        """
+        Рендер кнопки полного отчета о районе
+        
+        Returns:
+            bool: Нажата ли кнопка (отчет запускается после рендера вкладок,
+                чтобы заполнять их по мере готовности)
+        """
+        return st.button(
+            "🌍 TripAdvisor: Полный отчет о районе (все вкладки сразу)",
+            key="trip_full_report",
+            use_container_width=True
+        )
+    
+    def run_full_report(self):
+        """Запуск всех четырех анализов с заполнением вкладок по мере готовности"""
+        if not st.session_state.get('current_listing_data'):
+            show_error_message("Сначала выберите жилье для анализа")
+            return
+        
+        for placeholder in self.result_placeholders.values():
+            placeholder.info("⏳ Анализ выполняется...")
+        
+        session_manager = self._get_session_manager()
+        
+        with st.spinner("🌍 Собираю полный отчет о районе через TripAdvisor..."):
+            received = session_manager.get_full_area_report(on_result=self._fill_results)
+        
+        if received:
+            show_success_message(f"Готово отчетов TripAdvisor: {received} из 4")
+        else:
+            show_error_message("Не удалось получить данные от TripAdvisor")
     
     def render_restaurants_tab(self):
         """Рендер вкладки ресторанов"""
@@ -73,19 +107,24 @@ class TripAdvisorTabs:
         button_key = f"trip_{choice_code}"
         button_text = f"🌍 TripAdvisor: Получить {title.lower()}"
         
-        if st.button(button_text, key=button_key, use_container_width=True):
-            self._handle_tripadvisor_request(choice_code, title)
+        clicked = st.button(button_text, key=button_key, use_container_width=True)
+        
+        # Место результатов для конкретного типа (его заполняют и поток ИИ, и полный отчет)
+        self.result_placeholders[report_type] = st.empty()
+        
+        if clicked:
+            self._handle_tripadvisor_request(choice_code, title, report_type)
         
-        # Отображение результатов для конкретного типа
         self._display_tripadvisor_results(report_type)
     
-    def _handle_tripadvisor_request(self, choice_code: str, title: str):
+    def _handle_tripadvisor_request(self, choice_code: str, title: str, report_type: str):
         """
         Обработка запроса к TripAdvisor
         
         Args:
             choice_code: Код запроса
             title: Название для сообщений
+            report_type: Тип отчета (ИИ анализ выводится в его место по мере генерации)
         """
         # Проверка наличия данных о жилье
         if not st.session_state.get('current_listing_data'):
@@ -95,8 +134,12 @@ class TripAdvisorTabs:
         # Запуск TripAdvisor сервера и получение данных
         session_manager = self._get_session_manager()
         
+        # Поток ИИ перерисовывает вкладку не на каждый токен, а несколько раз в секунду;
+        # итоговый отчет выводит _display_tripadvisor_results
+        renderer = StreamRenderer(lambda content: self._fill_results(report_type, content))
+        
         with st.spinner(f"🌍 Ищу {title.lower()} через TripAdvisor..."):
-            result = session_manager.get_tripadvisor_data(choice_code)
+            result = session_manager.get_tripadvisor_data(choice_code, on_chunk=renderer.add)
             
             if result:
                 show_success_message("Данные от TripAdvisor получены!")
@@ -114,6 +157,25 @@ class TripAdvisorTabs:
         report_content = session_manager.get_tripadvisor_report(report_type)
         
         if report_content:
+            self._fill_results(report_type, report_content)
+        elif session_manager.is_tripadvisor_report_pending(report_type):
+            self.result_placeholders[report_type].info(
+                "⏳ Отчет готовится в фоне - он появится здесь при следующем действии на странице"
+            )
+    
+    def _fill_results(self, report_type: str, report_content: str):
+        """
+        Вывод отчета в место результатов вкладки
+        
+        Args:
+            report_type: Тип отчета (restaurants, attractions, reviews, city)
+            report_content: Содержимое отчета
+        """
+        placeholder = self.result_placeholders.get(report_type)
+        if placeholder is None:
+            return
+        
+        with placeholder.container():
             # Отображение в красивом контейнере
             self.ui_helpers.render_report_container(
                 report_content, 
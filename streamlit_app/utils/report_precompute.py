@@ -0,0 +1,108 @@
+# streamlit_app/utils/report_precompute.py
+"""
+Фоновая подготовка отчетов TripAdvisor для выбранного жилья
+"""
+
+import threading
+from typing import Any, Dict, Optional
+from .shared_services import SessionLease
+
+
+class ReportPrecompute:
+    """
+    Расчет всех отчетов TripAdvisor в фоновом потоке сразу после AI анализа жилья
+
+    Поток сам запускает TripAdvisor сервер и складывает готовые отчеты
+    в results; Streamlit забирает их при следующем rerun. Запуск для другого
+    жилья отменяет предыдущий расчет, его результаты отбрасываются.
+    Поток не обращается к st.*: у него нет контекста сессии.
+    На время расчета поток держит свою ссылку на сервис, чтобы остановка
+    по простою не завершила сервер посреди расчета.
+    """
+
+    def __init__(self):
+        """Инициализация без активного расчета"""
+        self.listing_id: Optional[str] = None
+        self.results: Dict[str, str] = {}
+        self.running = False
+        self._cancel: Optional[threading.Event] = None
+        self._lock = threading.Lock()
+
+    def start(self, service, integrator, listing_data: Dict) -> None:
+        """
+        Запуск расчета для жилья (предыдущий расчет отменяется)
+
+        Args:
+            service: SharedService TripAdvisor (запускается при необходимости)
+            integrator: Integrator для расчета отчетов
+            listing_data: Данные о жилье
+        """
+        cancel = threading.Event()
+        listing_id = str(listing_data["basic"]["id"])
+
+        with self._lock:
+            if self._cancel is not None:
+                self._cancel.set()
+            self._cancel = cancel
+            self.listing_id = listing_id
+            self.results = {}
+            self.running = True
+
+        # Ссылка берется до запуска потока: сессия может завершиться раньше, чем он стартует
+        lease = SessionLease({"tripadvisor": service})
+        threading.Thread(
+            target=self._run,
+            args=(service, integrator, listing_data, cancel, lease),
+            name=f"trip-precompute-{listing_id}",
+            daemon=True
+        ).start()
+
+    def cancel(self) -> None:
+        """Отмена текущего расчета и сброс результатов"""
+        with self._lock:
+            if self._cancel is not None:
+                self._cancel.set()
+            self._cancel = None
+            self.listing_id = None
+            self.results = {}
+            self.running = False
+
+    def get(self, listing_id: Any, choice_code: str) -> Optional[str]:
+        """
+        Готовый отчет для жилья
+
+        Args:
+            listing_id: ID жилья
+            choice_code: Код запроса (1-4)
+
+        Returns:
+            str: Отчет или None, если он еще не готов (или рассчитан для другого жилья)
+        """
+        with self._lock:
+            if self.listing_id != str(listing_id):
+                return None
+            return self.results.get(choice_code)
+
+    def is_pending(self, listing_id: Any, choice_code: str) -> bool:
+        """Отчет для жилья еще рассчитывается"""
+        with self._lock:
+            return self.running and self.listing_id == str(listing_id) and choice_code not in self.results
+
+    def _run(self, service, integrator, listing_data: Dict,
+             cancel: threading.Event, lease: SessionLease) -> None:
+        """Тело фонового потока (ссылка lease отпускается по завершении)"""
+        try:
+            if not service.ensure_started():
+                return
+            for choice_code, result in integrator.iter_full_area_report(listing_data, cancel):
+                with self._lock:
+                    if cancel.is_set():
+                        return
+                    self.results[choice_code] = result or ""
+        except Exception as e:
+            print(f"❌ Фоновая подготовка отчетов TripAdvisor не удалась: {e}")
+        finally:
+            lease.release()
+            with self._lock:
+                if self._cancel is cancel:
+                    self.running = False
@@ -3,11 +3,24 @@
 Управление состоянием Streamlit сессии и клиентами MCP
 """
 
+import threading
 import streamlit as st
-from airbnb import MCPClient as AirbnbClient, Formatter
+from typing import Callable, Iterator, Optional
+from airbnb import Formatter
 from shared import AIAgent, ListingAnalyzer
-from tripadvisor import Integrator
 from .animations import show_thinking_animation
+from .shared_services import get_shared_services, SessionLease
+from .report_precompute import ReportPrecompute
+from app_config.streamlit_config import TRIPADVISOR_PRECOMPUTE_CONFIG
+
+# Код запроса Integrator -> тип отчета (поле trip_<тип> в состоянии сессии)
+TRIPADVISOR_REPORT_TYPES = {
+    "1": "restaurants",
+    "2": "attractions",
+    "3": "city",
+    "4": "reviews"
+}
+TRIPADVISOR_CHOICE_CODES = {report_type: code for code, report_type in TRIPADVISOR_REPORT_TYPES.items()}
 
 
 class SessionManager:
@@ -20,22 +33,22 @@ class SessionManager:
     def _init_session_state(self):
         """Инициализация состояния сессии если еще не создано"""
         if 'initialized' not in st.session_state:
-            # Клиенты
-            st.session_state.airbnb_client = AirbnbClient()
+            # MCP клиенты общие для всех сессий процесса: сессия берет на них ссылку
+            services = get_shared_services()
+            st.session_state.mcp_lease = SessionLease(services)
+            st.session_state.airbnb_client = st.session_state.mcp_lease.clients["airbnb"]
+            st.session_state.integrator = st.session_state.mcp_lease.clients["tripadvisor"]
+            
             st.session_state.formatter = Formatter()
             st.session_state.ai_agent = AIAgent()
             st.session_state.analyzer = ListingAnalyzer()
-            st.session_state.integrator = Integrator()
-            
-            # Статусы серверов
-            st.session_state.airbnb_started = False
-            st.session_state.tripadvisor_started = False
             
             # Данные приложения
             st.session_state.listings = []
             st.session_state.selected_index = None
             st.session_state.search_location = ""
             st.session_state.report = ""
+            st.session_state.report_pending = False  # отчет еще генерируется потоком
             
             # Разделенные TripAdvisor отчеты
             st.session_state.trip_restaurants = ""
@@ -43,6 +56,10 @@ class SessionManager:
             st.session_state.trip_reviews = ""
             st.session_state.trip_city = ""
             
+            # Фоновая подготовка TripAdvisor отчетов (включается в sidebar)
+            st.session_state.trip_precompute = ReportPrecompute()
+            st.session_state.trip_precompute_enabled = TRIPADVISOR_PRECOMPUTE_CONFIG["enabled"]
+            
             st.session_state.extracted_params = {}
             st.session_state.current_query = ""
             st.session_state.current_listing_data = None
@@ -54,29 +71,41 @@ class SessionManager:
         with st.sidebar:
             st.subheader("🖥️ Статус серверов")
             
-            # Airbnb статус
-            if st.session_state.airbnb_started:
-                st.markdown('<p class="status-success">✅ Airbnb MCP: Активен</p>', unsafe_allow_html=True)
-            else:
-                st.markdown('<p class="status-error">❌ Airbnb MCP: Остановлен</p>', unsafe_allow_html=True)
+            for service in get_shared_services().values():
+                stats = service.stats()
+                if stats["started"]:
+                    st.markdown(
+                        f'<p class="status-success">✅ {stats["name"]}: Активен '
+                        f'(сессий: {stats["sessions"]})</p>',
+                        unsafe_allow_html=True
+                    )
+                else:
+                    st.markdown(f'<p class="status-error">❌ {stats["name"]}: Остановлен</p>',
+                                unsafe_allow_html=True)
             
-            # TripAdvisor статус
-            if st.session_state.tripadvisor_started:
-                st.markdown('<p class="status-success">✅ TripAdvisor MCP: Активен</p>', unsafe_allow_html=True)
-            else:
-                st.markdown('<p class="status-error">❌ TripAdvisor MCP: Остановлен</p>', unsafe_allow_html=True)
+            st.checkbox(
+                "🌍 Готовить отчеты TripAdvisor заранее",
+                key="trip_precompute_enabled",
+                help="После AI анализа жилья отчеты о районе считаются в фоне"
+            )
             
-            # Кнопка остановки
-            if st.button("🛑 Остановить все серверы", use_container_width=True):
+            # Кнопка отключения сессии от общих серверов
+            if st.button("🛑 Отключиться от серверов", use_container_width=True):
                 self.stop_all_servers()
                 st.rerun()
     
+    def _ensure_lease(self) -> SessionLease:
+        """Ссылка сессии на общие серверы (заново после отключения)"""
+        if st.session_state.get('mcp_lease') is None:
+            st.session_state.mcp_lease = SessionLease(get_shared_services())
+        return st.session_state.mcp_lease
+    
     def start_airbnb_server(self) -> bool:
-        """Запуск Airbnb сервера"""
-        if not st.session_state.airbnb_started:
+        """Запуск общего Airbnb сервера (один раз на процесс)"""
+        service = self._ensure_lease().services["airbnb"]
+        if not service.started:
             with st.spinner("🚀 Запускаю Airbnb MCP сервер..."):
-                if st.session_state.airbnb_client.start_server():
-                    st.session_state.airbnb_started = True
+                if service.ensure_started():
                     st.success("✅ Airbnb MCP сервер запущен!")
                     return True
                 else:
@@ -85,11 +114,11 @@ class SessionManager:
         return True
     
     def start_tripadvisor_server(self) -> bool:
-        """Запуск TripAdvisor сервера"""
-        if not st.session_state.tripadvisor_started:
+        """Запуск общего TripAdvisor сервера (один раз на процесс)"""
+        service = self._ensure_lease().services["tripadvisor"]
+        if not service.started:
             with st.spinner("🌍 Запускаю TripAdvisor MCP сервер..."):
-                if st.session_state.integrator.start_tripadvisor_service():
-                    st.session_state.tripadvisor_started = True
+                if service.ensure_started():
                     st.success("✅ TripAdvisor MCP сервер запущен!")
                     return True
                 else:
@@ -98,14 +127,17 @@ class SessionManager:
         return True
     
     def stop_all_servers(self):
-        """Остановка всех серверов"""
-        if st.session_state.airbnb_started:
-            st.session_state.airbnb_client.stop_server()
-            st.session_state.airbnb_started = False
-        if st.session_state.tripadvisor_started:
-            st.session_state.integrator.stop_tripadvisor_service()
-            st.session_state.tripadvisor_started = False
-        st.success("✅ Все серверы остановлены")
+        """
+        Отключение сессии от общих серверов
+        
+        Серверы останавливаются, когда их не использует ни одна сессия.
+        """
+        st.session_state.trip_precompute.cancel()
+        lease = st.session_state.get('mcp_lease')
+        if lease is not None:
+            lease.release()
+            st.session_state.mcp_lease = None
+        st.success("✅ Сессия отключена от серверов")
     
     def perform_search(self, query: str):
         """Выполнение поиска с AI анализом"""
@@ -135,6 +167,7 @@ class SessionManager:
             st.session_state.search_location = params.location
             st.session_state.selected_index = None
             st.session_state.report = ""
+            st.session_state.report_pending = False
             
             # Очистка всех TripAdvisor отчетов
             st.session_state.trip_restaurants = ""
@@ -142,6 +175,7 @@ class SessionManager:
             st.session_state.trip_reviews = ""
             st.session_state.trip_city = ""
             
+            st.session_state.trip_precompute.cancel()
             st.session_state.current_listing_data = None
             
             if listings:
@@ -154,20 +188,21 @@ class SessionManager:
     
     def perform_analysis(self, index: int):
         """Генерация AI отчета для выбранного жилья"""
+        # Отчеты для прежнего жилья больше не нужны
+        st.session_state.trip_precompute.cancel()
         st.session_state.selected_index = index
         listing = st.session_state.listings[index]
         
-        with st.spinner("🤖 Генерирую детальный AI отчет..."):
+        with st.spinner("🏠 Получаю детали жилья..."):
             try:
                 data = st.session_state.analyzer.get_full_listing_data(
                     listing,
                     st.session_state.airbnb_client,
                     st.session_state.search_location,
                 )
-                report = st.session_state.analyzer.generate_ai_report(
-                    data, st.session_state.current_query
-                )
-                st.session_state.report = report
+                # Сам отчет генерируется потоком во вкладке AI анализа (см. stream_ai_report)
+                st.session_state.report = ""
+                st.session_state.report_pending = True
                 
                 # Очистка всех TripAdvisor отчетов при новом анализе
                 st.session_state.trip_restaurants = ""
@@ -177,8 +212,15 @@ class SessionManager:
                 
                 st.session_state.current_listing_data = data
                 
+                if st.session_state.trip_precompute_enabled:
+                    st.session_state.trip_precompute.start(
+                        self._ensure_lease().services["tripadvisor"],
+                        st.session_state.integrator,
+                        data
+                    )
+                
                 # Сдержанная анимация с сообщением о прокрутке
-                st.success("✅ AI анализ готов! Прокрутите вниз для просмотра отчета.")
+                st.success("✅ Жилье выбрано! Прокрутите вниз: AI отчет появляется по мере генерации.")
                 
                 # Auto-scroll к анализу
                 st.markdown("""
@@ -195,31 +237,101 @@ class SessionManager:
             except Exception as e:
                 st.error(f"❌ Ошибка анализа: {str(e)}")
     
-    def get_tripadvisor_data(self, choice_code: str) -> str:
-        """Получение данных от TripAdvisor"""
+    def stream_ai_report(self) -> Iterator[str]:
+        """
+        AI отчет о текущем жилье по мере генерации
+        
+        После выдачи последнего фрагмента отчет сохраняется в состоянии сессии.
+        Прерванная генерация (rerun, ошибка) не повторяется: недополученный
+        ответ не попадает в кэш, и каждый rerun заново оплачивал бы запрос
+        к LLM. Сохраняется полученная часть с пометкой о прерывании.
+        
+        Yields:
+            str: Очередной фрагмент отчета
+        """
+        if st.session_state.current_listing_data is None:
+            st.session_state.report_pending = False
+            return
+        
+        chunks = []
+        completed = False
+        try:
+            for chunk in st.session_state.analyzer.stream_ai_report(
+                st.session_state.current_listing_data, st.session_state.current_query
+            ):
+                chunks.append(chunk)
+                yield chunk
+            completed = True
+        finally:
+            report = "".join(chunks)
+            if not completed:
+                report += "\n\n⚠️ Генерация отчета прервана. Выберите жилье снова, чтобы повторить."
+            st.session_state.report = report
+            st.session_state.report_pending = False
+    
+    def get_tripadvisor_data(self, choice_code: str, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Получение данных от TripAdvisor
+        
+        Args:
+            choice_code: Код запроса (1-4)
+            on_chunk: Получает текст ИИ анализа по частям по мере генерации
+            
+        Returns:
+            str: Результат анализа
+        """
         if not self.start_tripadvisor_server():
             return ""
         
         try:
             result = st.session_state.integrator.process_additional_info_request(
-                choice_code, st.session_state.current_listing_data
+                choice_code, st.session_state.current_listing_data, on_chunk
             )
-            
-            # Сохраняем результат в соответствующее поле
-            if choice_code == "1":  # Рестораны
-                st.session_state.trip_restaurants = result or ""
-            elif choice_code == "2":  # Достопримечательности
-                st.session_state.trip_attractions = result or ""
-            elif choice_code == "3":  # Город
-                st.session_state.trip_city = result or ""
-            elif choice_code == "4":  # Отзывы
-                st.session_state.trip_reviews = result or ""
-            
+            self._store_tripadvisor_result(choice_code, result)
             return result or ""
         except Exception as e:
             st.error(f"❌ Ошибка TripAdvisor: {str(e)}")
             return ""
     
+    def get_full_area_report(self, on_result: Optional[Callable[[str, str], None]] = None) -> int:
+        """
+        Полный отчет о районе: все четыре анализа TripAdvisor параллельно
+        
+        Прерванный вывод (rerun, смена жилья) отменяет еще идущие анализы,
+        чтобы они не тратили квоту TripAdvisor и токены LLM.
+        
+        Args:
+            on_result: Вызывается с (report_type, содержимое) по мере готовности отчетов
+            
+        Returns:
+            int: Количество полученных отчетов
+        """
+        if not self.start_tripadvisor_server():
+            return 0
+        
+        received = 0
+        cancel = threading.Event()
+        try:
+            for choice_code, result in st.session_state.integrator.iter_full_area_report(
+                st.session_state.current_listing_data, cancel
+            ):
+                self._store_tripadvisor_result(choice_code, result)
+                if result:
+                    received += 1
+                if on_result:
+                    on_result(TRIPADVISOR_REPORT_TYPES[choice_code], result or "")
+        except Exception as e:
+            st.error(f"❌ Ошибка TripAdvisor: {str(e)}")
+        finally:
+            cancel.set()
+        return received
+    
+    def _store_tripadvisor_result(self, choice_code: str, result: Optional[str]):
+        """Сохранение результата в поле соответствующего отчета"""
+        report_type = TRIPADVISOR_REPORT_TYPES.get(choice_code)
+        if report_type:
+            st.session_state[f"trip_{report_type}"] = result or ""
+    
     def get_tripadvisor_report(self, report_type: str) -> str:
         """
         Получение конкретного TripAdvisor отчета
@@ -236,4 +348,29 @@ class SessionManager:
             "reviews": st.session_state.get('trip_reviews', ''),
             "city": st.session_state.get('trip_city', '')
         }
-        return report_map.get(report_type, '')
\ No newline at end of file
+        report = report_map.get(report_type, '')
+        
+        # Отчет, подготовленный в фоне для текущего жилья
+        listing_data = st.session_state.get('current_listing_data')
+        choice_code = TRIPADVISOR_CHOICE_CODES.get(report_type)
+        if not report and listing_data and choice_code:
+            report = st.session_state.trip_precompute.get(listing_data["basic"]["id"], choice_code) or ''
+            if report:
+                self._store_tripadvisor_result(choice_code, report)
+        return report
+    
+    def is_tripadvisor_report_pending(self, report_type: str) -> bool:
+        """
+        Отчет для текущего жилья еще готовится в фоне
+        
+        Args:
+            report_type: Тип отчета (restaurants, attractions, reviews, city)
+            
+        Returns:
+            bool: True если фоновый расчет еще идет
+        """
+        listing_data = st.session_state.get('current_listing_data')
+        choice_code = TRIPADVISOR_CHOICE_CODES.get(report_type)
+        if not listing_data or not choice_code:
+            return False
+        return st.session_state.trip_precompute.is_pending(listing_data["basic"]["id"], choice_code)
\ No newline at end of file
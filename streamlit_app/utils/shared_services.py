@@ -0,0 +1,159 @@
+# streamlit_app/utils/shared_services.py
+"""
+Общие для всех Streamlit сессий MCP клиенты с подсчетом ссылок
+"""
+
+import threading
+import weakref
+from typing import Any, Callable, Dict, Optional
+import streamlit as st
+from airbnb import MCPClient as AirbnbClient
+from tripadvisor import Integrator
+from app_config.streamlit_config import SHARED_SERVICES_CONFIG
+
+
+class SharedService:
+    """
+    Один клиент MCP сервера на процесс Streamlit
+
+    Сессии берут ссылку при создании и отпускают ее при завершении.
+    Сервер запускается один раз первой сессией, которой он нужен,
+    и останавливается через idle_shutdown секунд после ухода последней.
+    """
+
+    def __init__(self, name: str, client: Any,
+                 start: Callable[[Any], bool], stop: Callable[[Any], None],
+                 idle_shutdown: float):
+        """
+        Инициализация общего сервиса
+
+        Args:
+            name: Название сервиса (для статистики)
+            client: Клиент, общий для всех сессий
+            start: Функция запуска сервера клиента
+            stop: Функция остановки сервера клиента
+            idle_shutdown: Через сколько секунд без сессий остановить сервер
+        """
+        self.name = name
+        self.client = client
+        self._start = start
+        self._stop = stop
+        self.idle_shutdown = idle_shutdown
+
+        self.refs = 0
+        self.started = False
+        self._lock = threading.Lock()
+        # Отдельная блокировка запуска: пока первая сессия ждет запуск,
+        # остальные могут брать и отпускать ссылки
+        self._start_lock = threading.Lock()
+        self._idle_timer: Optional[threading.Timer] = None
+
+    def acquire(self) -> Any:
+        """
+        Новая ссылка сессии на сервис
+
+        Returns:
+            Any: Общий клиент
+        """
+        with self._lock:
+            self.refs += 1
+            if self._idle_timer:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+        return self.client
+
+    def release(self) -> None:
+        """Сессия больше не использует сервис"""
+        with self._lock:
+            self.refs = max(0, self.refs - 1)
+            if self.refs == 0 and self.started and self._idle_timer is None:
+                self._idle_timer = threading.Timer(self.idle_shutdown, self._stop_if_idle)
+                self._idle_timer.daemon = True
+                self._idle_timer.start()
+
+    def ensure_started(self) -> bool:
+        """
+        Запуск сервера, если он еще не запущен (один раз на процесс)
+
+        Returns:
+            bool: True если сервер работает
+        """
+        if self.started:
+            return True
+        with self._start_lock:
+            if not self.started:
+                self.started = bool(self._start(self.client))
+        return self.started
+
+    def _stop_if_idle(self) -> None:
+        """Остановка сервера, если за время ожидания не появилось сессий"""
+        with self._start_lock:
+            with self._lock:
+                self._idle_timer = None
+                if self.refs > 0 or not self.started:
+                    return
+                self.started = False
+            self._stop(self.client)
+
+    def stats(self) -> Dict[str, Any]:
+        """Количество сессий и состояние сервера"""
+        return {"name": self.name, "sessions": self.refs, "started": self.started}
+
+
+class SessionLease:
+    """
+    Ссылки одной сессии на общие сервисы
+
+    Хранится в st.session_state: когда Streamlit удаляет состояние
+    завершенной сессии, ссылки отпускаются автоматически.
+    """
+
+    def __init__(self, services: Dict[str, SharedService]):
+        """
+        Взятие ссылок на все сервисы
+
+        Args:
+            services: Общие сервисы процесса
+        """
+        self.services = services
+        self.clients = {name: service.acquire() for name, service in services.items()}
+        self._finalizer = weakref.finalize(self, _release_all, list(services.values()))
+        # При выходе из интерпретатора серверы останавливаются вместе с процессом
+        self._finalizer.atexit = False
+
+    def release(self) -> None:
+        """Явное освобождение ссылок (повторные вызовы ничего не делают)"""
+        self._finalizer()
+
+
+def _release_all(services) -> None:
+    """Освобождение ссылок завершенной сессии"""
+    for service in services:
+        service.release()
+
+
+@st.cache_resource
+def get_shared_services() -> Dict[str, SharedService]:
+    """
+    Общие MCP сервисы процесса (создаются один раз для всех сессий)
+
+    Returns:
+        Dict: {"airbnb": SharedService, "tripadvisor": SharedService}
+    """
+    idle_shutdown = SHARED_SERVICES_CONFIG["idle_shutdown"]
+    return {
+        "airbnb": SharedService(
+            "Airbnb MCP",
+            AirbnbClient(),
+            start=lambda client: client.start_server(),
+            stop=lambda client: client.stop_server(),
+            idle_shutdown=idle_shutdown
+        ),
+        "tripadvisor": SharedService(
+            "TripAdvisor MCP",
+            Integrator(),
+            start=lambda integrator: integrator.start_tripadvisor_service(),
+            stop=lambda integrator: integrator.stop_tripadvisor_service(),
+            idle_shutdown=idle_shutdown
+        )
+    }
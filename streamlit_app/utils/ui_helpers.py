@@ -3,7 +3,54 @@
 Вспомогательные функции для UI и стили
 """
 
+import time
 import streamlit as st
+from typing import Callable, Iterable, List
+from app_config.streamlit_config import STREAM_RENDER_CONFIG
+
+
+class StreamRenderer:
+    """
+    Накопление фрагментов потока с перерисовкой не чаще min_interval секунд
+
+    Перерисовка контейнера на каждый токен квадратична по длине отчета
+    и забивает websocket Streamlit; здесь отчет перерисовывается целиком
+    несколько раз в секунду, а остаток выводится flush().
+    """
+
+    def __init__(self, render: Callable[[str], None], min_interval: float = STREAM_RENDER_CONFIG["min_interval"]):
+        """
+        Инициализация
+
+        Args:
+            render: Вывод накопленного текста целиком
+            min_interval: Минимум секунд между перерисовками
+        """
+        self.render = render
+        self.min_interval = min_interval
+        self._parts: List[str] = []
+        self._rendered_at = 0.0
+        self._pending = False
+
+    @property
+    def content(self) -> str:
+        """Накопленный текст"""
+        return "".join(self._parts)
+
+    def add(self, chunk: str) -> None:
+        """Новый фрагмент (перерисовка, если с прошлой прошло min_interval)"""
+        self._parts.append(chunk)
+        self._pending = True
+        if time.monotonic() - self._rendered_at >= self.min_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Вывод еще не показанных фрагментов"""
+        if not self._pending:
+            return
+        self.render(self.content)
+        self._rendered_at = time.monotonic()
+        self._pending = False
 
 
 class UIHelpers:
@@ -208,4 +255,32 @@ class UIHelpers:
             <div class="{container_class}">
                 {content.replace('\n', '<br>')}
             </div>
-            """, unsafe_allow_html=True)
\ No newline at end of file
+            """, unsafe_allow_html=True)
+    
+    @staticmethod
+    def render_report_stream(chunks: Iterable[str], container_type: str = "default") -> str:
+        """
+        Рендер отчета по мере поступления фрагментов текста
+        
+        Args:
+            chunks: Фрагменты отчета (например, токены от ИИ)
+            container_type: Тип контейнера, как в render_report_container
+            
+        Returns:
+            str: Отчет целиком
+        """
+        if container_type == "ai":
+            with st.container():
+                return st.write_stream(chunks)
+        
+        placeholder = st.empty()
+        
+        def render(content: str):
+            with placeholder.container():
+                UIHelpers.render_report_container(content, container_type)
+        
+        renderer = StreamRenderer(render)
+        for chunk in chunks:
+            renderer.add(chunk)
+        renderer.flush()
+        return renderer.content
\ No newline at end of file
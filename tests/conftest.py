@@ -0,0 +1,9 @@
+# tests/conftest.py
+"""
+Общие настройки тестов: корень проекта в sys.path
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
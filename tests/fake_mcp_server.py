@@ -0,0 +1,34 @@
+# tests/fake_mcp_server.py
+"""
+Минимальный stdio MCP сервер для тестов пула
+
+Аргумент командной строки - задержка ответа на initialize в секундах.
+Метод test/hang остается без ответа, test/exit завершает процесс.
+"""
+
+import json
+import sys
+import time
+
+
+def main() -> None:
+    """Ответы на initialize и ping; прочие запросы возвращают пустой результат"""
+    delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0
+    for line in sys.stdin:
+        message = json.loads(line)
+        if "id" not in message:
+            continue
+        if message["method"] == "test/hang":
+            continue
+        if message["method"] == "test/exit":
+            sys.exit(1)
+        result = {}
+        if message["method"] == "initialize":
+            time.sleep(delay)
+            result = {"serverInfo": {"name": "fake"}}
+        sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# tests/test_area_context.py
+"""
+Тесты AreaContext: общий запрос для одновременных обращений и что не запоминается
+"""
+
+import asyncio
+
+import pytest
+
+from tripadvisor.area_context import AreaContext
+
+
+class FakeClient:
+    """TripAdvisor клиент с управляемыми ответами поиска рядом"""
+
+    def __init__(self, results=None, delay: float = 0.01):
+        self.results = list(results or [])
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+        self.queries = []
+
+    async def search_nearby_locations(self, latitude, longitude, category):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        result = self.results.pop(0) if self.results else [{"location_id": "1"}]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def search_locations(self, query):
+        self.queries.append(query)
+        return [{"location_id": "2"}]
+
+
+def make_area(client) -> AreaContext:
+    return AreaContext(client, 55.75, 37.62, "Moscow")
+
+
+def test_concurrent_callers_share_one_request():
+    client = FakeClient()
+
+    async def scenario():
+        area = make_area(client)
+        results = await asyncio.gather(*[area.restaurants() for _ in range(5)])
+        assert all(result == [{"location_id": "1"}] for result in results)
+        # Готовый результат тоже переиспользуется
+        await area.restaurants()
+        return area.stats()
+
+    stats = asyncio.run(scenario())
+    assert client.calls == 1
+    assert stats == {"requests": 1, "reused": 5, "entries": 1}
+
+
+@pytest.mark.parametrize("first", [[], RuntimeError("boom")])
+def test_empty_or_failed_result_is_not_reused(first):
+    client = FakeClient(results=[first, [{"location_id": "3"}]])
+
+    async def scenario():
+        area = make_area(client)
+        try:
+            assert await area.restaurants() == []
+        except RuntimeError:
+            pass
+        return await area.restaurants()
+
+    assert asyncio.run(scenario()) == [{"location_id": "3"}]
+    assert client.calls == 2
+
+
+def test_cancelled_request_is_not_reused():
+    client = FakeClient(delay=0.05)
+
+    async def scenario():
+        area = make_area(client)
+        waiter = asyncio.create_task(area.restaurants())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await area.restaurants()
+
+    assert asyncio.run(scenario()) == [{"location_id": "1"}]
+    assert client.cancelled == 1
+    assert client.calls == 2
+
+
+def test_cancelled_waiter_does_not_cancel_others():
+    client = FakeClient(delay=0.05)
+
+    async def scenario():
+        area = make_area(client)
+        leaving = asyncio.create_task(area.restaurants())
+        staying = asyncio.create_task(area.restaurants())
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return await staying
+
+    assert asyncio.run(scenario()) == [{"location_id": "1"}]
+    assert client.calls == 1
+    assert client.cancelled == 0
+
+
+def test_city_places_without_city_skips_search():
+    client = FakeClient()
+
+    async def scenario():
+        area = AreaContext(client, 55.75, 37.62, None)
+        assert await area.city_places() == []
+        assert await make_area(client).city_places() == [{"location_id": "2"}]
+
+    asyncio.run(scenario())
+    assert client.queries == ["Moscow attractions"]
@@ -0,0 +1,134 @@
+# tests/test_cache.py
+"""
+Тесты кэшей: срок жизни записей, вытеснение давно не читанных, async доступ
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from shared.cache import TTLCache, MemoryCache, TieredCache, make_key
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def make_cache(request, tmp_path):
+    """Фабрика кэша обеих реализаций"""
+    def factory(ttl=60, max_entries=100):
+        if request.param == "sqlite":
+            return TTLCache("test", ttl=ttl, max_entries=max_entries, path=str(tmp_path / "cache.db"))
+        return MemoryCache("test", ttl=ttl, max_entries=max_entries)
+    return factory
+
+
+def test_make_key_ignores_dict_order():
+    assert make_key("tool", {"a": 1, "b": 2}) == make_key("tool", {"b": 2, "a": 1})
+    assert make_key("tool", {"a": 1}) != make_key("tool", {"a": 2})
+
+
+def test_value_round_trip_and_stats(make_cache):
+    cache = make_cache()
+    assert cache.get("key") is None
+    cache.set("key", {"places": [1, 2]})
+    assert cache.get("key") == {"places": [1, 2]}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_entry_expires_after_ttl(make_cache):
+    cache = make_cache(ttl=0.05)
+    cache.set("default", "value")
+    cache.set("longer", "value", ttl=60)
+    time.sleep(0.06)
+    assert cache.get("default") is None
+    assert cache.get("longer") == "value"
+
+
+def test_least_recently_read_entry_is_evicted(make_cache):
+    cache = make_cache(max_entries=2)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    # Чтение "a" делает давно не читанной запись "b"
+    assert cache.get("a") == 1
+    time.sleep(0.01)
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_namespaces_share_file_but_not_entries(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = TTLCache("first", ttl=60, path=path)
+    second = TTLCache("second", ttl=60, path=path)
+    first.set("key", "first")
+    assert second.get("key") is None
+    second.clear()
+    assert first.get("key") == "first"
+
+
+def test_async_access_keeps_sqlite_off_the_loop_thread(tmp_path):
+    cache = TTLCache("test", ttl=60, path=str(tmp_path / "cache.db"))
+    threads = []
+    original = cache.get_entry
+
+    def get_entry(key):
+        threads.append(threading.get_ident())
+        return original(key)
+
+    cache.get_entry = get_entry
+
+    async def scenario():
+        await cache.aset("key", [1, 2])
+        assert await cache.aget("key") == [1, 2]
+        assert await cache.aget("missing") is None
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert threads and loop_thread not in threads
+
+
+def make_tiered(tmp_path, memory_entries=2, fresh_ttl=60, stale_ttl=0):
+    """Двухуровневый кэш с диском во временной папке"""
+    disk = TTLCache("tiered", ttl=fresh_ttl, path=str(tmp_path / "cache.db"))
+    return TieredCache(disk, memory_entries=memory_entries, fresh_ttl=fresh_ttl, stale_ttl=stale_ttl)
+
+
+def test_tiered_reads_memory_then_disk(tmp_path):
+    cache = make_tiered(tmp_path, memory_entries=1)
+    cache.set("a", 1)
+    cache.set("b", 2)  # "a" вытеснена из памяти, но осталась на диске
+    assert cache.get_entry("b")["value"] == 2
+    assert cache.get_entry("a")["value"] == 1
+    assert cache.get_entry("missing") is None
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_tiered_marks_entries_stale_then_drops_them(tmp_path):
+    cache = make_tiered(tmp_path, fresh_ttl=0.05, stale_ttl=0.1)
+    cache.set("key", "value")
+    assert cache.get_entry("key")["stale"] is False
+    time.sleep(0.07)
+    assert cache.get_entry("key") == {"value": "value", "created_at": pytest.approx(time.time(), abs=1), "stale": True}
+    time.sleep(0.1)
+    assert cache.get_entry("key") is None
+
+
+def test_tiered_async_access_matches_sync(tmp_path):
+    cache = make_tiered(tmp_path, memory_entries=1)
+
+    async def scenario():
+        await cache.aset("a", {"id": 1})
+        await cache.aset("b", {"id": 2})
+        from_memory = await cache.aget_entry("b")
+        return from_memory, await cache.aget_entry("a"), await cache.aget_entry("c")
+
+    from_memory, from_disk, missing = asyncio.run(scenario())
+    assert from_disk["value"] == {"id": 1} and from_disk["stale"] is False
+    assert from_memory["value"] == {"id": 2}
+    assert missing is None
+    assert cache.stats()["disk_hits"] == 1
@@ -0,0 +1,88 @@
+# tests/test_fan_out.py
+"""
+Тесты ordered_fan_out: порядок результатов, ранняя остановка, ошибки
+"""
+
+import asyncio
+
+import pytest
+
+from shared import fan_out
+from shared.fan_out import ordered_fan_out
+
+
+def test_results_keep_input_order():
+    async def fetch(item):
+        # Первые элементы завершаются последними
+        await asyncio.sleep(0.01 * (5 - item))
+        return item * 10
+
+    results = asyncio.run(ordered_fan_out(list(range(5)), fetch, lambda done: False, concurrency=5))
+    assert results == [0, 10, 20, 30, 40]
+
+
+def test_concurrency_is_bounded():
+    running = []
+    peak = []
+
+    async def fetch(item):
+        running.append(item)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(item)
+        return item
+
+    asyncio.run(ordered_fan_out(list(range(8)), fetch, lambda done: False, concurrency=3))
+    assert max(peak) == 3
+
+
+def test_early_stop_returns_shortest_prefix():
+    async def fetch(item):
+        await asyncio.sleep(0)
+        return item
+
+    results = asyncio.run(ordered_fan_out(
+        list(range(10)), fetch, lambda done: sum(done) >= 3, concurrency=4
+    ))
+    assert results == [0, 1, 2]
+
+
+def test_early_stop_finishes_started_and_cancels_not_started():
+    started, finished = [], []
+
+    async def fetch(item):
+        started.append(item)
+        await asyncio.sleep(0.05 if item else 0)
+        finished.append(item)
+        return item
+
+    async def scenario():
+        results = await ordered_fan_out(list(range(6)), fetch, lambda done: True, concurrency=3)
+        assert results == [0]
+        # Начатые вызовы (1, 2) завершаются в фоне, не начатые не запускаются
+        await asyncio.sleep(0.1)
+        assert not fan_out._detached
+
+    asyncio.run(scenario())
+    assert {0, 1, 2} <= set(started)
+    assert 5 not in started
+    assert sorted(finished) == sorted(started)
+
+
+def test_error_cancels_all_calls():
+    finished = []
+
+    async def fetch(item):
+        if item == 0:
+            raise ValueError("boom")
+        await asyncio.sleep(0.05)
+        finished.append(item)
+        return item
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await ordered_fan_out(list(range(4)), fetch, lambda done: False, concurrency=4)
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+    assert finished == []
@@ -0,0 +1,63 @@
+# tests/test_geohash.py
+"""
+Тесты geohash: кодирование ячеек, расстояния и покрытие окрестности точки
+"""
+
+import pytest
+
+from shared import geohash
+
+
+def test_encode_matches_reference_value():
+    # Пример из описания формата geohash
+    assert geohash.encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_bounds_contain_point_and_center_is_inside():
+    cell = geohash.encode(48.8584, 2.2945, 6)
+    min_lat, min_lon, max_lat, max_lon = geohash.bounds(cell)
+    assert min_lat <= 48.8584 <= max_lat
+    assert min_lon <= 2.2945 <= max_lon
+    assert geohash.encode(*geohash.center(cell), 6) == cell
+
+
+def test_haversine_known_distance():
+    # Париж - Лондон примерно 344 км
+    assert geohash.haversine_m(48.8566, 2.3522, 51.5074, -0.1278) == pytest.approx(343_500, rel=0.01)
+
+
+def test_project_and_bearing_round_trip():
+    lat, lon = geohash.project(48.8566, 2.3522, 1000, 90)
+    assert geohash.haversine_m(48.8566, 2.3522, lat, lon) == pytest.approx(1000, rel=1e-3)
+    assert geohash.initial_bearing(48.8566, 2.3522, lat, lon) == pytest.approx(90, abs=0.1)
+    assert geohash.bearing_name(geohash.initial_bearing(48.8566, 2.3522, lat, lon)) == "east"
+
+
+def test_cell_center_needs_only_its_own_cell():
+    cell = geohash.encode(48.8584, 2.2945, 6)
+    lat, lon = geohash.center(cell)
+    assert geohash.covering_cells(lat, lon, 150, 6) == [cell]
+
+
+def test_point_near_corner_covers_neighbors_nearest_first():
+    cell = geohash.encode(48.8584, 2.2945, 6)
+    min_lat, min_lon, max_lat, max_lon = geohash.bounds(cell)
+    # В 20 м от северной границы и 60 м от восточной
+    lat = max_lat - 20 / 111_000
+    lon = max_lon - 60 / (111_000 * 0.657)
+
+    cells = geohash.covering_cells(lat, lon, 150, 6)
+    assert cells[0] == cell
+    assert len(cells) == 4
+    north = geohash.encode(max_lat + 1e-5, lon, 6)
+    assert cells[1] == north
+
+
+def test_max_cells_caps_paid_tiles():
+    cell = geohash.encode(48.8584, 2.2945, 6)
+    min_lat, min_lon, max_lat, max_lon = geohash.bounds(cell)
+    lat = max_lat - 20 / 111_000
+    lon = max_lon - 60 / (111_000 * 0.657)
+
+    assert geohash.covering_cells(lat, lon, 150, 6, max_cells=2) == geohash.covering_cells(lat, lon, 150, 6)[:2]
+    assert geohash.covering_cells(lat, lon, 150, 6, max_cells=1) == [cell]
@@ -0,0 +1,36 @@
+# tests/test_json_codec.py
+"""
+Тесты JSON кодека MCP транспорта
+"""
+
+import copy
+
+import pytest
+
+from shared.json_codec import JSONDecodeError, dumps_line, loads, tool_text_payload
+
+
+def make_response(text: str):
+    return {"jsonrpc": "2.0", "id": 1, "result": {"content": [{"type": "text", "text": text}]}}
+
+
+def test_dumps_line_round_trip():
+    message = {"jsonrpc": "2.0", "id": 1, "params": {"location": "Москва"}}
+    line = dumps_line(message)
+    assert line.endswith(b"\n")
+    assert loads(line) == message
+
+
+def test_invalid_json_raises_common_error():
+    with pytest.raises(JSONDecodeError):
+        loads(b"{not json")
+
+
+def test_tool_text_payload_does_not_mutate_response():
+    response = make_response('{"searchResults": [{"id": "1"}]}')
+    original = copy.deepcopy(response)
+
+    assert tool_text_payload(response) == {"searchResults": [{"id": "1"}]}
+    assert response == original
+    # Повторный разбор того же (общего) ответа дает тот же результат
+    assert tool_text_payload(response) == {"searchResults": [{"id": "1"}]}
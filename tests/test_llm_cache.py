@@ -0,0 +1,89 @@
+# tests/test_llm_cache.py
+"""
+Тесты LLMCache: ключ запроса, привязка к суткам и истечение записей
+"""
+
+from datetime import datetime
+
+import pytest
+
+from shared import cache as cache_module
+from shared import llm_cache
+from shared.cache import MemoryCache
+from shared.llm_cache import LLMCache, seconds_until_day_end
+
+REQUEST = {
+    "model": "gpt-4o-mini",
+    "messages": [{"role": "user", "content": "Рестораны рядом"}],
+    "temperature": 0.3,
+    "max_tokens": 500,
+}
+
+
+def frozen_now(moment: datetime):
+    """datetime, у которого now() возвращает moment"""
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return moment
+
+    return FrozenDatetime
+
+
+def test_key_is_stable_and_ignores_dict_order():
+    reordered = dict(reversed(list(REQUEST.items())))
+    assert LLMCache.key(REQUEST) == LLMCache.key(dict(REQUEST))
+    assert LLMCache.key(REQUEST) == LLMCache.key(reordered)
+
+
+@pytest.mark.parametrize("change", [
+    {"model": "gpt-4o"},
+    {"response_format": {"type": "json_object"}},
+    {"messages": [{"role": "user", "content": "Отели рядом"}]},
+])
+def test_key_changes_with_request(change):
+    assert LLMCache.key(REQUEST) != LLMCache.key({**REQUEST, **change})
+
+
+def test_key_changes_with_day():
+    assert LLMCache.key(REQUEST, "2026-01-01") != LLMCache.key(REQUEST, "2026-01-02")
+    assert LLMCache.key(REQUEST, "2026-01-01") != LLMCache.key(REQUEST)
+
+
+def test_seconds_until_day_end_at_boundary(monkeypatch):
+    monkeypatch.setattr(llm_cache, "datetime", frozen_now(datetime(2026, 1, 1, 23, 59, 30)))
+    assert seconds_until_day_end("2026-01-01") == 30
+    assert seconds_until_day_end("2026-01-02") == 30 + 24 * 3600
+
+    monkeypatch.setattr(llm_cache, "datetime", frozen_now(datetime(2026, 1, 2, 0, 0, 0)))
+    assert seconds_until_day_end("2026-01-01") == 0
+    assert seconds_until_day_end("2025-12-31") == 0
+
+
+def test_get_after_ttl_expiry_misses(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+    cache = LLMCache(MemoryCache("llm", ttl=60))
+
+    cache.set(REQUEST, {"content": "ответ"})
+    clock[0] += 59
+    assert cache.get(REQUEST) == {"content": "ответ"}
+    clock[0] += 1
+    assert cache.get(REQUEST) is None
+
+
+def test_day_bound_entry_expires_at_day_end(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+    monkeypatch.setattr(llm_cache, "datetime", frozen_now(datetime(2026, 1, 1, 23, 59, 50)))
+    cache = LLMCache(MemoryCache("llm", ttl=3600))
+
+    cache.set(REQUEST, {"content": "ответ"}, day="2026-01-01")
+    assert cache.get(REQUEST, day="2026-01-01") == {"content": "ответ"}
+    clock[0] += 10
+    assert cache.get(REQUEST, day="2026-01-01") is None
+
+    # Прошедшие сутки не сохраняются вовсе
+    cache.set(REQUEST, {"content": "ответ"}, day="2025-12-31")
+    assert cache.get(REQUEST, day="2025-12-31") is None
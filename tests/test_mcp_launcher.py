@@ -0,0 +1,71 @@
+# tests/test_mcp_launcher.py
+"""
+Тесты запуска MCP серверов: разбор npx команды и проверка версии пакета
+"""
+
+import json
+
+import pytest
+
+from shared import mcp_launcher
+from shared.mcp_launcher import (
+    LAUNCH_COLD, LAUNCH_DIRECT, LAUNCH_RESOLVED, LAUNCH_WARM, parse_npx_command, resolve_launch_command
+)
+
+
+@pytest.mark.parametrize("command, expected", [
+    (["npx", "-y", "tripadvisor-mcp-node"], ("tripadvisor-mcp-node", None, [])),
+    (["npx", "-y", "pkg@1.2.3", "--flag"], ("pkg", "1.2.3", ["--flag"])),
+    (["npx", "@scope/name"], ("@scope/name", None, [])),
+    (["npx", "-y", "@scope/name@latest"], ("@scope/name", "latest", [])),
+    (["node", "server.js"], None),
+    (["npx", "-y"], None),
+])
+def test_parse_npx_command(command, expected):
+    assert parse_npx_command(command) == expected
+
+
+@pytest.fixture
+def installed(tmp_path, monkeypatch):
+    """Установленный пакет pkg версии 1.2.3 и пустой манифест"""
+    package_dir = tmp_path / "node_modules" / "pkg"
+    package_dir.mkdir(parents=True)
+    (package_dir / "index.js").write_text("", encoding="utf-8")
+    (package_dir / "package.json").write_text(
+        json.dumps({"name": "pkg", "version": "1.2.3", "bin": "index.js"}), encoding="utf-8"
+    )
+
+    monkeypatch.setattr(mcp_launcher.shutil, "which", lambda name: f"/usr/bin/{name}")
+    monkeypatch.setattr(mcp_launcher, "_candidate_package_dirs", lambda package: [str(package_dir)])
+    monkeypatch.setitem(mcp_launcher.MCP_LAUNCH_CONFIG, "resolved_launch", True)
+    monkeypatch.setitem(mcp_launcher.MCP_LAUNCH_CONFIG, "manifest_path", str(tmp_path / "manifest.json"))
+    return package_dir
+
+
+def test_matching_version_launches_directly(installed):
+    command = ["npx", "-y", "pkg@1.2.3", "--flag"]
+    entry = str(installed / "index.js")
+    assert resolve_launch_command(command) == (["node", entry, "--flag"], LAUNCH_RESOLVED)
+    assert resolve_launch_command(command) == (["node", entry, "--flag"], LAUNCH_WARM)
+
+
+@pytest.mark.parametrize("spec", ["pkg@2.0.0", "pkg@latest"])
+def test_other_version_falls_back_to_npx(installed, spec):
+    command = ["npx", "-y", spec]
+    assert resolve_launch_command(command) == (command, LAUNCH_COLD)
+
+
+def test_package_updated_in_place_is_resolved_again(installed):
+    command = ["npx", "-y", "pkg@1.2.3"]
+    resolve_launch_command(command)
+    (installed / "package.json").write_text(
+        json.dumps({"name": "pkg", "version": "1.3.0", "bin": "index.js"}), encoding="utf-8"
+    )
+    assert resolve_launch_command(command) == (command, LAUNCH_COLD)
+    # Без закрепленной версии подходит любая установленная
+    assert resolve_launch_command(["npx", "-y", "pkg"])[1] == LAUNCH_RESOLVED
+
+
+def test_direct_command_is_unchanged():
+    command = ["python", "server.py"]
+    assert resolve_launch_command(command) == (command, LAUNCH_DIRECT)
@@ -0,0 +1,80 @@
+# tests/test_mcp_pool.py
+"""
+Тесты пула MCP процессов: остановка пула во время перезапуска воркера
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+from shared.mcp_pool import MCPServerPool, MCPWorker
+from shared.mcp_transport import MCPTransportError
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_mcp_server.py")
+
+
+def make_pool(initialize_delay: float = 0) -> MCPServerPool:
+    """Пул из одного воркера с тестовым сервером (без резолва команды)"""
+    pool = MCPServerPool([sys.executable, SERVER, str(initialize_delay)], startup_timeout=5, name="fake")
+    pool.workers = [MCPWorker(0, pool.command, subscribers=pool.subscribers)]
+    return pool
+
+
+def test_stop_during_restart_leaves_no_process():
+    async def scenario():
+        pool = make_pool(initialize_delay=0.5)
+        worker = pool.workers[0]
+        pool.schedule_restart(worker, "test")
+
+        # Дождаться, пока перезапуск создаст процесс и будет ждать initialize
+        while worker.process is None:
+            await asyncio.sleep(0.01)
+        process = worker.process
+
+        await pool.stop()
+        assert not pool._restart_tasks
+        assert process.returncode is not None
+        assert worker.process is None
+
+    asyncio.run(scenario())
+
+
+def test_restart_finishing_after_stop_is_discarded():
+    async def scenario():
+        pool = make_pool(initialize_delay=0.3)
+        worker = pool.workers[0]
+        # Перезапуск не из фоновой задачи: stop() не может его отменить
+        restart = asyncio.ensure_future(pool.restart_worker(worker, "test"))
+        while worker.process is None:
+            await asyncio.sleep(0.01)
+        process = worker.process
+
+        await pool.stop()
+        with pytest.raises(MCPTransportError):
+            await restart
+        assert process.returncode is not None
+        assert worker.process is None
+
+    asyncio.run(scenario())
+
+
+def test_stopped_pool_refuses_requests_and_restarts():
+    async def scenario():
+        pool = make_pool()
+        assert await pool._start_worker(pool.workers[0])
+        worker = pool.workers[0]
+        response = await pool.request("ping", {}, timeout=5)
+        assert response["result"] == {}
+
+        await pool.stop()
+        with pytest.raises(MCPTransportError):
+            await pool.request("ping", {}, timeout=5)
+        with pytest.raises(MCPTransportError):
+            pool.schedule_restart(worker, "test")
+        with pytest.raises(MCPTransportError):
+            await pool.restart_worker(worker, "test")
+        assert worker.process is None
+
+    asyncio.run(scenario())
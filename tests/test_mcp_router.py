@@ -0,0 +1,155 @@
+# tests/test_mcp_router.py
+"""
+Тесты маршрутизации сообщений MCP и ожидающих запросов транспорта
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+from shared.mcp_router import (
+    MessageRouter, classify_message, RESPONSE, NOTIFICATION, REQUEST, INVALID, METHOD_NOT_FOUND
+)
+from shared.mcp_transport import MCPTransport, MCPTransportError, MCPTimeoutError
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_mcp_server.py")
+
+
+def test_classify_message():
+    assert classify_message({"id": 1, "result": {}}) == RESPONSE
+    assert classify_message({"id": 1, "error": {"code": 1}}) == RESPONSE
+    assert classify_message({"method": "notifications/message"}) == NOTIFICATION
+    assert classify_message({"id": 7, "method": "ping"}) == REQUEST
+    assert classify_message({"id": 1}) == INVALID
+    assert classify_message("text") == INVALID
+
+
+def test_responses_resolve_their_own_futures():
+    async def scenario():
+        router = MessageRouter()
+        first, second = router.expect_response(1), router.expect_response(2)
+        # Ответы приходят не по порядку, в том числе batch-массивом
+        assert router.route([{"id": 2, "result": "b"}, {"id": 1, "result": "a"}]) == "batch"
+        assert (await first)["result"] == "a"
+        assert (await second)["result"] == "b"
+        # Ответ на неизвестный id пропускается
+        assert router.route({"id": 99, "result": {}}) == RESPONSE
+
+    asyncio.run(scenario())
+
+
+def test_fail_all_rejects_every_pending_request():
+    async def scenario():
+        router = MessageRouter()
+        futures = [router.expect_response(request_id) for request_id in (1, 2)]
+        router.fail_all(MCPTransportError("disconnected"))
+        for future in futures:
+            with pytest.raises(MCPTransportError):
+                await future
+
+    asyncio.run(scenario())
+
+
+def test_notifications_reach_subscribers_and_progress_watchers():
+    received, progress = [], []
+
+    async def scenario():
+        router = MessageRouter(subscribers={})
+        unsubscribe = router.subscribe("notifications/message", received.append)
+        router.watch_progress(5, progress.append)
+
+        router.route({"method": "notifications/message", "params": {"data": "hello"}})
+        router.route({"method": "notifications/progress", "params": {"progressToken": 5, "progress": 1}})
+        router.route({"method": "notifications/progress", "params": {"progressToken": 6, "progress": 1}})
+        unsubscribe()
+        router.route({"method": "notifications/message", "params": {"data": "ignored"}})
+
+    asyncio.run(scenario())
+    assert received == [{"data": "hello"}]
+    assert progress == [{"progressToken": 5, "progress": 1}]
+
+
+def test_server_requests_get_answers():
+    replies = []
+
+    async def reply(message):
+        replies.append(message)
+
+    async def scenario():
+        router = MessageRouter(reply)
+        router.handle_requests("roots/list", lambda params: {"roots": []})
+        router.route({"id": 1, "method": "ping"})
+        router.route({"id": 2, "method": "roots/list"})
+        router.route({"id": 3, "method": "sampling/createMessage"})
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    by_id = {message["id"]: message for message in replies}
+    assert by_id[1]["result"] == {}
+    assert by_id[2]["result"] == {"roots": []}
+    assert by_id[3]["error"]["code"] == METHOD_NOT_FOUND
+
+
+async def start_transport() -> MCPTransport:
+    """Транспорт поверх тестового сервера"""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, SERVER,
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    return MCPTransport(process)
+
+
+async def stop_transport(transport: MCPTransport) -> None:
+    """Закрытие транспорта и процесса"""
+    await transport.close()
+    if transport.process.returncode is None:
+        transport.process.kill()
+    await transport.process.wait()
+
+
+def test_transport_multiplexes_concurrent_requests():
+    async def scenario():
+        transport = await start_transport()
+        try:
+            responses = await asyncio.gather(*[transport.request("ping", {}, timeout=5) for _ in range(5)])
+            assert sorted(response["id"] for response in responses) == [1, 2, 3, 4, 5]
+        finally:
+            await stop_transport(transport)
+
+    asyncio.run(scenario())
+
+
+def test_pending_requests_fail_when_server_disconnects():
+    async def scenario():
+        transport = await start_transport()
+        try:
+            hanging = [asyncio.ensure_future(transport.request("test/hang", {})) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            with pytest.raises(MCPTransportError):
+                await transport.request("test/exit", {}, timeout=5)
+            for request in hanging:
+                with pytest.raises(MCPTransportError):
+                    await request
+            assert transport.closed
+            with pytest.raises(MCPTransportError):
+                await transport.request("ping", {}, timeout=5)
+        finally:
+            await stop_transport(transport)
+
+    asyncio.run(scenario())
+
+
+def test_unanswered_request_times_out():
+    async def scenario():
+        transport = await start_transport()
+        try:
+            with pytest.raises(MCPTimeoutError):
+                await transport.request("test/hang", {}, timeout=0.05)
+            # Транспорт остается рабочим после таймаута
+            assert (await transport.request("ping", {}, timeout=5))["result"] == {}
+        finally:
+            await stop_transport(transport)
+
+    asyncio.run(scenario())
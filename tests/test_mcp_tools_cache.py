@@ -0,0 +1,77 @@
+# tests/test_mcp_tools_cache.py
+"""
+Тесты кэша схемы инструментов MCP: проверка хэша, копия на диске, инвалидация
+"""
+
+import asyncio
+import json
+
+from shared.mcp_client import AsyncMCPClientBase
+from shared.mcp_router import MessageRouter
+from shared.mcp_tools_cache import ToolSchemaCache, tools_hash
+
+TOOLS = [{"name": "search", "inputSchema": {"type": "object", "properties": {"q": {"type": "string"}}}}]
+
+
+def test_tools_hash_ignores_key_order():
+    reordered = [{"inputSchema": {"properties": {"q": {"type": "string"}}, "type": "object"}, "name": "search"}]
+    assert tools_hash(TOOLS) == tools_hash(reordered)
+    assert tools_hash(TOOLS) != tools_hash([{"name": "other"}])
+
+
+def test_disk_copy_survives_new_instance(tmp_path):
+    path = str(tmp_path / "tools.json")
+    first = ToolSchemaCache("server", path)
+    assert not first.load()
+    assert first.update(TOOLS)
+
+    second = ToolSchemaCache("server", path)
+    assert second.load()
+    assert second.tools == TOOLS
+    # С диска схема еще не подтверждена сервером
+    assert not second.validated
+    assert not ToolSchemaCache("other server", path).load()
+
+
+def test_load_rejects_entry_with_wrong_hash(tmp_path):
+    path = tmp_path / "tools.json"
+    path.write_text(json.dumps({"server": {"hash": "stale", "tools": TOOLS}}), encoding="utf-8")
+    cache = ToolSchemaCache("server", str(path))
+    assert not cache.load()
+    assert cache.tools is None
+
+
+def test_update_reports_changes(tmp_path):
+    cache = ToolSchemaCache("server", str(tmp_path / "tools.json"))
+    assert cache.update(TOOLS) is True
+    assert cache.update(json.loads(json.dumps(TOOLS))) is False
+    assert cache.update(TOOLS + [{"name": "details"}]) is True
+    assert cache.validated
+    assert cache.stats()["fetches"] == 3
+
+
+def test_async_variants_match_sync(tmp_path):
+    path = str(tmp_path / "tools.json")
+
+    async def scenario():
+        writer = ToolSchemaCache("server", path)
+        assert await writer.aupdate(TOOLS) is True
+        assert await writer.aupdate(TOOLS) is False
+        reader = ToolSchemaCache("server", path)
+        assert await reader.aload()
+        return reader.tools
+
+    assert asyncio.run(scenario()) == TOOLS
+
+
+def test_list_changed_notification_invalidates_schema(tmp_path):
+    client = AsyncMCPClientBase(["server"], {})
+    client.tools_cache = ToolSchemaCache("server", str(tmp_path / "tools.json"))
+    client.tools_cache.update(TOOLS)
+    assert client.tools_cache.validated
+
+    router = MessageRouter(subscribers=client.subscribers)
+    router.route({"jsonrpc": "2.0", "method": "notifications/tools/list_changed"})
+    assert not client.tools_cache.validated
+    # Схема остается доступной до повторного запроса
+    assert client.tools_cache.tools == TOOLS
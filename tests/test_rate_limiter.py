@@ -0,0 +1,172 @@
+# tests/test_rate_limiter.py
+"""
+Тесты AdaptiveRateLimiter: AIMD параллелизма, дневная квота и ее сохранение
+"""
+
+import asyncio
+
+import pytest
+
+from shared.cache import MemoryCache
+from shared.rate_limiter import (
+    AdaptiveRateLimiter, DailyQuotaExceeded, OUTCOME_OK, OUTCOME_THROTTLED, OUTCOME_ERROR
+)
+
+
+class CountingStore(MemoryCache):
+    """Хранилище квоты, считающее записи"""
+
+    def __init__(self):
+        super().__init__("quota", ttl=3600)
+        self.writes = 0
+
+    def set(self, key, value, ttl=None):
+        self.writes += 1
+        super().set(key, value, ttl)
+
+
+def make_limiter(**kwargs) -> AdaptiveRateLimiter:
+    """Лимитер без ожидания токенов"""
+    options = {"rate": 1000, "burst": 1000, "max_concurrency": 8}
+    options.update(kwargs)
+    return AdaptiveRateLimiter(**options)
+
+
+async def call(limiter: AdaptiveRateLimiter, outcome: str = OUTCOME_OK) -> None:
+    """Один запрос через лимитер"""
+    await limiter.acquire()
+    await limiter.release(outcome)
+
+
+def test_concurrency_decreases_multiplicatively_and_recovers_additively():
+    async def scenario():
+        limiter = make_limiter(throttle_cooldown=0)
+        await call(limiter, OUTCOME_THROTTLED)
+        assert limiter.limit == 4
+        await call(limiter, OUTCOME_ERROR)
+        assert limiter.limit == 3
+        # +1 за каждые limit успешных ответов
+        for _ in range(3):
+            await call(limiter)
+        assert limiter.limit == pytest.approx(4, abs=0.1)
+        for _ in range(100):
+            await call(limiter)
+        assert limiter.limit == 8
+
+    asyncio.run(scenario())
+
+
+def test_concurrency_never_drops_below_minimum():
+    async def scenario():
+        limiter = make_limiter(min_concurrency=2, throttle_cooldown=0)
+        for _ in range(10):
+            await call(limiter, OUTCOME_THROTTLED)
+        assert limiter.limit == 2
+
+    asyncio.run(scenario())
+
+
+def test_in_flight_requests_are_bounded_by_limit():
+    peak = []
+
+    async def scenario():
+        limiter = make_limiter(max_concurrency=2)
+
+        async def request():
+            await limiter.acquire()
+            peak.append(limiter.in_flight)
+            await asyncio.sleep(0.01)
+            await limiter.release()
+
+        await asyncio.gather(*[request() for _ in range(6)])
+
+    asyncio.run(scenario())
+    assert max(peak) == 2
+
+
+def test_daily_quota_is_enforced():
+    async def scenario():
+        limiter = make_limiter(daily_quota=2)
+        await call(limiter)
+        await call(limiter)
+        with pytest.raises(DailyQuotaExceeded):
+            await limiter.acquire()
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_waiters_do_not_overshoot_quota():
+    async def scenario():
+        # Токены выдаются медленно: все запросы ждут их одновременно
+        limiter = make_limiter(rate=200, burst=1, daily_quota=3)
+        results = await asyncio.gather(*[call(limiter) for _ in range(8)], return_exceptions=True)
+        assert sum(result is None for result in results) == 3
+        assert all(isinstance(result, DailyQuotaExceeded) for result in results if result is not None)
+        assert limiter.used_today == 3
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_returns_reserved_quota():
+    async def scenario():
+        limiter = make_limiter(rate=1, burst=1, daily_quota=2)
+        await call(limiter)
+        # Токенов больше нет: запрос ждет, удерживая резерв квоты
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        with pytest.raises(DailyQuotaExceeded):
+            await limiter.acquire()
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.in_flight == 0
+        assert limiter.used_today == 1
+
+        limiter._tokens = 1
+        await call(limiter)
+        assert limiter.used_today == 2
+
+    asyncio.run(scenario())
+
+
+def test_quota_resets_on_new_day_and_keeps_each_day_in_store(monkeypatch):
+    store = CountingStore()
+    day = ["2026-01-01"]
+    monkeypatch.setattr(AdaptiveRateLimiter, "_today", staticmethod(lambda: day[0]))
+
+    async def scenario():
+        limiter = make_limiter(daily_quota=2, quota_store=store, quota_flush_interval=60)
+        await call(limiter)
+        await call(limiter)
+        with pytest.raises(DailyQuotaExceeded):
+            await limiter.acquire()
+
+        day[0] = "2026-01-02"
+        await call(limiter)
+        assert limiter.used_today == 1
+        await limiter.close()
+
+    asyncio.run(scenario())
+    assert store.get("quota:2026-01-01") == 2
+    assert store.get("quota:2026-01-02") == 1
+
+
+def test_usage_is_flushed_in_batches_and_restored():
+    store = CountingStore()
+
+    async def scenario():
+        limiter = make_limiter(quota_store=store, quota_flush_interval=0.02)
+        for _ in range(10):
+            await call(limiter)
+        # Счетчик еще не записан: запись отложена на интервал
+        assert store.writes == 0
+        await asyncio.sleep(0.05)
+        assert store.writes == 1
+        await limiter.close()
+
+    asyncio.run(scenario())
+    assert store.writes == 1
+    assert make_limiter(quota_store=store).used_today == 10
@@ -0,0 +1,152 @@
+# tests/test_single_flight.py
+"""
+Тесты SingleFlight: объединение вызовов, таймауты и отмена ожидающих
+(в том числе для объединенных tools/call клиента)
+"""
+
+import asyncio
+import math
+
+import pytest
+
+from shared.mcp_client import AsyncMCPClientBase
+from shared.mcp_transport import MCPTimeoutError, SENT_REQUEST_IDS
+from shared.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_request():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*[flight.do("key", call) for _ in range(5)])
+        assert results == ["result"] * 5
+        assert flight.stats() == {"calls": 1, "absorbed": 4, "in_flight": 0}
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+
+
+def test_error_reaches_every_waiter():
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*[flight.do("key", call) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+    asyncio.run(scenario())
+
+
+def test_joiner_times_out_by_its_own_deadline():
+    async def call():
+        await asyncio.sleep(0.2)
+        return "result"
+
+    async def scenario():
+        flight = SingleFlight()
+        owner = asyncio.ensure_future(flight.do("key", call))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.do("key", call, timeout=0.02)
+        # Общий вызов продолжается для первого вызывающего
+        assert await owner == "result"
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_one_waiter_keeps_the_call():
+    async def call():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def scenario():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("key", call))
+        second = asyncio.ensure_future(flight.do("key", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "result"
+
+    asyncio.run(scenario())
+
+
+def test_last_waiter_leaving_cancels_the_call():
+    cancelled = []
+
+    async def call():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def scenario():
+        flight = SingleFlight()
+        waiters = [asyncio.ensure_future(flight.do("key", call, timeout=0.02)) for _ in range(2)]
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+        await asyncio.sleep(0)
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+    assert cancelled == [1]
+
+
+class SlowClient(AsyncMCPClientBase):
+    """Клиент без сервера: tools/call отвечает через delay секунд"""
+
+    def __init__(self, delay: float):
+        super().__init__(["server"], {}, idempotent_tools={"search"})
+        self.delay = delay
+        self.timeouts = []
+
+    async def send_request(self, method, params, timeout=None, idempotent=None, on_progress=None):
+        self.timeouts.append(timeout)
+        sent_ids = SENT_REQUEST_IDS.get()
+        if sent_ids is not None:
+            sent_ids.append(len(self.timeouts) + 100)
+        await asyncio.sleep(self.delay)
+        return {"result": params["arguments"]}
+
+
+def test_shared_tool_call_outlives_first_callers_deadline():
+    async def scenario():
+        client = SlowClient(delay=0.05)
+        owner = asyncio.ensure_future(client.call_tool("search", {"q": "cafe"}, timeout=0.01))
+        await asyncio.sleep(0)
+        joiner = asyncio.ensure_future(client.call_tool("search", {"q": "cafe"}, timeout=1))
+
+        with pytest.raises(MCPTimeoutError) as error:
+            await owner
+        # id общего запроса, а не None
+        assert error.value.request_id == 101
+        assert await joiner == {"result": {"q": "cafe"}}
+        # Общий запрос идет без дедлайна первого вызывающего
+        assert client.timeouts == [math.inf]
+        assert not client._flight_request_ids
+
+    asyncio.run(scenario())
+
+
+def test_shared_tool_call_is_cancelled_after_last_deadline():
+    async def scenario():
+        client = SlowClient(delay=1)
+        results = await asyncio.gather(
+            client.call_tool("search", {"q": "cafe"}, timeout=0.01),
+            client.call_tool("search", {"q": "cafe"}, timeout=0.03),
+            return_exceptions=True
+        )
+        assert all(isinstance(result, MCPTimeoutError) for result in results)
+        assert [result.timeout for result in results] == [0.01, 0.03]
+        await asyncio.sleep(0)
+        assert client.single_flight_stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
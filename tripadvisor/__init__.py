@@ -3,7 +3,7 @@
 Модуль для работы с TripAdvisor MCP сервером
 """
 
-from .client import MCPClient
+from .client import MCPClient, AsyncMCPClient
 from .integrator import Integrator
 
-__all__ = ['MCPClient', 'Integrator']
\ No newline at end of file
+__all__ = ['MCPClient', 'AsyncMCPClient', 'Integrator']
\ No newline at end of file
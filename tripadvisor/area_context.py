@@ -0,0 +1,144 @@
+# tripadvisor/area_context.py
+"""
+Общие данные TripAdvisor о районе одного жилья
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class AreaContext:
+    """
+    Данные о районе вокруг координат жилья: рестораны и достопримечательности
+    рядом, места в городе, детали и отзывы мест
+
+    Каждый запрос выполняется при первом обращении и запоминается на время
+    жизни контекста (ttl), поэтому вкладки и анализы одного жилья не повторяют
+    одни и те же MCP вызовы. Одновременные обращения к еще не готовым данным
+    ждут один общий запрос; он отменяется, только если отменены все ожидающие.
+    Неудачные, отмененные и пустые (ошибка API в ответе сервера) результаты
+    не запоминаются - как и в кэше ответов клиента.
+    """
+
+    def __init__(self, client, latitude: float, longitude: float, city: Optional[str] = None,
+                 ttl: Optional[float] = None):
+        """
+        Инициализация пустого контекста
+
+        Args:
+            client: Асинхронный TripAdvisor клиент (tripadvisor.client.AsyncMCPClient)
+            latitude: Широта жилья
+            longitude: Долгота жилья
+            city: Город поиска жилья (для поиска мест в городе)
+            ttl: Время жизни контекста в секундах (None - без ограничения)
+        """
+        self.client = client
+        self.latitude = latitude
+        self.longitude = longitude
+        self.city = city
+        self.ttl = ttl
+        self.created_at = time.monotonic()
+
+        self.requests = 0
+        self.reused = 0
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def expired(self) -> bool:
+        """Данные контекста старше ttl и должны быть запрошены заново"""
+        return self.ttl is not None and time.monotonic() - self.created_at >= self.ttl
+
+    async def restaurants(self) -> List[Dict]:
+        """Рестораны рядом с жильем"""
+        return await self._memoize(
+            ("nearby", "restaurants"),
+            lambda: self.client.search_nearby_locations(self.latitude, self.longitude, "restaurants")
+        )
+
+    async def attractions(self) -> List[Dict]:
+        """Достопримечательности рядом с жильем"""
+        return await self._memoize(
+            ("nearby", "attractions"),
+            lambda: self.client.search_nearby_locations(self.latitude, self.longitude, "attractions")
+        )
+
+    async def city_places(self) -> List[Dict]:
+        """Достопримечательности города поиска (пусто, если город неизвестен)"""
+        if not self.city:
+            return []
+        return await self._memoize(
+            ("city", self.city),
+            lambda: self.client.search_locations(f"{self.city} attractions")
+        )
+
+    async def details(self, location_id: str) -> Dict:
+        """Детальная информация о месте"""
+        return await self._memoize(
+            ("details", str(location_id)),
+            lambda: self.client.get_location_details(location_id)
+        )
+
+    async def reviews(self, location_id: str) -> List[Dict]:
+        """Отзывы о месте"""
+        return await self._memoize(
+            ("reviews", str(location_id)),
+            lambda: self.client.get_location_reviews(location_id)
+        )
+
+    async def _memoize(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Результат запроса: запомненный, общий выполняющийся или новый
+
+        Args:
+            key: Ключ данных в контексте
+            call: Фабрика корутины запроса
+
+        Returns:
+            Any: Результат запроса
+        """
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None or (task.done() and not self._reusable(task)):
+                self.requests += 1
+                task = asyncio.get_running_loop().create_task(call())
+                task.add_done_callback(self._retrieve_exception)
+                self._tasks[key] = task
+            else:
+                self.reused += 1
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+
+        # Отмена одного из ожидающих не прерывает запрос для остальных
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            with self._lock:
+                if self._waiters[key] == 1 and not task.done():
+                    task.cancel()
+            raise
+        finally:
+            with self._lock:
+                self._waiters[key] -= 1
+
+    @staticmethod
+    def _reusable(task: asyncio.Task) -> bool:
+        """Завершенный запрос дал непустой результат"""
+        return not task.cancelled() and task.exception() is None and bool(task.result())
+
+    @staticmethod
+    def _retrieve_exception(task: asyncio.Task) -> None:
+        """Ошибку уже получили ожидающие; иначе asyncio предупредит о ней"""
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики выполненных и переиспользованных запросов"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "reused": self.reused,
+                "entries": len(self._tasks)
+            }
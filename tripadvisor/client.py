@@ -3,145 +3,199 @@
 Клиент для работы с TripAdvisor MCP сервером
 """
 
-import subprocess
-import json
+import asyncio
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 from .config import TRIPADVISOR_CONFIG, MESSAGES
 from config import EMOJIS
+from shared.mcp_client import AsyncMCPClientBase, MCPClientBase
+from shared.cache import create_cache, make_key, TTLCache
+from shared.rate_limiter import (
+    AdaptiveRateLimiter, DailyQuotaExceeded, OUTCOME_OK, OUTCOME_THROTTLED, OUTCOME_ERROR
+)
+from shared import geohash
 
+# Отсутствие параметра cache: кэш по конфигу
+_DEFAULT_CACHE = object()
 
-class MCPClient:
+
+def _meters_per_distance_unit() -> float:
+    """Метров в единице поля distance ответов TripAdvisor"""
+    unit = TRIPADVISOR_CONFIG["nearby_tiles"]["distance_unit"]
+    return geohash.METERS_PER_MILE if unit == "mi" else 1000.0
+
+
+def _rate_limit_outcome(response: Dict) -> str:
+    """Исход запроса для лимитера: 429, ошибка сервера/соединения или успех"""
+    if not response:
+        return OUTCOME_ERROR
+    
+    if "error" in response:
+        text = str(response["error"])
+    elif response.get("result", {}).get("isError"):
+        text = " ".join(str(item.get("text", "")) for item in response["result"].get("content", []))
+    else:
+        return OUTCOME_OK
+    
+    lowered = text.lower()
+    if "429" in lowered or "too many requests" in lowered or "rate limit" in lowered:
+        return OUTCOME_THROTTLED
+    if any(code in lowered for code in ("500", "502", "503", "504")):
+        return OUTCOME_ERROR
+    # Ошибка запроса (например, неизвестный locationId) не говорит о перегрузке API
+    return OUTCOME_OK
+
+
+class AsyncMCPClient(AsyncMCPClientBase):
     """
-    Клиент для взаимодействия с TripAdvisor MCP сервером
+    Асинхронный клиент для взаимодействия с TripAdvisor MCP сервером
     
     ВАЖНО: Использует обходной путь для поиска по координатам из-за бага 
     в TripAdvisor MCP сервере (search_nearby_locations не работает корректно)
     """
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, cache: Any = _DEFAULT_CACHE):
         """
         Инициализация клиента
         
         Args:
             api_key: API ключ TripAdvisor
+            cache: Кэш ответов с методами get/set(key, value, ttl) и stats
+                (по умолчанию из TRIPADVISOR_CONFIG["cache"], None - без кэша)
         """
+        super().__init__(
+            TRIPADVISOR_CONFIG["mcp_command"],
+            MESSAGES,
+            pool_size=TRIPADVISOR_CONFIG["pool_size"],
+            startup_timeout=TRIPADVISOR_CONFIG["startup_timeout"],
+            request_timeout=TRIPADVISOR_CONFIG["request_timeout"],
+            tool_timeouts=TRIPADVISOR_CONFIG["tool_timeouts"],
+            idempotent_tools=TRIPADVISOR_CONFIG["idempotent_tools"]
+        )
         self.api_key = api_key or TRIPADVISOR_CONFIG["api_key"]
-        self.process: Optional[subprocess.Popen] = None
         self.default_language = TRIPADVISOR_CONFIG["default_language"]
+        
+        cache_config = TRIPADVISOR_CONFIG["cache"]
+        self.cache_ttl = cache_config["ttl"]
+        if cache is _DEFAULT_CACHE:
+            cache = create_cache(
+                "tripadvisor",
+                cache_config["backend"],
+                ttl=min(self.cache_ttl.values()),
+                max_entries=cache_config["max_entries"]
+            )
+        self.cache = cache
+        
+        # Общий для всех вызовов инструментов темп запросов к API
+        rate_config = TRIPADVISOR_CONFIG["rate_limit"]
+        self.rate_limiter = AdaptiveRateLimiter(
+            rate=rate_config["rate"],
+            burst=rate_config["burst"],
+            max_concurrency=rate_config["max_concurrency"],
+            min_concurrency=rate_config["min_concurrency"],
+            daily_quota=rate_config["daily_quota"],
+            throttle_cooldown=rate_config["throttle_cooldown"],
+            quota_store=TTLCache("tripadvisor_quota", ttl=2 * 24 * 3600, max_entries=10),
+            quota_flush_interval=rate_config["quota_flush_interval"]
+        ) if rate_config["enabled"] else None
     
-    def start_server(self) -> bool:
+    def _server_env(self) -> Optional[Dict[str, str]]:
+        """Передаем API ключ через переменные окружения"""
+        env = os.environ.copy()
+        env['TRIPADVISOR_API_KEY'] = self.api_key
+        return env
+    
+    async def start_server(self) -> bool:
         """
         Запуск TripAdvisor MCP сервера
         
         Returns:
             bool: True если сервер успешно запущен
         """
-        print(f"{EMOJIS['start']} {MESSAGES['starting_server']}")
-        
         if not self.api_key or "YOUR_API_KEY" in self.api_key:
+            print(f"{EMOJIS['start']} {MESSAGES['starting_server']}")
             print(f"{EMOJIS['error']} {MESSAGES['api_key_missing']}")
             return False
         
-        try:
-            # Передаем API ключ через переменные окружения
-            env = os.environ.copy()
-            env['TRIPADVISOR_API_KEY'] = self.api_key
-            
-            self.process = subprocess.Popen(
-                TRIPADVISOR_CONFIG["mcp_command"],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=0,
-                env=env
-            )
-            
-            # Ждем пока сервер запустится
-            startup_line = self.process.stderr.readline()
-            print(f"{EMOJIS['success']} {startup_line.strip()}")
-            
-            # Инициализация сервера
-            self._initialize_server()
-            return True
-            
-        except Exception as e:
-            print(f"{EMOJIS['error']} {MESSAGES['server_error'].format(error=e)}")
-            return False
+        return await super().start_server()
     
-    def _initialize_server(self) -> None:
-        """Инициализация MCP сервера"""
-        init_message = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {"name": "airbnb-travel-assistant", "version": "1.0.0"}
-            }
-        }
-        
-        self.send_request("initialize", init_message["params"])
+    async def stop_server(self):
+        """Остановка сервера и сохранение счетчика дневной квоты"""
+        await super().stop_server()
+        if self.rate_limiter is not None:
+            await self.rate_limiter.close()
     
-    def send_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    async def send_request(self, method: str, params: Dict, timeout: Optional[float] = None,
+                           idempotent: bool = None, on_progress: Optional[Callable[[Dict], Any]] = None) -> Dict:
         """
         Отправка запроса к TripAdvisor MCP серверу
         
         Args:
             method: Метод для вызова
             params: Параметры запроса
+            timeout: Дедлайн в секундах (по умолчанию request_timeout)
+            idempotent: Повторять ли запрос после падения сервера
+            on_progress: Обработчик notifications/progress запроса
             
         Returns:
             Dict: Ответ от сервера
+            
+        Raises:
+            MCPError: Потеря соединения (MCPTransportError), дедлайн
+                (MCPTimeoutError) или исчерпанная дневная квота (DailyQuotaExceeded)
         """
-        if not self.process:
+        if not self.pool:
             raise RuntimeError("TripAdvisor сервер не запущен")
         
-        request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": method,
-            "params": params
-        }
-        
-        request_json = json.dumps(request) + "\n"
-        self.process.stdin.write(request_json)
-        self.process.stdin.flush()
+        # Темп ограничиваем только для вызовов API, служебные запросы идут сразу
+        limiter = self.rate_limiter if method == "tools/call" else None
+        if limiter is not None:
+            try:
+                await limiter.acquire()
+            except DailyQuotaExceeded:
+                print(f"{EMOJIS['error']} {MESSAGES['quota_exceeded']}")
+                raise
         
-        # Читаем ответ
-        response_line = self.process.stdout.readline()
-        return json.loads(response_line) if response_line else {}
+        # Исход по умолчанию - ошибка: таймаут и потеря соединения тоже снижают параллелизм
+        outcome = OUTCOME_ERROR
+        try:
+            response = await super().send_request(method, params, timeout, idempotent, on_progress)
+            outcome = _rate_limit_outcome(response)
+            return response
+        finally:
+            if limiter is not None:
+                await limiter.release(outcome)
     
-    def search_locations(self, search_query: str, category: str = None) -> List[Dict]:
+    def rate_limit_stats(self) -> Dict[str, Any]:
+        """Состояние лимитера запросов к API"""
+        return self.rate_limiter.stats() if self.rate_limiter is not None else {}
+    
+    async def search_locations(self, search_query: str, category: str = None, timeout: Optional[float] = None) -> List[Dict]:
         """
         Поиск локаций в TripAdvisor
         
         Args:
             search_query: Поисковый запрос
             category: Категория (attractions, restaurants, hotels)
+            timeout: Дедлайн запроса в секундах
             
         Returns:
             List[Dict]: Список найденных локаций
         """
         print(f"{EMOJIS['search']} {MESSAGES['searching'].format(query=search_query)}")
         
-        params = {
-            "name": "search_locations",
-            "arguments": {
-                "searchQuery": search_query,
-                "language": self.default_language
-            }
+        arguments = {
+            "searchQuery": search_query,
+            "language": self.default_language
         }
         
         if category:
-            params["arguments"]["category"] = category
+            arguments["category"] = category
         
-        response = self.send_request("tools/call", params)
-        return self._parse_search_results(response)
+        return await self._cached_call("search_locations", arguments, self._parse_search_results, timeout)
     
-    def search_nearby_locations(self, latitude: float, longitude: float, category: str = None, search_query: str = None) -> List[Dict]:
+    async def search_nearby_locations(self, latitude: float, longitude: float, category: str = None, search_query: str = None,
+                                      timeout: Optional[float] = None) -> List[Dict]:
         """
         Поиск локаций рядом с координатами (через search_locations с latLong)
         
@@ -152,6 +206,7 @@ class MCPClient:
             longitude: Долгота
             category: Категория поиска
             search_query: Поисковый запрос
+            timeout: Дедлайн запроса в секундах
             
         Returns:
             List[Dict]: Список найденных локаций
@@ -165,66 +220,180 @@ class MCPClient:
             else:
                 search_query = "places near me"
         
+        tiles = TRIPADVISOR_CONFIG["nearby_tiles"]
+        if not tiles["enabled"]:
+            return await self._search_at(latitude, longitude, category, search_query, timeout)
+        
+        # Читаем ячейки вокруг листинга и ранжируем места по расстоянию до него
+        cells = geohash.covering_cells(
+            latitude, longitude, tiles["cover_radius"], tiles["precision"], tiles["max_cells"]
+        )
+        tile_results = await asyncio.gather(*[
+            self._search_tile(cell, category, search_query, timeout) for cell in cells
+        ])
+        return self._rank_by_distance(tile_results, latitude, longitude)
+    
+    async def _search_at(self, latitude: float, longitude: float, category: Optional[str], search_query: str,
+                         timeout: Optional[float] = None, parse: Optional[Callable[[Dict], Any]] = None,
+                         key_extra: Optional[str] = None) -> List[Dict]:
+        """Поиск search_locations с latLong (обходной путь вместо search_nearby_locations)"""
         # ОБХОДНОЙ ПУТЬ: используем search_locations с latLong параметром
         # Формат latLong: "latitude,longitude"
         lat_long_str = f"{latitude},{longitude}"
         
-        params = {
-            "name": "search_locations",  # НЕ search_nearby_locations!
-            "arguments": {
-                "searchQuery": search_query,
-                "latLong": lat_long_str,   # Координаты в формате строки
-                "language": self.default_language
-            }
+        arguments = {
+            "searchQuery": search_query,
+            "latLong": lat_long_str,   # Координаты в формате строки
+            "language": self.default_language
         }
         
         if category:
-            params["arguments"]["category"] = category
+            arguments["category"] = category
         
-        response = self.send_request("tools/call", params)
-        return self._parse_search_results(response)
+        # НЕ search_nearby_locations!
+        return await self._cached_call(
+            "search_locations", arguments, parse or self._parse_search_results, timeout, key_extra
+        )
     
-    def get_location_details(self, location_id: str) -> Dict:
+    async def _search_tile(self, cell: str, category: Optional[str], search_query: str,
+                           timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Места вокруг центра geohash ячейки (кэшируются на ячейку)
+        
+        У каждого места сохраняются координаты: свои из ответа, если есть,
+        иначе вычисленные от центра ячейки по distance и bearing.
+        """
+        center_lat, center_lon = geohash.center(cell)
+        center_lat, center_lon = round(center_lat, 6), round(center_lon, 6)
+        
+        def parse(response: Dict) -> List[Dict]:
+            return self._locate_places(self._parse_search_results(response), center_lat, center_lon)
+        
+        return await self._search_at(center_lat, center_lon, category, search_query, timeout,
+                                     parse=parse, key_extra=f"tile:{cell}")
+    
+    def _locate_places(self, places: List[Dict], origin_lat: float, origin_lon: float) -> List[Dict]:
+        """Координаты мест из ответа поиска, выполненного из точки origin"""
+        meters_per_unit = _meters_per_distance_unit()
+        located = []
+        
+        for place in places:
+            place = dict(place)
+            try:
+                place["latitude"], place["longitude"] = float(place["latitude"]), float(place["longitude"])
+            except (KeyError, TypeError, ValueError):
+                place.pop("latitude", None)
+                place.pop("longitude", None)
+                try:
+                    distance_m = float(place["distance"]) * meters_per_unit
+                    bearing = geohash.BEARINGS[str(place["bearing"]).lower()]
+                    place["latitude"], place["longitude"] = geohash.project(origin_lat, origin_lon, distance_m, bearing)
+                except (KeyError, TypeError, ValueError):
+                    # Положение неизвестно: место останется в конце выдачи
+                    pass
+            located.append(place)
+        
+        return located
+    
+    def _rank_by_distance(self, tile_results: List[List[Dict]], latitude: float, longitude: float) -> List[Dict]:
+        """Объединение ячеек: без дублей, ближе max_distance, по расстоянию до листинга"""
+        tiles = TRIPADVISOR_CONFIG["nearby_tiles"]
+        meters_per_unit = _meters_per_distance_unit()
+        seen = set()
+        ranked = []
+        
+        for places in tile_results:
+            for place in places:
+                place_id = place.get("location_id") or place.get("name")
+                if place_id in seen:
+                    continue
+                seen.add(place_id)
+                
+                if "latitude" not in place:
+                    ranked.append((float("inf"), place))
+                    continue
+                
+                distance_m = geohash.haversine_m(latitude, longitude, place["latitude"], place["longitude"])
+                if distance_m > tiles["max_distance"]:
+                    continue
+                
+                bearing = geohash.initial_bearing(latitude, longitude, place["latitude"], place["longitude"])
+                ranked.append((distance_m, {
+                    **place,
+                    "distance": f"{distance_m / meters_per_unit:.6f}",
+                    "bearing": geohash.bearing_name(bearing)
+                }))
+        
+        ranked.sort(key=lambda item: item[0])
+        return [place for _, place in ranked[:TRIPADVISOR_CONFIG["max_results"]]]
+    
+    async def get_location_details(self, location_id: str, timeout: Optional[float] = None) -> Dict:
         """
         Получение детальной информации о локации
         
         Args:
             location_id: ID локации в TripAdvisor
+            timeout: Дедлайн запроса в секундах
             
         Returns:
             Dict: Детальная информация
         """
-        params = {
-            "name": "get_location_details",
-            "arguments": {
-                "locationId": location_id,
-                "language": self.default_language
-            }
-        }
-        
-        response = self.send_request("tools/call", params)
-        return self._parse_detail_response(response)
+        return await self._cached_call("get_location_details", {
+            "locationId": location_id,
+            "language": self.default_language
+        }, self._parse_detail_response, timeout)
     
-    def get_location_reviews(self, location_id: str) -> List[Dict]:
+    async def get_location_reviews(self, location_id: str, timeout: Optional[float] = None) -> List[Dict]:
         """
         Получение отзывов о локации
         
         Args:
             location_id: ID локации
+            timeout: Дедлайн запроса в секундах
             
         Returns:
             List[Dict]: Список отзывов
         """
-        params = {
-            "name": "get_location_reviews",
-            "arguments": {
-                "locationId": location_id,
-                "language": self.default_language
-            }
-        }
+        return await self._cached_call("get_location_reviews", {
+            "locationId": location_id,
+            "language": self.default_language
+        }, self._parse_reviews_response, timeout)
+    
+    async def _cached_call(self, tool: str, arguments: Dict[str, Any],
+                           parse: Callable[[Dict], Any], timeout: Optional[float] = None,
+                           key_extra: Optional[str] = None) -> Any:
+        """
+        Вызов инструмента через кэш ответов
+        
+        Ключ включает язык ответов, поэтому смена default_language
+        не отдает закэшированные ответы на другом языке.
+        
+        Args:
+            tool: Имя инструмента
+            arguments: Аргументы инструмента
+            parse: Парсер ответа сервера
+            timeout: Дедлайн запроса в секундах
+            key_extra: Дополнительная часть ключа (другой формат разобранного ответа)
+            
+        Returns:
+            Any: Разобранный ответ
+        """
+        key = make_key(tool, self.default_language, arguments, key_extra)
+        if self.cache is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached
         
-        response = self.send_request("tools/call", params)
-        return self._parse_reviews_response(response)
+        result = parse(await self.call_tool(tool, arguments, timeout))
+        
+        # Пустые ответы (ошибка API, потеря соединения) не кэшируем
+        if self.cache is not None and result:
+            await self.cache.aset(key, result, ttl=self.cache_ttl.get(tool))
+        return result
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Счетчики кэша ответов"""
+        return self.cache.stats() if self.cache is not None else {}
     
     def _parse_search_results(self, response: Dict) -> List[Dict]:
         """Парсинг результатов поиска"""
@@ -261,10 +430,92 @@ class MCPClient:
         except Exception as e:
             print(f"{EMOJIS['error']} Ошибка парсинга отзывов: {e}")
             return []
+
+
+class MCPClient(MCPClientBase):
+    """
+    Клиент для взаимодействия с TripAdvisor MCP сервером (синхронная обертка)
+    
+    ВАЖНО: Использует обходной путь для поиска по координатам из-за бага 
+    в TripAdvisor MCP сервере (search_nearby_locations не работает корректно)
+    """
+    
+    def __init__(self, api_key: str = None, cache: Any = _DEFAULT_CACHE):
+        """
+        Инициализация клиента
+        
+        Args:
+            api_key: API ключ TripAdvisor
+            cache: Кэш ответов (по умолчанию из конфига, None - без кэша)
+        """
+        super().__init__(AsyncMCPClient(api_key, cache))
+    
+    @property
+    def default_language(self) -> str:
+        """Язык ответов TripAdvisor"""
+        return self.async_client.default_language
+    
+    def search_locations(self, search_query: str, category: str = None, timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Поиск локаций в TripAdvisor
+        
+        Args:
+            search_query: Поисковый запрос
+            category: Категория (attractions, restaurants, hotels)
+            timeout: Дедлайн запроса в секундах
+            
+        Returns:
+            List[Dict]: Список найденных локаций
+        """
+        return self._run(self.async_client.search_locations(search_query, category, timeout))
+    
+    def search_nearby_locations(self, latitude: float, longitude: float, category: str = None, search_query: str = None,
+                                timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Поиск локаций рядом с координатами
+        
+        Args:
+            latitude: Широта
+            longitude: Долгота
+            category: Категория поиска
+            search_query: Поисковый запрос
+            timeout: Дедлайн запроса в секундах
+            
+        Returns:
+            List[Dict]: Список найденных локаций
+        """
+        return self._run(self.async_client.search_nearby_locations(latitude, longitude, category, search_query, timeout))
+    
+    def get_location_details(self, location_id: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Получение детальной информации о локации
+        
+        Args:
+            location_id: ID локации в TripAdvisor
+            timeout: Дедлайн запроса в секундах
+            
+        Returns:
+            Dict: Детальная информация
+        """
+        return self._run(self.async_client.get_location_details(location_id, timeout))
+    
+    def get_location_reviews(self, location_id: str, timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Получение отзывов о локации
+        
+        Args:
+            location_id: ID локации
+            timeout: Дедлайн запроса в секундах
+            
+        Returns:
+            List[Dict]: Список отзывов
+        """
+        return self._run(self.async_client.get_location_reviews(location_id, timeout))
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Счетчики кэша ответов"""
+        return self.async_client.cache_stats()
     
-    def stop_server(self):
-        """Остановка сервера"""
-        if self.process:
-            self.process.terminate()
-            print(f"{EMOJIS['stop']} {MESSAGES['server_stopped']}")
-            self.process = None
\ No newline at end of file
+    def rate_limit_stats(self) -> Dict[str, Any]:
+        """Состояние лимитера запросов к API"""
+        return self.async_client.rate_limit_stats()
@@ -12,17 +12,65 @@ load_dotenv()
 TRIPADVISOR_CONFIG = {
     "api_key": os.getenv("TRIPADVISOR_API_KEY", ""),  # Вставьте ваш ключ
     "mcp_command": ["npx", "-y", "tripadvisor-mcp-node"],
+    "pool_size": 1,  # Процессов сервера в пуле (API ограничен квотой)
+    "startup_timeout": 30,  # секунд на запуск и MCP initialize
+    "request_timeout": 20,  # Дедлайн запроса по умолчанию, секунд
+    "tool_timeouts": {      # Дедлайны по инструментам, секунд
+        "search_locations": 20,
+        "get_location_details": 15,
+        "get_location_reviews": 25
+    },
+    # Инструменты без побочных эффектов: повторяются при падении сервера
+    "idempotent_tools": {"search_locations", "get_location_details", "get_location_reviews"},
     "default_language": "en",
+    # Кэш ответов платного API: backend "sqlite", "memory" или None (отключен)
+    "cache": {
+        "backend": "sqlite",
+        "max_entries": 5000,
+        "ttl": {  # секунд жизни записи по инструментам
+            "search_locations": 24 * 3600,
+            "get_location_details": 7 * 24 * 3600,
+            "get_location_reviews": 6 * 3600
+        }
+    },
+    # Темп запросов к API: token bucket + адаптивный параллелизм по 429 и ошибкам
+    "rate_limit": {
+        "enabled": True,
+        "rate": 5,                # запросов в секунду
+        "burst": 5,               # емкость ведра токенов
+        "max_concurrency": 4,     # одновременных запросов (верхняя граница)
+        "min_concurrency": 1,
+        "daily_quota": 5000,      # запросов в сутки (UTC), None - без ограничения
+        "throttle_cooldown": 2.0,  # секунд паузы после ответа 429
+        "quota_flush_interval": 5.0  # секунд между записями счетчика квоты на диск
+    },
+    # Тайловый кэш поиска рядом: запрос идет из центра geohash ячейки,
+    # поэтому соседние листинги используют одни и те же закэшированные ответы
+    "nearby_tiles": {
+        "enabled": True,
+        "precision": 6,         # длина geohash (6 - ячейка ~1.2 x 0.6 км)
+        "cover_radius": 150,    # м: соседние ячейки ближе этого к листингу тоже читаются
+        "max_cells": 2,         # ячеек (платных запросов) на поиск: своя и ближайшая соседняя
+        "max_distance": 5000,   # м: места дальше от листинга отбрасываются
+        "distance_unit": "mi"   # единицы поля distance в ответах TripAdvisor
+    },
+    "enriched_places": 5,     # Мест с описанием для анализа ресторанов/достопримечательностей
+    "enrich_concurrency": 4,  # Одновременных запросов деталей при обогащении
+    "area_reviews": 12,       # Отзывов о районе достаточно для анализа
+    "reviews_concurrency": 4, # Одновременных запросов отзывов о районе
+    "area_contexts": 32,      # Районов жилья, данные которых держим в памяти
     "search_radius": 50000,  # Радиус поиска в метрах
     "max_results": 10  # Максимум результатов для отображения
 }
 
 # Специфичные сообщения для TripAdvisor
 MESSAGES = {
+    "server_name": "TripAdvisor MCP",
     "starting_server": "Запускаю TripAdvisor MCP сервер...",
     "server_stopped": "TripAdvisor сервер остановлен",
     "api_key_missing": "Не указан API ключ TripAdvisor",
     "server_error": "Ошибка запуска TripAdvisor сервера: {error}",
     "searching": "Ищу в TripAdvisor: {query}...",
-    "searching_nearby": "Ищу рядом с координатами {lat}, {lon}..."
+    "searching_nearby": "Ищу рядом с координатами {lat}, {lon}...",
+    "quota_exceeded": "Дневная квота TripAdvisor API исчерпана, запрос пропущен"
 }
\ No newline at end of file
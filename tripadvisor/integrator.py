@@ -3,10 +3,28 @@
 Интеграция TripAdvisor MCP с анализом жилья
 """
 
-from typing import Dict, List, Optional
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from openai import OpenAI
 from .client import MCPClient
+from .area_context import AreaContext
+from .config import TRIPADVISOR_CONFIG
 from config import OPENAI_CONFIG, EMOJIS, MESSAGES
+from shared.mcp_transport import MCPError, MCPTimeoutError
+from shared.event_loop import run_sync
+from shared.fan_out import ordered_fan_out
+from shared.llm_stream import complete
+from shared.llm_cache import create_llm_cache
+
+# Коды запросов, из которых состоит полный отчет о районе
+FULL_REPORT_CHOICES = ("1", "2", "3", "4")
+
+
+class AnalysisCancelled(Exception):
+    """Анализ прерван: установлено событие отмены"""
 
 
 class Integrator:
@@ -22,6 +40,11 @@ class Integrator:
         self.openai_client = OpenAI(api_key=api_key or OPENAI_CONFIG["api_key"])
         self.tripadvisor_client = MCPClient()
         self.model = OPENAI_CONFIG["model"]
+        self.llm_cache = create_llm_cache()
+        
+        # Контексты районов жилья (координаты, город) -> AreaContext
+        self._area_contexts: OrderedDict = OrderedDict()
+        self._area_lock = threading.Lock()
     
     def start_tripadvisor_service(self) -> bool:
         """
@@ -35,6 +58,8 @@ class Integrator:
     def stop_tripadvisor_service(self):
         """Остановка TripAdvisor сервиса"""
         self.tripadvisor_client.stop_server()
+        with self._area_lock:
+            self._area_contexts.clear()
     
     def show_additional_options_menu(self, listing_data: Dict) -> str:
         """
@@ -68,219 +93,412 @@ class Integrator:
                 return choice
             print(f"{EMOJIS['error']} Введите число от 0 до 6")
     
-    def process_additional_info_request(self, choice: str, listing_data: Dict) -> Optional[str]:
+    def process_additional_info_request(self, choice: str, listing_data: Dict,
+                                        on_chunk: Optional[Callable[[str], None]] = None,
+                                        cancel_event: Optional[threading.Event] = None) -> Optional[str]:
         """
         Обработка запроса дополнительной информации
+        
+        Args:
+            choice: Код запроса (1-4)
+            listing_data: Данные о жилье
+            on_chunk: Получает текст ИИ анализа по частям по мере генерации
+            cancel_event: Установленное событие прерывает анализ перед
+                следующим запросом к TripAdvisor или LLM
+            
+        Returns:
+            str: ИИ анализ, сообщение об ошибке или None (анализ прерван)
         """
-        coordinates = listing_data["basic"]["coordinates"]
-        lat, lon = coordinates["latitude"], coordinates["longitude"]
+        area = self.get_area_context(listing_data)
         location_name = listing_data["basic"]["name"]
         
-        if choice == "1":
-            return self._get_restaurants_analysis(lat, lon, location_name)
-        elif choice == "2":
-            return self._get_attractions_analysis(lat, lon, location_name)
-        elif choice == "3":
-            return self._get_city_search_analysis(listing_data)
-        elif choice == "4":
-            return self._get_area_reviews_analysis(lat, lon, location_name)
-        else:
+        try:
+            if choice == "1":
+                return self._get_restaurants_analysis(area, location_name, on_chunk, cancel_event)
+            elif choice == "2":
+                return self._get_attractions_analysis(area, location_name, on_chunk, cancel_event)
+            elif choice == "3":
+                return self._get_city_search_analysis(area, on_chunk, cancel_event)
+            elif choice == "4":
+                return self._get_area_reviews_analysis(area, location_name, on_chunk, cancel_event)
+            else:
+                return None
+        except AnalysisCancelled:
             return None
+        except MCPTimeoutError as e:
+            return f"{EMOJIS['error']} TripAdvisor не ответил вовремя: {e}"
+        except MCPError as e:
+            return f"{EMOJIS['error']} TripAdvisor недоступен: {e}"
+    
+    def get_area_context(self, listing_data: Dict) -> AreaContext:
+        """
+        Контекст района жилья (общий для всех анализов этого жилья)
+        
+        Контексты хранятся по координатам и городу; при превышении
+        area_contexts вытесняется самый давно использованный. Контекст живет
+        не дольше самого короткого ttl кэша инструментов (отзывы), затем
+        создается заново, чтобы не отдавать данные старше кэша клиента.
+        
+        Args:
+            listing_data: Данные о жилье
+            
+        Returns:
+            AreaContext: Контекст района
+        """
+        coordinates = listing_data["basic"]["coordinates"]
+        lat, lon = coordinates["latitude"], coordinates["longitude"]
+        city = listing_data["basic"].get("search_city")
+        key = (round(lat, 6), round(lon, 6), city)
+        
+        with self._area_lock:
+            area = self._area_contexts.get(key)
+            if area is None or area.expired:
+                area = AreaContext(
+                    self.tripadvisor_client.async_client, lat, lon, city,
+                    ttl=min(TRIPADVISOR_CONFIG["cache"]["ttl"].values())
+                )
+                self._area_contexts[key] = area
+            self._area_contexts.move_to_end(key)
+            while len(self._area_contexts) > TRIPADVISOR_CONFIG["area_contexts"]:
+                self._area_contexts.popitem(last=False)
+        return area
+    
+    def iter_full_area_report(self, listing_data: Dict,
+                              cancel_event: Optional[threading.Event] = None) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Полный отчет о районе: все четыре анализа одновременно
+        
+        Общие поиски (рестораны и достопримечательности рядом, места в городе)
+        выполняются один раз, затем анализы запускаются параллельно
+        и отдаются по мере готовности.
+        
+        Args:
+            listing_data: Данные о жилье
+            cancel_event: Установленное событие прекращает выдачу; каждый
+                идущий анализ останавливается перед следующим запросом
+                к TripAdvisor или LLM (уже начатый запрос завершается)
+            
+        Yields:
+            Tuple[str, str]: Код запроса (1-4) и результат анализа
+        """
+        def cancelled() -> bool:
+            return cancel_event is not None and cancel_event.is_set()
+        
+        print(f"{EMOJIS['tripadvisor']} Собираю полный отчет о районе...")
+        self._prefetch_area(self.get_area_context(listing_data), cancel_event)
+        if cancelled():
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=len(FULL_REPORT_CHOICES), thread_name_prefix="area-report")
+        try:
+            futures = {
+                executor.submit(
+                    self.process_additional_info_request, choice, listing_data, None, cancel_event
+                ): choice
+                for choice in FULL_REPORT_CHOICES
+            }
+            for future in as_completed(futures):
+                if cancelled():
+                    return
+                choice = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = f"{EMOJIS['error']} Ошибка анализа: {e}"
+                yield choice, result
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _prefetch_area(self, area: AreaContext, cancel_event: Optional[threading.Event] = None):
+        """
+        Одновременная загрузка поисков, общих для анализов района
+        
+        При ошибке (таймаут, потеря соединения, квота) каждый анализ
+        повторит свой поиск сам и сообщит об ошибке в своем результате.
+        
+        Args:
+            area: Контекст района
+            cancel_event: Установленное событие отменяет загрузку до ее начала
+        """
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        
+        async def fetch():
+            await asyncio.gather(area.restaurants(), area.attractions(), area.city_places())
+        
+        try:
+            run_sync(fetch())
+        except MCPTimeoutError as e:
+            print(f"{EMOJIS['error']} TripAdvisor не ответил вовремя: {e}")
+        except MCPError as e:
+            print(f"{EMOJIS['error']} TripAdvisor недоступен: {e}")
+    
+    @staticmethod
+    def _raise_if_cancelled(cancel_event: Optional[threading.Event]) -> None:
+        """Прерывание анализа перед следующим запросом, если он отменен"""
+        if cancel_event is not None and cancel_event.is_set():
+            raise AnalysisCancelled()
     
-    def _get_enriched_places(self, places: List[Dict], place_type: str) -> List[Dict]:
+    def _get_enriched_places(self, area: AreaContext, places: List[Dict], place_type: str,
+                             cancel_event: Optional[threading.Event] = None) -> List[Dict]:
         """
         Получение обогащенных данных с деталями для мест
         
+        Детали запрашиваются параллельно (не больше enrich_concurrency сразу).
+        Как только набирается enriched_places мест с описанием, оставшиеся
+        запросы отменяются; порядок мест сохраняется как в ранжировании.
+        
         Args:
+            area: Контекст района (запоминает детали мест)
             places: Список мест от TripAdvisor
             place_type: Тип места для логирования
+            cancel_event: Событие отмены (проверяется перед запросом деталей)
             
         Returns:
             List[Dict]: Обогащенные места с описаниями
         """
         print(f"{EMOJIS['details']} Получаем детали {place_type} и фильтруем...")
-        enriched_places = []
+        enriched_places = run_sync(self._get_enriched_places_async(area, places, cancel_event))
+        print(f"   📊 Найдено {place_type} с описанием: {len(enriched_places)}")
+        return enriched_places
+    
+    async def _get_enriched_places_async(self, area: AreaContext, places: List[Dict],
+                                         cancel_event: Optional[threading.Event] = None) -> List[Dict]:
+        """
+        Параллельное обогащение мест деталями
+        
+        Args:
+            area: Контекст района
+            places: Список мест от TripAdvisor
+            cancel_event: Событие отмены (проверяется перед запросом деталей)
+            
+        Returns:
+            List[Dict]: Первые enriched_places мест с описанием в исходном порядке
+        """
+        limit = TRIPADVISOR_CONFIG["enriched_places"]
         
-        for i, place in enumerate(places, 1):
+        async def enrich(item):
+            i, place = item
             location_id = place.get('location_id')
             name = place.get('name', 'N/A')
             
-            print(f"  {i}. Получаю детали для: {name[:30]}...")
+            if not location_id:
+                print(f"  {i}. {name[:30]}: ⏭️ Пропускаю - нет location_id")
+                return None
             
-            if location_id:
-                try:
-                    details = self.tripadvisor_client.get_location_details(location_id)
-                    description = details.get('description', '')
-                    features = details.get('features', [])
-                    
-                    desc_len = len(description)
-                    features_count = len(features)
-                    
-                    if desc_len > 0:
-                        enriched_place = {
-                            **place,
-                            'description': description,
-                            'features': features
-                        }
-                        enriched_places.append(enriched_place)
-                        print(f"     ✅ Описание: {desc_len} символов, Особенности: {features_count}")
-                        
-                        if len(enriched_places) >= 5:
-                            break
-                    else:
-                        print("     ⏭️ Пропускаю - нет описания")
-                        
-                except Exception as e:
-                    print(f"     ❌ Ошибка получения деталей: {e}")
-            else:
-                print("     ⏭️ Пропускаю - нет location_id")
-        
-        print(f"   📊 Найдено {place_type} с описанием: {len(enriched_places)}")
-        return enriched_places
+            self._raise_if_cancelled(cancel_event)
+            try:
+                details = await area.details(location_id)
+            except Exception as e:
+                print(f"  {i}. {name[:30]}: ❌ Ошибка получения деталей: {e}")
+                return None
+            
+            description = details.get('description', '')
+            features = details.get('features', [])
+            
+            if not description:
+                print(f"  {i}. {name[:30]}: ⏭️ Пропускаю - нет описания")
+                return None
+            
+            print(f"  {i}. {name[:30]}: ✅ Описание: {len(description)} символов, Особенности: {len(features)}")
+            return {
+                **place,
+                'description': description,
+                'features': features
+            }
+        
+        results = await ordered_fan_out(
+            list(enumerate(places, 1)),
+            enrich,
+            enough=lambda done: sum(1 for place in done if place) >= limit,
+            concurrency=TRIPADVISOR_CONFIG["enrich_concurrency"]
+        )
+        return [place for place in results if place]
     
-    def _get_restaurants_analysis(self, lat: float, lon: float, location_name: str) -> str:
+    def _get_restaurants_analysis(self, area: AreaContext, location_name: str,
+                                  on_chunk: Optional[Callable[[str], None]] = None,
+                                  cancel_event: Optional[threading.Event] = None) -> str:
         """Анализ ресторанов рядом"""
         print(f"{EMOJIS['restaurant']} Ищу рестораны рядом с жильем...")
         
-        restaurants = self.tripadvisor_client.search_nearby_locations(lat, lon, "restaurants")
+        self._raise_if_cancelled(cancel_event)
+        restaurants = run_sync(area.restaurants())
         
         if not restaurants:
             return f"{EMOJIS['error']} Рестораны рядом не найдены"
         
-        enriched_restaurants = self._get_enriched_places(restaurants, "ресторанов")
+        enriched_restaurants = self._get_enriched_places(area, restaurants, "ресторанов", cancel_event)
         
         if not enriched_restaurants:
             return f"{EMOJIS['error']} Рестораны с описанием не найдены"
         
+        self._raise_if_cancelled(cancel_event)
         return self._generate_tripadvisor_analysis(
             enriched_restaurants, 
             "ресторанов", 
-            f"рядом с жильем {location_name}"
+            f"рядом с жильем {location_name}",
+            on_chunk
         )
     
-    def _get_attractions_analysis(self, lat: float, lon: float, location_name: str) -> str:
+    def _get_attractions_analysis(self, area: AreaContext, location_name: str,
+                                  on_chunk: Optional[Callable[[str], None]] = None,
+                                  cancel_event: Optional[threading.Event] = None) -> str:
         """Анализ достопримечательностей рядом"""
         print(f"{EMOJIS['attraction']} Ищу достопримечательности рядом...")
         
-        attractions = self.tripadvisor_client.search_nearby_locations(lat, lon, "attractions")
+        self._raise_if_cancelled(cancel_event)
+        attractions = run_sync(area.attractions())
         
         if not attractions:
             return f"{EMOJIS['error']} Достопримечательности рядом не найдены"
         
-        enriched_attractions = self._get_enriched_places(attractions, "достопримечательностей")
+        enriched_attractions = self._get_enriched_places(area, attractions, "достопримечательностей", cancel_event)
         
         if not enriched_attractions:
             return f"{EMOJIS['error']} Достопримечательности с описанием не найдены"
         
+        self._raise_if_cancelled(cancel_event)
         return self._generate_tripadvisor_analysis(
             enriched_attractions, 
             "достопримечательностей", 
-            f"рядом с жильем {location_name}"
+            f"рядом с жильем {location_name}",
+            on_chunk
         )
     
-    def _get_city_search_analysis(self, listing_data: Dict) -> str:
+    def _get_city_search_analysis(self, area: AreaContext,
+                                  on_chunk: Optional[Callable[[str], None]] = None,
+                                  cancel_event: Optional[threading.Event] = None) -> str:
         """Анализ города по сохраненному названию"""
-        city = listing_data["basic"]["search_city"]
+        city = area.city
+        if not city:
+            return f"{EMOJIS['error']} Город поиска жилья неизвестен"
         print(f"{EMOJIS['search']} Ищу информацию о городе {city}...")
         
-        city_info = self.tripadvisor_client.search_locations(f"{city} attractions")
+        self._raise_if_cancelled(cancel_event)
+        city_info = run_sync(area.city_places())
         
         if not city_info:
             return f"{EMOJIS['error']} Информация о городе {city} не найдена"
         
-        enriched_city_info = self._get_enriched_places(city_info, "мест в городе")
+        enriched_city_info = self._get_enriched_places(area, city_info, "мест в городе", cancel_event)
         
         if not enriched_city_info:
             return f"{EMOJIS['error']} Места в городе с описанием не найдены"
         
+        self._raise_if_cancelled(cancel_event)
         return self._generate_tripadvisor_analysis(
             enriched_city_info, 
             "мест в городе", 
-            city
+            city,
+            on_chunk
         )
     
-    def _get_area_reviews_analysis(self, lat: float, lon: float, location_name: str) -> str:
+    def _get_area_reviews_analysis(self, area: AreaContext, location_name: str,
+                                   on_chunk: Optional[Callable[[str], None]] = None,
+                                   cancel_event: Optional[threading.Event] = None) -> str:
         """Анализ отзывов о районе с нескольких мест"""
         print(f"{EMOJIS['review']} Собираю отзывы о районе с разных мест...")
         
         # Получаем отзывы с мест где они есть
-        aggregated_reviews = self._collect_reviews_from_available_places(lat, lon)
+        aggregated_reviews = self._collect_reviews_from_available_places(area, cancel_event)
         
         if not aggregated_reviews:
             return f"{EMOJIS['error']} Отзывы о районе не найдены"
         
-        return self._generate_aggregated_reviews_analysis(aggregated_reviews, location_name)
+        self._raise_if_cancelled(cancel_event)
+        return self._generate_aggregated_reviews_analysis(aggregated_reviews, location_name, on_chunk)
     
-    def _collect_reviews_from_available_places(self, lat: float, lon: float) -> List[Dict]:
+    def _collect_reviews_from_available_places(self, area: AreaContext,
+                                               cancel_event: Optional[threading.Event] = None) -> List[Dict]:
         """
         Собираем отзывы только с ресторанов и достопримечательностей
+        
+        Оба поиска рядом выполняются одновременно, отзывы запрашиваются
+        параллельно (не больше reviews_concurrency сразу). Сбор
+        останавливается, как только набрано area_reviews отзывов; результат
+        тот же, что при последовательном обходе (сначала достопримечательности).
         """
-        aggregated_reviews = []
+        return run_sync(self._collect_reviews_async(area, cancel_event))
+    
+    async def _collect_reviews_async(self, area: AreaContext,
+                                     cancel_event: Optional[threading.Event] = None) -> List[Dict]:
+        """
+        Параллельный сбор отзывов о районе
         
-        # Ищем ОТДЕЛЬНО достопримечательности и рестораны
-        print("   🎭 Ищу достопримечательности...")
-        attractions = self.tripadvisor_client.search_nearby_locations(lat, lon, "attractions")
+        Args:
+            area: Контекст района (поиски рядом и отзывы берутся из него)
+            cancel_event: Событие отмены (проверяется перед каждым запросом)
+            
+        Returns:
+            List[Dict]: Отзывы с источником (место и его тип)
+        """
+        # Ищем ОТДЕЛЬНО достопримечательности и рестораны, но одновременно
+        print("   🎭 Ищу достопримечательности и 🍽️ рестораны...")
+        self._raise_if_cancelled(cancel_event)
+        attractions, restaurants = await asyncio.gather(area.attractions(), area.restaurants())
         print(f"   ✅ Найдено достопримечательностей: {len(attractions)}")
-        
-        print("   🍽️ Ищу рестораны...")
-        restaurants = self.tripadvisor_client.search_nearby_locations(lat, lon, "restaurants")
         print(f"   ✅ Найдено ресторанов: {len(restaurants)}")
         
         # Объединяем списки (сначала достопримечательности, потом рестораны)
-        target_places = attractions[:4] + restaurants[:4]  # По 4 каждого типа максимум
+        target_places = [(place, 'attraction') for place in attractions[:4]] + \
+                        [(place, 'restaurant') for place in restaurants[:4]]  # По 4 каждого типа максимум
         
         if not target_places:
             return []
         
         print(f"   📍 Отобрано мест для проверки: {len(target_places)}")
         
-        # Собираем отзывы только с отобранных мест
-        places_with_reviews = 0
-        target_reviews = 12
+        target_reviews = TRIPADVISOR_CONFIG["area_reviews"]
         
-        for i, place in enumerate(target_places, 1):
+        async def fetch_reviews(item):
+            i, (place, source_type) = item
             name = place.get('name', 'Unknown')
             location_id = place.get('location_id')
-            
-            # Определяем тип места для логирования
-            place_type = "🎭" if i <= len(attractions[:4]) else "🍽️"
+            place_type = "🎭" if source_type == 'attraction' else "🍽️"
             
             if not location_id:
-                continue
-            
-            print(f"   {place_type} Проверяю место {i}: {name[:30]}...")
+                return []
             
+            self._raise_if_cancelled(cancel_event)
             try:
-                reviews = self.tripadvisor_client.get_location_reviews(location_id)
-                review_count = len(reviews)
-                
-                if review_count > 0:
-                    places_with_reviews += 1
-                    print(f"   ✅ Найдено отзывов: {review_count}")
-                    
-                    # Берем до 3 отзывов с этого места
-                    reviews_to_take = min(3, review_count)
-                    for review in reviews[:reviews_to_take]:
-                        aggregated_reviews.append({
-                            **review,
-                            'source_place': name,
-                            'source_type': 'attraction' if i <= len(attractions[:4]) else 'restaurant',
-                            'source_location_id': location_id
-                        })
-                    
-                    # Останавливаемся если собрали достаточно отзывов
-                    if len(aggregated_reviews) >= target_reviews:
-                        break
-                else:
-                    print("   ⚠️ Нет отзывов")
-                    
+                reviews = await area.reviews(location_id)
             except Exception as e:
-                print(f"   ❌ Ошибка: {e}")
+                print(f"   {place_type} Место {i}: {name[:30]} - ❌ Ошибка: {e}")
+                return []
+            
+            if not reviews:
+                print(f"   {place_type} Место {i}: {name[:30]} - ⚠️ Нет отзывов")
+                return []
+            
+            print(f"   {place_type} Место {i}: {name[:30]} - ✅ Найдено отзывов: {len(reviews)}")
+            
+            # Берем до 3 отзывов с этого места
+            return [
+                {
+                    **review,
+                    'source_place': name,
+                    'source_type': source_type,
+                    'source_location_id': location_id
+                }
+                for review in reviews[:3]
+            ]
+        
+        # Останавливаемся, когда собрали достаточно отзывов
+        per_place = await ordered_fan_out(
+            list(enumerate(target_places, 1)),
+            fetch_reviews,
+            enough=lambda done: sum(len(reviews) for reviews in done) >= target_reviews,
+            concurrency=TRIPADVISOR_CONFIG["reviews_concurrency"]
+        )
+        
+        aggregated_reviews = [review for reviews in per_place for review in reviews]
+        places_with_reviews = sum(1 for reviews in per_place if reviews)
         
         print(f"   📊 Итог: {len(aggregated_reviews)} отзывов с {places_with_reviews} мест")
         return aggregated_reviews
     
-    def _generate_tripadvisor_analysis(self, data: List[Dict], data_type: str, context: str) -> str:
+    def _generate_tripadvisor_analysis(self, data: List[Dict], data_type: str, context: str,
+                                       on_chunk: Optional[Callable[[str], None]] = None) -> str:
         """
         Генерация ИИ анализа для данных TripAdvisor
         
@@ -288,6 +506,7 @@ class Integrator:
             data: Данные от TripAdvisor
             data_type: Тип данных (рестораны, достопримечательности и т.д.)
             context: Контекст (где находятся)
+            on_chunk: Получает текст анализа по частям (потоковый режим)
             
         Returns:
             str: ИИ анализ
@@ -310,7 +529,10 @@ class Integrator:
 Создай краткий обзор на русском языке."""
 
         try:
-            response = self.openai_client.chat.completions.create(
+            return complete(
+                self.openai_client,
+                on_chunk,
+                cache=self.llm_cache,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -320,14 +542,14 @@ class Integrator:
                 temperature=0.3
             )
             
-            return response.choices[0].message.content
-            
         except Exception as e:
             return f"{EMOJIS['error']} Ошибка генерации анализа: {e}"
     
-    def _generate_aggregated_reviews_analysis(self, aggregated_reviews: List[Dict], context: str) -> str:
+    def _generate_aggregated_reviews_analysis(self, aggregated_reviews: List[Dict], context: str,
+                                              on_chunk: Optional[Callable[[str], None]] = None) -> str:
         """
         Генерация анализа района на основе собранных отзывов
+        (on_chunk получает текст по частям в потоковом режиме)
         """
         print(f"{EMOJIS['ai']} Анализирую {len(aggregated_reviews)} отзывов о районе...")
         
@@ -360,7 +582,10 @@ class Integrator:
 Создай анализ РАЙОНА (не конкретных мест) на основе всех отзывов."""
 
         try:
-            response = self.openai_client.chat.completions.create(
+            return complete(
+                self.openai_client,
+                on_chunk,
+                cache=self.llm_cache,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -370,8 +595,6 @@ class Integrator:
                 temperature=0.3
             )
             
-            return response.choices[0].message.content
-            
         except Exception as e:
             return f"{EMOJIS['error']} Ошибка анализа отзывов: {e}"
 